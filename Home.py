@@ -3,8 +3,10 @@
 import streamlit as st
 import pandas as pd
 from utils import (
-    load_and_clean_excel, set_df, get_df, get_file_name, to_excel_bytes,
-    ORDER_COL, BUYER_COL, PRODUCT_COL, QTY_COL, AMOUNT_COL
+    load_and_clean_workbooks, clean_cache_key, set_df, set_raw_df, get_df, get_file_name, export_button,
+    append_to_store, load_order_store, clear_order_store, store_signature,
+    ORDER_COL, BUYER_COL, PRODUCT_COL, QTY_COL, AMOUNT_COL, AMOUNT_FAILURES_ATTR, MEMORY_ATTR, SCHEMA_ATTR, STORE_COLS,
+    SESSION_DF_KEY, SESSION_RAW_DF_KEY, SESSION_UPLOAD_KEYS, SESSION_STORE_ADDED,
 )
 
 st.set_page_config(page_title="Sipariş Analiz Aracı", layout="wide")
@@ -16,35 +18,100 @@ st.markdown(
     """
 )
 
-up = st.file_uploader("Excel dosyası yükle (.xlsx)", type=["xlsx"], key="uploader")
-if up:
-    df = load_and_clean_excel(up.read())
-    if df.empty:
-        st.error("Geçerli veri bulunamadı. Dosya sayfalarında beklenen kolonlar yok olabilir.")
-    else:
-        set_df(df, file_name=up.name)
-        st.success(f"{len(df):,} satır yüklendi: **{up.name}**")
-        st.dataframe(df.head(50), use_container_width=True, height=320)
-
-        # Hızlı metrikler
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            st.metric("Toplam Satır", f"{len(df):,}")
-        with col2:
-            st.metric("Farklı Alıcı", f"{df[BUYER_COL].nunique():,}")
-        with col3:
-            st.metric("Farklı Sipariş No", f"{df[ORDER_COL].nunique():,}")
-        with col4:
-            st.metric("Farklı Ürün", f"{df[PRODUCT_COL].nunique():,}")
-
-        # Temiz veri Excel indirme
-        xls = to_excel_bytes(df)
-        st.download_button(
-            "Temizlenmiş Veri (Excel)",
-            data=xls,
-            file_name=(get_file_name("veri.xlsx").replace(".xlsx", "") + "_clean.xlsx"),
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        )
+ups = st.file_uploader(
+    "Excel dosyası yükle (.xlsx) — birden fazla dosya seçilebilir",
+    type=["xlsx"],
+    accept_multiple_files=True,
+    key="uploader",
+)
+persist = st.toggle(
+    "Yüklenenleri kalıcı depoya ekle ve tüm geçmişi analiz et",
+    value=True,
+    help="Açıksa yeni/değişen satırlar depoya eklenir (Sipariş No + Paket No + Barkod ile tekilleştirilir) "
+    "ve sayfalar depodaki tüm geçmişi kullanır. Kapalıysa yalnızca yüklenen dosyalar analiz edilir.",
+)
+
+df = None
+if ups:
+    files = [(u.name, u.getvalue()) for u in ups]
+    ingest_sig = ([clean_cache_key(data, STORE_COLS) for _, data in files], persist)
+    file_label = ups[0].name if len(ups) == 1 else f"{len(ups)} dosya"
+
+    # Aynı dosyalar için rerun'larda yeniden okuma yapma
+    if st.session_state.get(SESSION_UPLOAD_KEYS) != ingest_sig:
+        bars = [st.progress(0.0, text=f"{name}: bekliyor") for name, _ in files]
+
+        def _on_progress(i: int, done: int, total: int):
+            frac = done / total if total else 1.0
+            bars[i].progress(frac, text=f"{files[i][0]}: {done}/{total} sheet")
+
+        df = load_and_clean_workbooks(files, progress=_on_progress, columns=STORE_COLS)
+        for bar in bars:
+            bar.empty()
+        added = None
+        if persist and not df.empty:
+            added = append_to_store(df)
+            amount_failures = df.attrs.get(AMOUNT_FAILURES_ATTR, 0)
+            # Depo DF'i oturumlar arasında paylaşılır; yüklemeye ait bilgi sığ kopyaya yazılır
+            df = load_order_store().copy(deep=False)
+            df.attrs[AMOUNT_FAILURES_ATTR] = amount_failures
+        st.session_state[SESSION_UPLOAD_KEYS] = ingest_sig
+        st.session_state[SESSION_STORE_ADDED] = added
+        set_df(df, file_name=ups[0].name)
+        set_raw_df(df)
+    df = get_df()
+    added = st.session_state.get(SESSION_STORE_ADDED)
+    if added is not None:
+        st.info(f"Depoya {added:,} yeni/güncellenmiş satır eklendi. Analiz depodaki tüm geçmiş üzerinden yapılır.")
+else:
+    df = get_df()
+    file_label = "kalıcı depo"
+    if df is not None:
+        st.info("Dosya yüklenmedi — kalıcı depodaki geçmiş veri kullanılıyor.")
+
+if df is None:
+    st.info("Başlamak için bir veya daha fazla Excel dosyası yükleyin. Ardından üst menüden sayfalar arasında gezinebilirsiniz.")
+elif df.empty:
+    st.error("Geçerli veri bulunamadı. Dosya sayfalarında beklenen kolonlar yok olabilir.")
 else:
-    st.info("Başlamak için bir Excel dosyası yükleyin. Ardından üst menüden sayfalar arasında gezinebilirsiniz.")
+    st.success(f"{len(df):,} satır yüklendi: **{file_label}**")
+    amount_failures = df.attrs.get(AMOUNT_FAILURES_ATTR, 0)
+    if amount_failures:
+        st.warning(f"'{AMOUNT_COL}' kolonunda sayıya çevrilemeyen {amount_failures:,} hücre boş bırakıldı.")
+    mem = df.attrs.get(MEMORY_ATTR)
+    if mem:
+        st.caption(f"Bellek kullanımı: {mem['before'] / 2**20:,.1f} MB → {mem['after'] / 2**20:,.1f} MB (kompakt şema)")
+    schema = df.attrs.get(SCHEMA_ATTR)
+    if schema:
+        with st.expander("Kolon tipleri (yüklemede çıkarıldı)"):
+            st.dataframe(pd.DataFrame({"Kolon": list(schema), "Tip": list(schema.values())}), use_container_width=True, hide_index=True)
+    st.dataframe(df.head(50), use_container_width=True, height=320)
+
+    # Hızlı metrikler
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Toplam Satır", f"{len(df):,}")
+    with col2:
+        st.metric("Farklı Alıcı", f"{df[BUYER_COL].nunique():,}")
+    with col3:
+        st.metric("Farklı Sipariş No", f"{df[ORDER_COL].nunique():,}")
+    with col4:
+        st.metric("Farklı Ürün", f"{df[PRODUCT_COL].nunique():,}")
+
+    # Temiz veri Excel indirme (istenince üretilir)
+    export_button(
+        "Temizlenmiş Veri (Excel)",
+        lambda: df,
+        file_name=(get_file_name("veri.xlsx").replace(".xlsx", "") + "_clean.xlsx"),
+        key="home_clean",
+        df=df,
+    )
 
+with st.expander("🗄️ Kalıcı depo"):
+    n_parts = len(store_signature())
+    st.write(f"Depodaki parça dosyası: **{n_parts}**")
+    if n_parts and st.button("Depoyu temizle"):
+        clear_order_store()
+        for key in (SESSION_DF_KEY, SESSION_RAW_DF_KEY, SESSION_UPLOAD_KEYS, SESSION_STORE_ADDED):
+            st.session_state.pop(key, None)
+        st.rerun()
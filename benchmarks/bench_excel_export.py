@@ -0,0 +1,46 @@
+# ================ benchmarks/bench_excel_export.py ================
+# to_excel_bytes: pandas + openpyxl (eski yol) ile xlsxwriter constant_memory akışının
+# süre/bellek karşılaştırması. Veri, Home.py'nin dışa aktardığı temizlenmiş şemadır.
+#
+# Çalıştırma:
+#   python benchmarks/bench_excel_export.py            # 300k satır
+#   python benchmarks/bench_excel_export.py 100000 1000000
+import io
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from generate_data import make_orders  # noqa: E402
+from run_benchmarks import measure  # noqa: E402
+
+import utils  # noqa: E402
+
+
+def openpyxl_bytes(df: pd.DataFrame) -> bytes:
+    buf = io.BytesIO()
+    with pd.ExcelWriter(buf, engine="openpyxl") as writer:
+        df.to_excel(writer, index=False, sheet_name="Sheet1")
+    return buf.getvalue()
+
+
+def streaming_bytes(df: pd.DataFrame) -> bytes:
+    buf = io.BytesIO()
+    utils._to_xlsx_streaming(utils._sheet_items(df), buf)
+    return buf.getvalue()
+
+
+def main(sizes):
+    print(f"{'satır':>10}  {'motor':<24}{'süre (s)':>10}{'tepe (MB)':>12}{'boyut (MB)':>12}")
+    for n in sizes:
+        df = utils.combine_cleaned([utils.clean_sheet(make_orders(n), utils.STORE_COLS)])
+        for name, fn in [("openpyxl", openpyxl_bytes), ("xlsxwriter (akış)", streaming_bytes)]:
+            out = {}
+            r = measure(lambda: out.update(xlsx=fn(df)), repeat=1)
+            size = len(out["xlsx"]) / 2**20
+            print(f"{n:>10,}  {name:<24}{r['best_s']:>10.2f}{r['peak_mb']:>12.1f}{size:>12.1f}")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [300_000])
@@ -0,0 +1,86 @@
+# ================ benchmarks/bench_geocoding.py ================
+# Eski sıralı geocode döngüsü (her çiftten sonra time.sleep) ile token kovalı paralel
+# geocode_many karşılaştırması. Ağ kullanılmaz: sağlayıcı yerine gecikmeli sahte geocoder.
+#
+# Çalıştırma:
+#   python benchmarks/bench_geocoding.py                 # 200 sorgu, 0.3 sn gecikme
+#   python benchmarks/bench_geocoding.py 500 --latency 0.5 --fail-every 20
+import argparse
+import hashlib
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import utils  # noqa: E402
+
+
+class FakeGeocoder:
+    """Ağsız sahte sağlayıcı: her istek latency sürer; fail_every > 0 ise her fail_every'inci
+    istek zaman aşımı verir. Koordinatlar sorgudan türetilir (aynı sorgu → aynı konum)."""
+
+    def __init__(self, latency: float = 0.3, fail_every: int = 0):
+        self.latency = latency
+        self.fail_every = fail_every
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def geocode(self, query: str):
+        from geopy.exc import GeocoderTimedOut
+
+        with self._lock:
+            self.calls += 1
+            n = self.calls
+        time.sleep(self.latency)
+        if self.fail_every and n % self.fail_every == 0:
+            raise GeocoderTimedOut("sahte zaman aşımı")
+        h = int(hashlib.sha1(query.encode()).hexdigest()[:8], 16)
+        return SimpleNamespace(latitude=36 + h % 600 / 100, longitude=26 + h % 1900 / 100, address=query)
+
+
+def sequential(fake: FakeGeocoder, queries: list, rate_sleep: float) -> dict:
+    """Eski geocode_il_ilce döngüsü: tek tek, her istekten sonra sabit bekleme, yeniden deneme yok."""
+    out = {}
+    for q in queries:
+        try:
+            loc = fake.geocode(q)
+            out[q] = (loc.latitude, loc.longitude, loc.address)
+        except Exception:
+            out[q] = None
+        time.sleep(rate_sleep)
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Geocoding motoru benchmark'ı (ağsız).")
+    ap.add_argument("n", type=int, nargs="?", default=200, help="benzersiz sorgu sayısı")
+    ap.add_argument("--latency", type=float, default=0.3, help="sahte istek süresi (sn)")
+    ap.add_argument("--fail-every", type=int, default=0, help="her N. istek zaman aşımı verir")
+    ap.add_argument("--provider", default="ArcGIS", choices=sorted(utils.GEOCODER_LIMITS))
+    args = ap.parse_args()
+
+    queries = [f"İlçe {i}, İl {i % 81}, Türkiye" for i in range(args.n)]
+    rate_sleep = 1.0 if args.provider == "Nominatim" else 0.2
+    rate, burst = utils.GEOCODER_LIMITS[args.provider]
+    print(f"{args.n} sorgu, gecikme {args.latency}s, sağlayıcı sınırı {rate}/sn (burst {burst})")
+
+    fake = FakeGeocoder(args.latency, args.fail_every)
+    t0 = time.perf_counter()
+    old = sequential(fake, queries, rate_sleep)
+    t_old = time.perf_counter() - t0
+
+    fake = FakeGeocoder(args.latency, args.fail_every)
+    t0 = time.perf_counter()
+    new = utils.geocode_many(queries, provider=args.provider, geocode=fake.geocode, backoff=0.1)
+    t_new = time.perf_counter() - t0
+
+    ok = lambda res: sum(v is not None for v in res.values())  # noqa: E731
+    print(f"{'yol':<24}{'süre (s)':>10}{'istek/sn':>10}{'başarılı':>10}")
+    print(f"{'sıralı + sleep':<24}{t_old:>10.2f}{args.n / t_old:>10.1f}{ok(old):>10}")
+    print(f"{'geocode_many':<24}{t_new:>10.2f}{args.n / t_new:>10.1f}{ok(new):>10}   ({fake.calls} istek)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# ================ benchmarks/bench_text_normalization.py ================
+# Eski hücre bazlı (.map(norm_text) / .apply(axis=1)) normalizasyon ile
+# vektörel norm_text_series / build_full_address karşılaştırması.
+#
+# Çalıştırma:
+#   python benchmarks/bench_text_normalization.py            # 1M satır
+#   python benchmarks/bench_text_normalization.py 200000
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from utils import BUYER_COL, PRODUCT_COL, build_full_address, norm_text, norm_text_series  # noqa: E402
+
+
+def make_frame(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    buyers = np.array([f"  ALİ  {i}  IŞIK " for i in range(20000)] + [None], dtype=object)
+    products = np.array([f"Ürün\t{i}  Mavi  /  Kırmızı" for i in range(2000)], dtype=object)
+    ils = np.array(["İstanbul", "Ankara ", " İzmir", None], dtype=object)
+    ilces = np.array(["Kadıköy", "Çankaya", "  Bornova  ", None], dtype=object)
+    return pd.DataFrame({
+        BUYER_COL: buyers[rng.integers(0, len(buyers), n)],
+        PRODUCT_COL: products[rng.integers(0, len(products), n)],
+        "İl": ils[rng.integers(0, len(ils), n)],
+        "İlçe": ilces[rng.integers(0, len(ilces), n)],
+    })
+
+
+def old_build_full_address(df: pd.DataFrame, use_fields) -> pd.Series:
+    parts = [df[c].fillna("") if c in df.columns else "" for c in use_fields]
+    return (
+        pd.DataFrame({i: p for i, p in enumerate(parts)})
+        .astype(str)
+        .apply(lambda r: ", ".join([x for x in r.tolist() if x and str(x).strip()]), axis=1)
+        .map(norm_text)
+    )
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def main(n: int):
+    df = make_frame(n)
+    cases = [
+        (
+            "alıcı (norm + title)",
+            lambda: df[BUYER_COL].map(norm_text).astype(str).str.title(),
+            lambda: norm_text_series(df[BUYER_COL], title=True),
+        ),
+        (
+            "ürün (norm)",
+            lambda: df[PRODUCT_COL].map(norm_text).astype(str),
+            lambda: norm_text_series(df[PRODUCT_COL]),
+        ),
+        (
+            "adres (İlçe, İl)",
+            lambda: old_build_full_address(df, ["İlçe", "İl"]),
+            lambda: build_full_address(df, ["İlçe", "İl"]),
+        ),
+    ]
+    print(f"{n:,} satır")
+    print(f"{'işlem':<24}{'eski (s)':>10}{'yeni (s)':>10}{'hızlanma':>10}")
+    for name, old, new in cases:
+        t_old, t_new = timed(old), timed(new)
+        print(f"{name:<24}{t_old:>10.2f}{t_new:>10.2f}{t_old / t_new:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
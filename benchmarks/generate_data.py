@@ -0,0 +1,240 @@
+# ================ benchmarks/generate_data.py ================
+# Müşteri verisi paylaşmadan performans ölçebilmek için sentetik pazaryeri çıktıları üretir:
+#   - Trendyol tarzı Excel (tüm TERMIN_COLS, birden fazla sheet, TR biçimli tutarlar,
+#     çok ürünlü siparişler, "/" ile birleştirilmiş ürün adları)
+#   - Sayfa 8 için Trendyol (",") ve Hepsiburada (";") CSV'leri
+#
+# Çalıştırma:
+#   python benchmarks/generate_data.py                       # 10k, 100k, 1M satır
+#   python benchmarks/generate_data.py --rows 10000 --out /tmp/veri
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import xlsxwriter
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from utils import TERMIN_COLS  # noqa: E402
+
+DEFAULT_ROWS = [10_000, 100_000, 1_000_000]
+DEFAULT_OUT = Path(__file__).parent / "data"
+
+ILCELER = [
+    ("İstanbul", "Kadıköy"), ("İstanbul", "Üsküdar"), ("İstanbul", "Esenyurt"), ("İstanbul", "Beşiktaş"),
+    ("Ankara", "Çankaya"), ("Ankara", "Keçiören"), ("İzmir", "Bornova"), ("İzmir", "Karşıyaka"),
+    ("Bursa", "Nilüfer"), ("Antalya", "Muratpaşa"), ("Konya", "Selçuklu"), ("Adana", "Seyhan"),
+    ("Gaziantep", "Şahinbey"), ("Kocaeli", "İzmit"), ("Mersin", "Yenişehir"), ("Diyarbakır", "Bağlar"),
+    ("Eskişehir", "Odunpazarı"), ("Samsun", "Atakum"), ("Trabzon", "Ortahisar"), ("Muğla", "Bodrum"),
+]
+ADLAR = ["Ayşe", "Fatma", "Emine", "Hatice", "Zeynep", "Elif", "Mehmet", "Mustafa", "Ahmet", "Ali",
+         "Hüseyin", "Hasan", "İbrahim", "İsmail", "Ömer", "Şule", "Çağrı", "Gülşen", "Ilgaz", "Irmak"]
+SOYADLAR = ["Yılmaz", "Kaya", "Demir", "Şahin", "Çelik", "Yıldız", "Yıldırım", "Öztürk", "Aydın",
+            "Özdemir", "Arslan", "Doğan", "Kılıç", "Aslan", "Çetin", "Kara", "Koç", "Kurt", "Işık", "Güneş"]
+URUNLER = ["Kalem", "Defter", "Silgi", "Kalemtıraş", "Cetvel", "Boya Kalemi", "Ajanda", "Çanta",
+           "Matara", "Termos", "Kupa", "Telefon Kılıfı", "Şarj Kablosu", "Kulaklık", "Mouse Pad",
+           "Masa Lambası", "Çorap", "Atkı", "Bere", "Eldiven"]
+RENKLER = ["Siyah", "Beyaz", "Mavi", "Kırmızı", "Yeşil", "Pembe", "Gri", "Lacivert"]
+KARGOLAR = ["Trendyol Express", "Aras Kargo", "Yurtiçi Kargo", "MNG Kargo", "Sürat Kargo", "PTT Kargo"]
+STATULER = ["Teslim Edildi", "Kargoda", "Oluşturuldu", "İade Edildi", "İptal Edildi"]
+MARKALAR = ["Ravla", "Kırtasiye Dünyası", "Ofis Plus", "Moda Evi"]
+
+# Hepsiburada CSV başlıkları: Trendyol kolonu -> HB karşılığı (COLUMNS_MAP'teki alternatif adlar)
+HB_COLUMNS = {
+    "Paket No": "Paket Numarası",
+    "Barkod": "Barkod",
+    "Kargo Firması": "Kargo Firması",
+    "Sipariş Tarihi": "Sipariş Tarihi",
+    "Kargoya Teslim Tarihi": "Kargo Kabul Tarihi",
+    "Kargo Kodu": "Kargo Takip No",
+    "Sipariş Numarası": "Sipariş Numarası",
+    "Ürün Adı": "Ürün Adı",
+    "Adet": "Adet",
+    "Sipariş Statüsü": "Paket Durumu",
+    "Teslim Tarihi": "Teslim Tarihi",
+    "Alıcı": "Alıcı Adı",
+    "İl": "Şehir",
+    "İlçe": "İlçe",
+    "Birim Fiyatı": "Birim Fiyat",
+    "Faturalanacak Tutar": "Toplam Tutar",
+}
+
+
+def _catalog(rng: np.random.Generator, size: int = 3000) -> np.ndarray:
+    """Ürün adları; bir kısmı "A / B" biçiminde set ürünü."""
+    base = [f"{u} {r} {i % 50 + 1}" for i, (u, r) in enumerate(
+        zip(rng.choice(URUNLER, size), rng.choice(RENKLER, size)))]
+    names = np.array(base, dtype=object)
+    sets = rng.random(size) < 0.15
+    names[sets] = [f"{a} / {b}" for a, b in zip(names[sets], rng.choice(base, sets.sum()))]
+    return names
+
+
+def tr_money(values: np.ndarray) -> pd.Series:
+    """1234.5 -> "1.234,50" (Trendyol çıktısındaki gibi metin)."""
+    s = pd.Series(np.round(values, 2)).map("{:,.2f}".format)
+    return s.str.replace(",", "_", regex=False).str.replace(".", ",", regex=False).str.replace("_", ".", regex=False)
+
+
+def tr_datetime(ts: pd.Series) -> pd.Series:
+    return ts.dt.strftime("%d.%m.%Y %H:%M")
+
+
+def make_orders(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """TERMIN_COLS şemasında n_rows satırlık sentetik Trendyol siparişi.
+
+    Siparişler 1-4 satırdan oluşur (çok ürünlü siparişler); alıcı/adres/tarih sipariş
+    içinde sabittir. Alıcı adlarında büyük/küçük harf ve fazla boşluk karışıktır.
+    """
+    rng = np.random.default_rng(seed)
+    lines = rng.choice([1, 2, 3, 4], size=n_rows, p=[0.6, 0.25, 0.1, 0.05])
+    lines = lines[: np.searchsorted(np.cumsum(lines), n_rows) + 1]
+    n_orders = len(lines)
+    order_of_row = np.repeat(np.arange(n_orders), lines)[:n_rows]
+
+    # sipariş bazlı alanlar
+    n_buyers = max(n_orders // 3, 1)
+    buyer_id = rng.integers(0, n_buyers, n_orders)
+    buyer_names = np.array(
+        [f"{a} {s}" for a, s in zip(rng.choice(ADLAR, n_buyers), rng.choice(SOYADLAR, n_buyers))], dtype=object)
+    messy = rng.random(n_buyers) < 0.3
+    buyer_names[messy] = [f"  {x.upper()}  " for x in buyer_names[messy]]
+    place = np.array([f"{il}|{ilce}" for il, ilce in ILCELER], dtype=object)[rng.integers(0, len(ILCELER), n_buyers)]
+    order_ts = pd.Timestamp("2026-01-01") + pd.to_timedelta(rng.integers(0, 270 * 24 * 60, n_orders), unit="m")
+    order_no = 10_000_000_000 + rng.choice(90_000_000, n_orders, replace=False)
+    package_no = 3_000_000_000 + rng.choice(900_000_000, n_orders, replace=False)
+
+    b = buyer_id[order_of_row]
+    il_ilce = pd.Series(place[b]).str.split("|", expand=True)
+    ts = pd.Series(order_ts[order_of_row])
+    catalog = _catalog(rng)
+    product_idx = rng.integers(0, len(catalog), n_rows)
+    qty = rng.choice([1, 2, 3], n_rows, p=[0.8, 0.15, 0.05])
+    unit_price = np.round(rng.gamma(2.0, 150.0, len(catalog)), 2)[product_idx] + 0.99
+    gross = unit_price * qty
+    discount = np.where(rng.random(n_rows) < 0.3, np.round(gross * 0.1, 2), 0.0)
+    ty_discount = np.where(rng.random(n_rows) < 0.1, np.round(gross * 0.05, 2), 0.0)
+    delivered = pd.Series(ts + pd.to_timedelta(rng.integers(2, 7, n_rows), unit="D"))
+    status = rng.choice(STATULER, n_rows, p=[0.7, 0.15, 0.08, 0.05, 0.02])
+
+    street = pd.Series(rng.integers(1, 200, n_rows)).astype(str)
+    address = "Örnek Mah. " + street + ". Sok. No:" + pd.Series(rng.integers(1, 80, n_rows)).astype(str)
+    address = address + " " + il_ilce[1] + "/" + il_ilce[0]
+
+    df = pd.DataFrame({
+        "Barkod": (8_680_000_000_000 + product_idx).astype(str),
+        "Paket No": package_no[order_of_row],
+        "Kargo Firması": rng.choice(KARGOLAR, n_orders)[order_of_row],
+        "Sipariş Tarihi": tr_datetime(ts),
+        "Termin Süresinin Bittiği Tarih": tr_datetime(ts + pd.Timedelta(days=2)),
+        "Kargoya Teslim Tarihi": tr_datetime(ts + pd.to_timedelta(rng.integers(0, 4, n_rows), unit="D")),
+        "Kargo Kodu": (7_000_000_000 + package_no[order_of_row]).astype(str),
+        "Sipariş Numarası": order_no[order_of_row],
+        "Alıcı": buyer_names[b],
+        "Teslimat Adresi": address,
+        "İl": il_ilce[0],
+        "İlçe": il_ilce[1],
+        "Ürün Adı": catalog[product_idx],
+        "Fatura Adresi": address,
+        "Alıcı - Fatura Adresi": buyer_names[b],
+        "Sipariş Statüsü": status,
+        "E-Posta": "pf+" + pd.Series(b).astype(str) + "@trendyolmail.com",
+        "Komisyon Oranı": tr_money(rng.choice([12.5, 15.0, 21.5], n_rows)),
+        "Marka": rng.choice(MARKALAR, len(catalog))[product_idx],
+        "Stok Kodu": "STK-" + pd.Series(product_idx).astype(str),
+        "Adet": qty,
+        "Birim Fiyatı": tr_money(unit_price),
+        "Satış Tutarı": tr_money(gross),
+        "İndirim Tutarı": tr_money(discount),
+        "Trendyol İndirim Tutarı": tr_money(ty_discount),
+        "Faturalanacak Tutar": tr_money(gross - discount - ty_discount),
+        "Butik Numarası": rng.integers(100_000, 999_999, n_rows),
+        "Teslim Tarihi": tr_datetime(delivered).where(status == "Teslim Edildi"),
+        "Kargodan alınan desi": rng.integers(1, 10, n_rows),
+        "Hesapladığım desi": rng.integers(1, 10, n_rows),
+        "Faturalanan Kargo Tutarı": tr_money(rng.choice([34.99, 49.99, 69.99], n_rows)),
+        "Alternatif Teslimat Statüsü": None,
+        "Kurumsal Faturalı Sipariş": np.where(rng.random(n_rows) < 0.05, "Evet", "Hayır"),
+        "Vergi Kimlik Numarası": None,
+        "Vergi Dairesi": None,
+        "Şirket İsmi": None,
+        "Fatura": "Kesildi",
+        "Müşteri Sipariş Adedi": rng.integers(1, 20, n_rows),
+        "Mikro İhracat": "Hayır",
+        "ETGB No": None,
+        "ETGB Tarihi": None,
+        "Yaş": rng.integers(18, 70, n_rows),
+        "Cinsiyet": rng.choice(["Kadın", "Erkek"], n_rows),
+        "Kargo Partner İsmi": None,
+        "2.Teslimat Paketi Statüsü": None,
+        "2.Teslimat Takip Numarası": None,
+        "Teslimat Numarası": package_no[order_of_row],
+        "Fatura No": "TRY" + pd.Series(order_no[order_of_row]).astype(str),
+        "Fatura Tarihi": tr_datetime(ts + pd.Timedelta(days=1)),
+        "Ülke": "Türkiye",
+        "Müşteri Telefon No": "05" + pd.Series(rng.integers(300_000_000, 599_999_999, n_rows)).astype(str),
+        "ETGB Statüsü": None,
+    })
+    return df[TERMIN_COLS]
+
+
+def write_workbook(df: pd.DataFrame, path: Path, sheets: int = 3):
+    """df'i sheets adet sheet'e bölerek yazar (xlsxwriter constant_memory, satır satır)."""
+    wb = xlsxwriter.Workbook(str(path), {"constant_memory": True})
+    header = list(df.columns)
+    for i, part in enumerate(np.array_split(np.arange(len(df)), sheets)):
+        ws = wb.add_worksheet(f"Siparişler {i + 1}")
+        ws.write_row(0, 0, header)
+        chunk = df.iloc[part].astype(object)
+        chunk = chunk.where(chunk.notna(), None)
+        for r, row in enumerate(chunk.itertuples(index=False, name=None), start=1):
+            ws.write_row(r, 0, row)
+    wb.close()
+
+
+def write_csvs(df: pd.DataFrame, out_dir: Path, n_rows: int) -> tuple[Path, Path]:
+    """Sayfa 8 girdileri: trendyol_<n>.csv (",") ve hepsiburada_<n>.csv (";", HB başlıkları)."""
+    ty_path = out_dir / f"trendyol_{n_rows}.csv"
+    hb_path = out_dir / f"hepsiburada_{n_rows}.csv"
+    df.to_csv(ty_path, index=False)
+    hb = df[list(HB_COLUMNS)].rename(columns=HB_COLUMNS)
+    hb["Paket Numarası"] = "HB" + hb["Paket Numarası"].astype(str)
+    hb.to_csv(hb_path, index=False, sep=";")
+    return ty_path, hb_path
+
+
+def dataset_paths(n_rows: int, out_dir: Path = DEFAULT_OUT) -> dict:
+    return {
+        "xlsx": out_dir / f"trendyol_{n_rows}.xlsx",
+        "trendyol_csv": out_dir / f"trendyol_{n_rows}.csv",
+        "hepsiburada_csv": out_dir / f"hepsiburada_{n_rows}.csv",
+    }
+
+
+def generate(n_rows: int, out_dir: Path = DEFAULT_OUT, seed: int = 0, sheets: int = 3, force: bool = False) -> dict:
+    """n_rows için Excel + CSV'leri üretir (varsa ve force değilse yeniden yazmaz)."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = dataset_paths(n_rows, out_dir)
+    if force or not all(p.exists() for p in paths.values()):
+        df = make_orders(n_rows, seed)
+        write_workbook(df, paths["xlsx"], sheets)
+        write_csvs(df, out_dir, n_rows)
+    return paths
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Sentetik Trendyol/Hepsiburada çıktıları üretir.")
+    ap.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS)
+    ap.add_argument("--out", type=Path, default=DEFAULT_OUT)
+    ap.add_argument("--sheets", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--force", action="store_true", help="var olan dosyaları yeniden üret")
+    args = ap.parse_args()
+    for n in args.rows:
+        paths = generate(n, args.out, args.seed, args.sheets, args.force)
+        print(f"{n:>10,} satır: " + ", ".join(p.name for p in paths.values()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+# ================ benchmarks/run_benchmarks.py ================
+# Yükleme/rapor yolunun süre ve bellek ölçümü; sonuçlar JSON'a yazılır ki sürümler arası
+# gerilemeler görülebilsin. Veri yoksa generate_data.py ile üretilir.
+#
+# Ölçülenler (her boyut için):
+#   - load_and_clean_excel (soğuk / disk cache'ten)
+#   - utils özet fonksiyonları (agregasyon indeksi her ölçümde sıfırdan kurulur)
+#   - to_excel_bytes
+#   - sayfa 8 CSV hattı (utils.read_platform_csvs, sayfanın kolon eşlemesiyle → concat)
+#
+# Çalıştırma:
+#   python benchmarks/run_benchmarks.py --sizes 10000 100000
+#   python benchmarks/run_benchmarks.py --baseline benchmarks/results/onceki.json
+import argparse
+import ast
+import json
+import logging
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+logging.disable(logging.WARNING)  # streamlit'in "No runtime found" uyarıları
+
+import utils  # noqa: E402
+from generate_data import DEFAULT_OUT, DEFAULT_ROWS, generate  # noqa: E402
+
+RESULTS_DIR = Path(__file__).parent / "results"
+PAGE8_FUNCS = ["detect_source_from_name"]
+PAGE8_CONSTS = ["COLUMNS_MAP", "INT_COLS", "DATE_COLS"]
+
+
+def load_page8_pipeline() -> dict:
+    """Sayfa 8'in kolon eşlemesini ve yardımcılarını sayfayı (Streamlit arayüzünü) çalıştırmadan yükler."""
+    path = next(ROOT.glob("pages/8_*.py"))
+    tree = ast.parse(path.read_text(encoding="utf-8"))
+    keep = [
+        node for node in tree.body
+        if (isinstance(node, ast.FunctionDef) and node.name in PAGE8_FUNCS)
+        or (isinstance(node, ast.Assign) and any(getattr(t, "id", None) in PAGE8_CONSTS for t in node.targets))
+    ]
+    ns = {"pd": pd, "np": np}
+    exec(compile(ast.Module(body=keep, type_ignores=[]), str(path), "exec"), ns)
+    return ns
+
+
+def page8_csv_pipeline(ns: dict, paths: list) -> pd.DataFrame:
+    files = [(p.name, p.read_bytes()) for p in paths]
+    frames = utils.read_platform_csvs(files, ns["COLUMNS_MAP"], int_cols=ns["INT_COLS"], date_cols=ns["DATE_COLS"])
+    for (name, _), df_norm in zip(files, frames):
+        df_norm["kaynak"] = ns["detect_source_from_name"](name)
+    return pd.concat(frames, ignore_index=True)
+
+
+def measure(fn, setup=None, repeat: int = 3) -> dict:
+    """repeat kez süre ölçer; ardından tracemalloc altında bir kez daha çalıştırıp tepe belleği alır.
+
+    tracemalloc yalnızca Python/numpy ayırmalarını görür (pyarrow'un kendi havuzu hariç).
+    """
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    if setup:
+        setup()
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        "seconds": [round(t, 4) for t in times],
+        "best_s": round(min(times), 4),
+        "median_s": round(statistics.median(times), 4),
+        "peak_mb": round(peak / 2**20, 2),
+    }
+
+
+def bench_size(n_rows: int, data_dir: Path, repeat: int, skip: set) -> list:
+    paths = generate(n_rows, data_dir)
+    xlsx_bytes = paths["xlsx"].read_bytes()
+    results = []
+
+    def run(name: str, fn, setup=None):
+        if name in skip:
+            return
+        print(f"  {name:<40}", end="", flush=True)
+        r = measure(fn, setup, repeat)
+        print(f"{r['best_s']:>9.3f} s {r['peak_mb']:>10.1f} MB")
+        results.append({"rows": n_rows, "name": name, **r})
+
+    cache_dir = Path(tempfile.mkdtemp(prefix="ravla_bench_cache_"))
+    utils.CLEAN_CACHE_DIR = cache_dir
+    try:
+        def cold():
+            utils.load_and_clean_excel.clear()
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+        run("load_and_clean_excel", lambda: utils.load_and_clean_excel(xlsx_bytes), cold)
+        run("load_and_clean_excel (disk cache)", lambda: utils.load_and_clean_excel(xlsx_bytes),
+            utils.load_and_clean_excel.clear)
+        df = utils.load_and_clean_excel(xlsx_bytes)
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    products = df[utils.PRODUCT_COL].value_counts().index[:5].tolist()
+    summaries = {
+        "buyer_summary": lambda: utils.buyer_summary(df),
+        "orders_with_many_products": lambda: utils.orders_with_many_products(df),
+        "buyers_over_total_qty": lambda: utils.buyers_over_total_qty(df),
+        "same_product_across_distinct_orders": lambda: utils.same_product_across_distinct_orders(df, products),
+    }
+    for name, fn in summaries.items():
+        run(name, fn, utils._cached_aggregate_index.clear)
+
+    run("to_excel_bytes", lambda: utils.to_excel_bytes(df))
+
+    ns = load_page8_pipeline()
+    csvs = [paths["trendyol_csv"], paths["hepsiburada_csv"]]
+    run("page8_csv_pipeline", lambda: page8_csv_pipeline(ns, csvs))
+    return results
+
+
+def git_revision() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True)
+        return out.stdout.strip() or "unknown"
+    except OSError:
+        return "unknown"
+
+
+def compare(results: list, baseline_path: Path):
+    base = {(r["rows"], r["name"]): r for r in json.loads(baseline_path.read_text())["results"]}
+    print(f"\nKarşılaştırma: {baseline_path.name} (oran > 1 = yavaşlama)")
+    for r in results:
+        b = base.get((r["rows"], r["name"]))
+        if b and b["best_s"]:
+            print(f"  {r['rows']:>10,} {r['name']:<40}{r['best_s'] / b['best_s']:>8.2f}x süre"
+                  f"{(r['peak_mb'] / b['peak_mb']) if b['peak_mb'] else float('nan'):>8.2f}x bellek")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Yükleme/rapor benchmark'ları.")
+    ap.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_ROWS)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--data", type=Path, default=DEFAULT_OUT, help="sentetik veri klasörü")
+    ap.add_argument("--out", type=Path, help="sonuç JSON yolu (varsayılan: benchmarks/results/<rev>-<zaman>.json)")
+    ap.add_argument("--skip", nargs="*", default=[], help="atlanacak ölçüm adları")
+    ap.add_argument("--baseline", type=Path, help="karşılaştırılacak önceki sonuç JSON'u")
+    args = ap.parse_args()
+
+    rev = git_revision()
+    results = []
+    for n in args.sizes:
+        print(f"{n:,} satır")
+        results.extend(bench_size(n, args.data, args.repeat, set(args.skip)))
+
+    out = args.out or RESULTS_DIR / f"{rev}-{datetime.now():%Y%m%d-%H%M%S}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    meta = {
+        "git_revision": rev,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "excel_engine": utils.excel_engine(),
+        "repeat": args.repeat,
+    }
+    out.write_text(json.dumps({"meta": meta, "results": results}, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"\nSonuçlar: {out}")
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
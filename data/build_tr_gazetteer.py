@@ -0,0 +1,134 @@
+# ================ data/build_tr_gazetteer.py ================
+# data/tr_il_ilce.csv'yi (il/ilçe merkez koordinatları) kaynak verilerden yeniden üretir.
+# Uygulama bu betiği çalıştırmaz; yalnızca CSV'yi okur (bkz. utils.resolve_il_ilce_offline).
+#
+# Kaynaklar:
+#   - İl/ilçe adları ve il koordinatları: turkiye-api verisi (MIT),
+#     PyPI paketi turkiye-api-py içindeki app/data/{provinces,districts,towns,villages,neighborhoods}.json
+#   - İlçe koordinatları: GeoNames cities1000 (CC BY 4.0, https://www.geonames.org/),
+#     ör. PyPI paketi reverse_geocoder içindeki rg_cities1000.csv
+#
+# Eşleştirme (adlar ASCII'ye katlanarak):
+#   1. İlçe adı aynı ildeki bir GeoNames yeriyle aynıysa o yerin koordinatı
+#   2. "Merkez" ilçeleri il koordinatını alır
+#   3. Değilse ilçenin köy/mahalle/beldelerinden il içinde adı tekil olup GeoNames'te bulunanların
+#      ortalaması (en az MIN_SUB_POINTS nokta)
+#   Il merkezine MAX_KM'den uzak düşen eşleşmeler (aynı adlı başka yer) atılır. Eşleşmeyen
+#   ilçeler tabloya girmez; uygulama onları çevrimiçi sağlayıcıya sorar. Kapsam (bulunan/toplam
+#   ilçe) CSV başlık yorumuna yazılır, atlanan ilçeler çalıştırınca listelenir.
+#
+# Çalıştırma:
+#   python data/build_tr_gazetteer.py --api-data <turkiye-api app/data> --geonames rg_cities1000.csv
+import argparse
+import collections
+import csv
+import json
+import math
+import re
+import unicodedata
+from pathlib import Path
+
+OUT = Path(__file__).parent / "tr_il_ilce.csv"
+MAX_KM = 250
+MIN_SUB_POINTS = 2
+# GeoNames'teki Almanca transliterasyonlu il adları
+GEONAMES_IL_ALIASES = {"bingoel": "bingol", "kuetahya": "kutahya"}
+HEADER = (
+    "# Kaynak: turkiye-api (MIT), GeoNames cities1000 (CC BY 4.0). Üretici: data/build_tr_gazetteer.py\n"
+    "# İlçe kapsamı: {found}/{total}; eksik {missing} ilçe tabloda yok, çevrimiçi sağlayıcıya sorulur.\n"
+)
+
+_TR = str.maketrans("çğıİöşüÇĞÖŞÜâîûÂÎÛ", "cgiiosucgosuaiuaiu")
+
+
+def fold(text: str) -> str:
+    text = unicodedata.normalize("NFKD", str(text).translate(_TR).lower()).encode("ascii", "ignore").decode()
+    return re.sub(r"[^a-z0-9]+", " ", text).strip()
+
+
+def km(a: tuple, b: tuple) -> float:
+    lat1, lon1, lat2, lon2 = map(math.radians, (*a, *b))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 12742 * math.asin(math.sqrt(h))
+
+
+def mean(points: list) -> tuple:
+    return sum(p[0] for p in points) / len(points), sum(p[1] for p in points) / len(points)
+
+
+def load_geonames(path: Path) -> dict:
+    places = collections.defaultdict(list)
+    with open(path, encoding="utf-8", newline="") as f:
+        for r in csv.DictReader(f):
+            if r["cc"].strip() != "TR" or not r["admin1"]:
+                continue
+            il = GEONAMES_IL_ALIASES.get(fold(r["admin1"]), fold(r["admin1"]))
+            places[(il, fold(r["name"]))].append((float(r["lat"]), float(r["lon"])))
+    return places
+
+
+def build(api_dir: Path, geonames: Path) -> tuple[list, list]:
+    """→ (satırlar, atlanan ilçeler [(il, ilçe, neden)])."""
+    provinces = json.loads((api_dir / "provinces.json").read_text(encoding="utf-8"))
+    districts = json.loads((api_dir / "districts.json").read_text(encoding="utf-8"))
+    places = load_geonames(geonames)
+
+    # İlçe → alt birim adları; il içinde birden fazla ilçede geçen adlar belirsiz sayılır
+    subs = collections.defaultdict(set)
+    for name in ("towns", "villages", "neighborhoods"):
+        for x in json.loads((api_dir / f"{name}.json").read_text(encoding="utf-8")):
+            subs[(fold(x["province"]), fold(x["district"]))].add(fold(x["name"]))
+    seen = collections.Counter((il, n) for (il, _), names in subs.items() for n in names)
+
+    il_coords = {}
+    rows = []
+    for p in sorted(provinces, key=lambda p: p["id"]):
+        c = (p["coordinates"]["latitude"], p["coordinates"]["longitude"])
+        il_coords[fold(p["name"])] = c
+        rows.append((p["name"], "", *c))
+
+    stats = collections.Counter()
+    dropped = []
+    for d in sorted(districts, key=lambda d: (d["provinceId"], d["name"])):
+        il, ilce = fold(d["province"]), fold(d["name"])
+        center = il_coords[il]
+        if ilce == "merkez":
+            c, how = center, "merkez"
+        elif (il, ilce) in places:
+            c, how = mean(places[(il, ilce)]), "ad"
+        else:
+            pts = [pt for n in subs.get((il, ilce), ()) if seen[(il, n)] == 1 for pt in places.get((il, n), ())]
+            c, how = (mean(pts), "alt birim") if len(pts) >= MIN_SUB_POINTS else (None, "yok")
+        if c is not None and km(c, center) > MAX_KM:
+            c, how = None, "uzak"
+        stats[how] += 1
+        if c is not None:
+            rows.append((d["province"], d["name"], *c))
+        else:
+            dropped.append((d["province"], d["name"], how))
+    print(dict(stats))
+    return rows, dropped
+
+
+def main():
+    ap = argparse.ArgumentParser(description="İl/ilçe gazetteer CSV'sini üretir.")
+    ap.add_argument("--api-data", type=Path, required=True, help="turkiye-api app/data klasörü")
+    ap.add_argument("--geonames", type=Path, required=True, help="GeoNames cities1000 CSV (lat,lon,name,admin1,...,cc)")
+    ap.add_argument("--out", type=Path, default=OUT)
+    args = ap.parse_args()
+    rows, dropped = build(args.api_data, args.geonames)
+    total = sum(1 for _, ilce, *_ in rows if ilce) + len(dropped)
+    found = total - len(dropped)
+    print(f"İlçe kapsamı: {found}/{total} ({found / total:.1%}); atlanan {len(dropped)} ilçe:")
+    for il, ilce, how in dropped:
+        print(f"  {il} / {ilce} ({how})")
+    with open(args.out, "w", encoding="utf-8", newline="") as f:
+        f.write(HEADER.format(found=found, total=total, missing=len(dropped)))
+        w = csv.writer(f)
+        w.writerow(["il", "ilce", "lat", "lon"])
+        w.writerows((il, ilce, f"{lat:.5f}", f"{lon:.5f}") for il, ilce, lat, lon in rows)
+    print(f"{len(rows)} satır → {args.out}")
+
+
+if __name__ == "__main__":
+    main()
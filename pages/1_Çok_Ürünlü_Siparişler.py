@@ -1,7 +1,7 @@
 # ====================== pages/1_Çok_Ürünlü_Siparişler.py ======================
 import streamlit as st
 import altair as alt
-from utils import get_df, ORDER_COL, PRODUCT_COL, to_excel_bytes, prepare_page_df
+from utils import get_df, ORDER_COL, PRODUCT_COL, prepare_page_df, aggregate_index, export_button
 
 st.set_page_config(page_title="Çok Ürünlü Siparişler", layout="wide")
 st.title("🧺 Tek Siparişte Birden Fazla Ürün")
@@ -21,7 +21,8 @@ min_items = st.number_input("Farklı ürün sayısı", min_value=1, step=1, valu
 # Karşılaştırma tipi: ≥, =, ≤, >
 cmp = st.radio("Karşılaştırma", ["≥", "=", "≤", ">"], index=0, horizontal=True)
 
-grp = df.groupby(ORDER_COL)[PRODUCT_COL].nunique().reset_index(name="Farklı Ürün Sayısı")
+idx = aggregate_index(df)
+grp = idx.orders_with_many_products()
 
 if cmp == "≥":
     mask = grp["Farklı Ürün Sayısı"] >= min_items
@@ -37,19 +38,21 @@ many_orders = grp[mask]
 st.write(f"Koşulu sağlayan sipariş: **{len(many_orders):,}**")
 
 if len(many_orders) > 0:
-    detay = df.merge(many_orders[[ORDER_COL]], on=ORDER_COL, how="inner")
+    detay = idx.order_details(df, mask.to_numpy())
     st.dataframe(detay.sort_values([ORDER_COL, PRODUCT_COL]), use_container_width=True, height=420)
 
     # Excel indir
-    st.download_button(
+    export_button(
         "Excel indir (çok ürünlü siparişler)",
-        data=to_excel_bytes(detay),
+        lambda: detay,
         file_name="cok_urunlu_siparisler.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        key="cok_urunlu",
+        df=df,
+        params=(min_items, cmp, tuple(mapping.items())),
     )
 
     # Mantıklı grafik: Farklı ürün sayısına göre sipariş sayısı
-    dist = grp.groupby("Farklı Ürün Sayısı")[ORDER_COL].nunique().reset_index(name="Sipariş Sayısı")
+    dist = idx.product_count_distribution()
     chart = (
         alt.Chart(dist)
         .mark_bar()
@@ -1,7 +1,7 @@
 # ==================== pages/2_Çok_Sipariş_Verenler.py ====================
 import streamlit as st
 import altair as alt
-from utils import get_df, buyer_summary, BUYER_COL, to_excel_bytes, prepare_page_df, ORDER_COL
+from utils import get_df, buyer_summary, BUYER_COL, prepare_page_df, ORDER_COL, export_button
 
 st.set_page_config(page_title="Çok Sipariş Verenler", layout="wide")
 st.title("👤 Birden Fazla Sipariş Veren Alıcılar")
@@ -47,11 +47,13 @@ summary_f = summary_f.sort_values(sort_by, ascending=ascending)
 st.write(f"Koşulu sağlayan alıcı sayısı: **{len(summary_f):,}**")
 st.dataframe(summary_f, use_container_width=True, height=420)
 
-st.download_button(
+export_button(
     "Excel indir (çok sipariş verenler özet)",
-    data=to_excel_bytes(summary_f),
+    lambda: summary_f,
     file_name="cok_siparis_verenler_ozet.xlsx",
-    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    key="cok_siparis_verenler",
+    df=df,
+    params=(min_orders, cmp, sort_by, ascending, tuple(mapping.items())),
 )
 
 # Grafik: Top N çubuk grafiği (veri varsa)
@@ -1,7 +1,7 @@
 # ==================== pages/3_Toplam_Miktar_Eşiği.py ====================
 import streamlit as st
 import altair as alt
-from utils import get_df, buyers_over_total_qty, BUYER_COL, to_excel_bytes, prepare_page_df, QTY_COL
+from utils import get_df, buyers_over_total_qty, BUYER_COL, prepare_page_df, QTY_COL, export_button
 
 st.set_page_config(page_title="Toplam Miktar Eşiği", layout="wide")
 st.title("📈 Toplam Adet Eşiğini Aşan Alıcılar")
@@ -23,11 +23,13 @@ over_f = over[over["Toplam Adet"] >= min_total].sort_values("Toplam Adet", ascen
 st.write(f"Koşulu sağlayan alıcı sayısı: **{len(over_f):,}**")
 st.dataframe(over_f, use_container_width=True, height=420)
 
-st.download_button(
+export_button(
     "Excel indir (toplam adet eşiği)",
-    data=to_excel_bytes(over_f),
+    lambda: over_f,
     file_name="toplam_adet_esigi.xlsx",
-    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    key="toplam_adet_esigi",
+    df=df,
+    params=(min_total, tuple(mapping.items())),
 )
 
 # Grafik: Top N çubuk grafiği
@@ -1,7 +1,7 @@
 # = pages/4_Aynı_Ürünü_Farklı_Siparişlerde_Alanlar.py =
 import streamlit as st
 import altair as alt
-from utils import get_df, same_product_across_distinct_orders, PRODUCT_COL, BUYER_COL, to_excel_bytes, prepare_page_df, ORDER_COL
+from utils import get_df, same_product_across_distinct_orders, PRODUCT_COL, BUYER_COL, prepare_page_df, ORDER_COL, aggregate_index, export_button
 
 st.set_page_config(page_title="Ürün Bazlı Farklı Siparişler", layout="wide")
 st.title("🔁 Aynı Ürünü Farklı Siparişlerde Alanlar")
@@ -16,7 +16,7 @@ if df is None or df.empty:
     st.warning("Veri bulunamadı veya boş.")
     st.stop()
 
-products = sorted(df[PRODUCT_COL].dropna().astype(str).unique())
+products = sorted(aggregate_index(df).product[1].astype(str))
 sel_products = st.multiselect("Ürün(ler) seç", options=products, default=products[:1])
 min_distinct_orders = st.number_input("Minimum farklı sipariş sayısı", min_value=2, step=1, value=4)
 
@@ -28,11 +28,13 @@ if sel_products:
     st.write(f"Koşulu sağlayan satır sayısı: **{len(table):,}**")
     st.dataframe(table, use_container_width=True, height=420)
 
-    st.download_button(
+    export_button(
         "Excel indir (ürün bazlı farklı siparişler)",
-        data=to_excel_bytes(table),
+        lambda: table,
         file_name="urun_bazli_farkli_siparisler.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        key="urun_farkli_siparis",
+        df=df,
+        params=(tuple(sel_products), min_distinct_orders, tuple(mapping.items())),
     )
 
     # Grafik: ürün-buyer heatmap mantıklı
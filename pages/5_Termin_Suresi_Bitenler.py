@@ -23,7 +23,7 @@ required_columns = [
 ]
 
 try:
-    from utils import prepare_page_df
+    from utils import prepare_page_df, export_button, as_datetime
 except Exception:
     prepare_page_df = None
 
@@ -42,15 +42,15 @@ else:
     if not termin_col:
         st.error("'Termin Süresinin Bittiği Tarih' sütunu bulunamadı. Lütfen eşleştirme yapın.")
     else:
-        df[termin_col] = pd.to_datetime(df[termin_col], errors='coerce')
-        termin_tarihleri = df[termin_col].dropna().dt.date.unique()
-        termin_tarihleri = sorted(termin_tarihleri)
+        # Tarih yüklemede datetime64 olarak çözümlenir; gün seçimi vektörel aralık karşılaştırmasıdır
+        termin = as_datetime(df[termin_col])
+        termin_tarihleri = pd.DatetimeIndex(termin.dropna().dt.normalize().unique()).sort_values().tolist()
         if len(termin_tarihleri) == 0:
             st.warning("Hiç geçerli 'Termin Süresinin Bittiği Tarih' bulunamadı.")
         else:
-            selected_date = st.selectbox("Termin Süresinin Bittiği Tarih seçin", termin_tarihleri, index=0)
-            termin_tarihleri_gun = df[termin_col].dt.date
-            filtered = df[termin_tarihleri_gun == selected_date]
+            selected_date = st.selectbox("Termin Süresinin Bittiği Tarih seçin", termin_tarihleri, index=0,
+                                         format_func=lambda d: f"{d:%Y-%m-%d}")
+            filtered = df[(termin >= selected_date) & (termin < selected_date + pd.Timedelta(days=1))]
             # Kargoya Teslim Tarihi boş olanları filtreleme seçeneği
             kargoya_col = next((c for c in df.columns if c.replace(" ","") == "KargoyaTeslimTarihi"), None)
             only_missing_kargoya = False
@@ -61,13 +61,11 @@ else:
             toplam_adet = filtered['Adet'].sum() if 'Adet' in filtered.columns else len(filtered)
             st.write(f"Seçilen tarihte termin süresi biten sipariş adedi: {toplam_adet}")
             st.dataframe(filtered)
-            import io
-            output = io.BytesIO()
-            filtered.to_excel(output, index=False)
-            output.seek(0)
-            st.download_button(
-                label="Filtrelenen veriyi Excel olarak indir",
-                data=output,
-                file_name=f"termin_suresi_bitenler_{selected_date}.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            export_button(
+                "Filtrelenen veriyi Excel olarak indir",
+                lambda: filtered,
+                file_name=f"termin_suresi_bitenler_{selected_date:%Y-%m-%d}.xlsx",
+                key="termin",
+                df=raw_df,
+                params=(selected_date, only_missing_kargoya, tuple(mapping.items())),
             )
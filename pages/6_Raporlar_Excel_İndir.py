@@ -2,7 +2,8 @@
 import streamlit as st
 from utils import (
     get_df, buyer_summary, orders_with_many_products, buyers_over_total_qty,
-    ORDER_COL, PRODUCT_COL, BUYER_COL, QTY_COL, to_excel_bytes, prepare_page_df
+    ORDER_COL, PRODUCT_COL, BUYER_COL, QTY_COL, prepare_page_df, aggregate_index, export_button,
+    BUNDLE_EXPORT_FORMATS,
 )
 
 st.set_page_config(page_title="Raporlar — Excel İndir", layout="wide")
@@ -27,31 +28,37 @@ with col2:
 with col3:
     min_total_qty = st.number_input("(3) Toplam adet eşiği (alıcı)", min_value=1, step=1, value=10)
 
-# Hesaplar
-cok_urun = orders_with_many_products(df)
-cok_urun = cok_urun[cok_urun["Farklı Ürün Sayısı"] >= min_items]
-cok_urun_detay = df.merge(cok_urun[[ORDER_COL]], on=ORDER_COL, how="inner")
 
-cok_siparis = buyer_summary(df)
-cok_siparis = cok_siparis[cok_siparis["Farklı Sipariş Sayısı"] >= min_orders]
+# Hesaplar: yalnızca rapor istendiğinde, arka plan işinde çalışır (st.* çağrılmamalı)
+def build_report() -> dict:
+    cok_urun = orders_with_many_products(df)
+    cok_urun_mask = (cok_urun["Farklı Ürün Sayısı"] >= min_items).to_numpy()
+    cok_urun = cok_urun[cok_urun_mask]
+    cok_urun_detay = aggregate_index(df).order_details(df, cok_urun_mask)
 
-toplam_adet = buyers_over_total_qty(df)
-toplam_adet = toplam_adet[toplam_adet["Toplam Adet"] >= min_total_qty]
+    cok_siparis = buyer_summary(df)
+    cok_siparis = cok_siparis[cok_siparis["Farklı Sipariş Sayısı"] >= min_orders]
 
-sheets = {
-    "CokUrunlu_Siparis_Ozet": cok_urun,
-    "CokUrunlu_Siparis_Detay": cok_urun_detay,
-    "CokSiparisVerenler_Ozet": cok_siparis,
-    "ToplamAdet_Esigi": toplam_adet,
-}
+    toplam_adet = buyers_over_total_qty(df)
+    toplam_adet = toplam_adet[toplam_adet["Toplam Adet"] >= min_total_qty]
 
-excel_bytes = to_excel_bytes(sheets)
+    sheets = {
+        "CokUrunlu_Siparis_Ozet": cok_urun,
+        "CokUrunlu_Siparis_Detay": cok_urun_detay,
+        "CokSiparisVerenler_Ozet": cok_siparis,
+        "ToplamAdet_Esigi": toplam_adet,
+    }
+    return sheets
 
-st.download_button(
+
+export_button(
     "Excel indir (Toplu Rapor)",
-    data=excel_bytes,
+    build_report,
     file_name="toplu_raporlar.xlsx",
-    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    key="toplu_rapor",
+    df=df,
+    params=(min_items, min_orders, min_total_qty, tuple(mapping.items())),
+    formats=BUNDLE_EXPORT_FORMATS,
 )
 
 st.markdown("""
@@ -1,6 +1,6 @@
 import streamlit as st
 import pandas as pd
-from utils import prepare_page_df, to_excel_bytes
+from utils import prepare_page_df, export_button, split_multi_products, as_datetime, package_count_distribution
 
 st.set_page_config(page_title="Kargoya Teslim Tarihi Seçimi", layout="wide")
 st.title("📦 Kargoya Teslim Tarihi Seçimi — Çoklu Tarih & Ürün Dağılımı")
@@ -19,30 +19,23 @@ if not kargoya_col:
     st.error("'Kargoya Teslim Tarihi' sütunu bulunamadı. Lütfen eşleştirme yapın.")
     st.stop()
 
-# Convert ALL date columns to datetime.date for consistent formatting with Streamlit
-date_keywords = ["tarih", "tarihi", "date", "time"]
-for col in df.columns:
-    col_lower = str(col).lower()
-    if any(keyword in col_lower for keyword in date_keywords):
-        try:
-            df[col] = pd.to_datetime(df[col], errors="coerce").dt.date
-        except:
-            pass  # Skip if conversion fails
+# Tarih kolonları yüklemede datetime64 olarak çözümlenir (bkz. utils.compact_dtypes); seçim gün bazında
+kargo_day = as_datetime(df[kargoya_col]).dt.normalize()
 
-if df[kargoya_col].dropna().empty:
+if kargo_day.dropna().empty:
     st.warning("Kargoya Teslim Tarihi sütununda geçerli tarih bulunamadı.")
 
-available_dates = sorted(df[kargoya_col].dropna().unique())
+available_dates = pd.DatetimeIndex(kargo_day.dropna().unique()).sort_values().tolist()
 if not available_dates:
     st.info("Veride seçilebilir 'Kargoya Teslim Tarihi' yok.")
     st.stop()
 
-sel_dates = st.multiselect("Kargoya Teslim Tarihi(ler) seçin", options=available_dates, default=available_dates[:1])
-only_selected = df[df[kargoya_col].isin(sel_dates)] if sel_dates else pd.DataFrame(columns=df.columns)
+sel_dates = st.multiselect("Kargoya Teslim Tarihi(ler) seçin", options=available_dates, default=available_dates[:1],
+                           format_func=lambda d: f"{d:%Y-%m-%d}")
+only_selected = df[kargo_day.isin(sel_dates)] if sel_dates else pd.DataFrame(columns=df.columns)
 
-# Göster: kullanılabilir tarihlerin listesi (dataframe olarak)
 st.write("### Kullanılabilir Kargoya Teslim Tarihleri")
-st.dataframe(pd.DataFrame({"date": available_dates}), use_container_width=True, height=150)
+st.dataframe(pd.DataFrame({"date": pd.DatetimeIndex(available_dates).date}), use_container_width=True, height=150)
 
 # Göster: filtrelenmiş satırlar
 st.write("### Filtrelenmiş Satırlar")
@@ -60,41 +53,26 @@ if sel_dates:
 
     # Paket sayısına göre dağılım (sipariş başına paket sayısı)
     if order_col and paket_col and order_col in only_selected.columns and paket_col in only_selected.columns:
-        pkg_per_order = only_selected.groupby(order_col)[paket_col].nunique().reset_index(name="Paket Sayısı")
-        dist = pkg_per_order["Paket Sayısı"].value_counts().sort_index()
         st.write("### Paket Sayısı Dağılımı (Sipariş başına)")
-        st.dataframe(dist.rename("Sipariş Sayısı").reset_index().rename(columns={"index":"Paket Sayısı"}), use_container_width=True)
+        st.dataframe(package_count_distribution(only_selected, order_col, paket_col), use_container_width=True)
     else:
         st.info("Paket sayısı dağılımı için 'Sipariş Numarası' veya 'Paket No' sütunu bulunamadı.")
 
     # Ürün bazında adetler; ürün isimleri içinde "/" ile ayrılmış çoklu ürünleri ayır
+    # (açılım bir kez yapılır, iki tablo da aynı sonucu kullanır)
     st.write("### Ürün Bazında Toplam Adet (isimleri '/' ile ayrılmış olanlar parçalanır)")
     prod_col = "Ürün Adı" if "Ürün Adı" in only_selected.columns else None
     qty_col = "Adet" if "Adet" in only_selected.columns else None
-    if prod_col and qty_col:
-        # Split product names that contain '/'
-        rows = []
-        for _, r in only_selected[[prod_col, qty_col]].dropna().iterrows():
-            name = str(r[prod_col])
-            qty = r[qty_col] if pd.notna(r[qty_col]) else 0
-            parts = [p.strip() for p in name.split("/") if p.strip()]
-            if len(parts) <= 1:
-                rows.append({"product": name, "qty": qty})
-            else:
-                # If multiple products in one cell, try to split qty evenly if possible, else keep as-is per part
-                per = qty // len(parts) if isinstance(qty, (int, float)) and qty >= len(parts) else None
-                if per:
-                    for p in parts:
-                        rows.append({"product": p, "qty": per})
-                else:
-                    # fallback: assign the whole qty to each product (user can adjust)
-                    for p in parts:
-                        rows.append({"product": p, "qty": qty})
-        pdf = pd.DataFrame(rows)
-        if not pdf.empty:
-            agg = pdf.groupby("product")["qty"].sum().reset_index().sort_values("qty", ascending=False)
+    split_df = (
+        split_multi_products(only_selected.assign(date=kargo_day), prod_col, qty_col, keep=["date"])
+        if prod_col and qty_col else None
+    )
+    if split_df is not None:
+        if not split_df.empty:
+            agg = split_df.groupby("product")["qty"].sum().reset_index().sort_values("qty", ascending=False)
             st.dataframe(agg, use_container_width=True)
-            st.download_button("Excel indir (ürün dağılım)", data=to_excel_bytes(agg), file_name="kargoya_urun_dagilim.xlsx", mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+            export_button("Excel indir (ürün dağılım)", lambda: agg, file_name="kargoya_urun_dagilim.xlsx",
+                          key="kargoya_urun_dagilim", df=df, params=(tuple(sel_dates), tuple(mapping.items())))
         else:
             st.info("Seçili tarihlerde ürün-veri bulunamadı.")
     else:
@@ -102,29 +80,13 @@ if sel_dates:
 
     # Ayrıca hangi tarihte hangi üründen kaç adet gerektiği tablosu
     st.write("### Tarih-Ürün Kırılımı")
-    if prod_col and qty_col:
-        only_selected["_date"] = only_selected[kargoya_col]  # Already converted to date above
-        # Expand product splitting similar to above, but keep date
-        rows = []
-        for _, r in only_selected[["_date", prod_col, qty_col]].dropna().iterrows():
-            name = str(r[prod_col])
-            qty = r[qty_col] if pd.notna(r[qty_col]) else 0
-            parts = [p.strip() for p in name.split("/") if p.strip()]
-            if len(parts) <= 1:
-                rows.append({"date": r["_date"], "product": name, "qty": qty})
-            else:
-                per = qty // len(parts) if isinstance(qty, (int, float)) and qty >= len(parts) else None
-                if per:
-                    for p in parts:
-                        rows.append({"date": r["_date"], "product": p, "qty": per})
-                else:
-                    for p in parts:
-                        rows.append({"date": r["_date"], "product": p, "qty": qty})
-        tdf = pd.DataFrame(rows)
-        if not tdf.empty:
-            tagg = tdf.groupby(["date", "product"]) ["qty"].sum().reset_index().sort_values(["date", "qty"], ascending=[True, False])
+    if split_df is not None:
+        if not split_df.empty:
+            tagg = split_df.groupby(["date", "product"])["qty"].sum().reset_index().sort_values(["date", "qty"], ascending=[True, False])
+            tagg["date"] = tagg["date"].dt.date
             st.dataframe(tagg, use_container_width=True, height=400)
-            st.download_button("Excel indir (tarih-ürün kırılım)", data=to_excel_bytes(tagg), file_name="kargoya_tarih_urun_kirilim.xlsx", mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+            export_button("Excel indir (tarih-ürün kırılım)", lambda: tagg, file_name="kargoya_tarih_urun_kirilim.xlsx",
+                          key="kargoya_tarih_urun", df=df, params=(tuple(sel_dates), tuple(mapping.items())))
         else:
             st.info("Tarih-ürün kırılımı için veri yok.")
     else:
@@ -2,10 +2,8 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import io
 from datetime import datetime, timedelta, date
-from matplotlib.backends.backend_pdf import PdfPages
-import matplotlib.pyplot as plt
+from utils import export_button, job_download_button, render_pdf, read_platform_csvs, BUNDLE_EXPORT_FORMATS
 
 st.set_page_config(page_title="Sipariş Analizi (Trendyol + Hepsiburada)", layout="wide")
 st.title("📦 Sipariş Birleştirici & Analiz Paneli")
@@ -40,41 +38,17 @@ def detect_source_from_name(name: str) -> str:
         return "hepsiburada"
     return "bilinmiyor"
 
-def read_csv_safely(file) -> pd.DataFrame:
-    # Hepsiburada çoğu zaman ; ile gelir. Önce ; deneriz, olmazsa , deneriz.
-    try:
-        df = pd.read_csv(file, sep=";", low_memory=False)
-        # Boş/tek kolon geldiyse alternatif dene
-        if df.shape[1] <= 1:
-            file.seek(0)
-            df = pd.read_csv(file, sep=",", low_memory=False)
-    except Exception:
-        file.seek(0)
-        df = pd.read_csv(file, sep=",", low_memory=False)
-    return df
-
-def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
-    out = pd.DataFrame()
-    for std_col, candidates in COLUMNS_MAP.items():
-        for c in candidates:
-            if c in df.columns:
-                out[std_col] = df[c]
-                break
-        # bulunamazsa oluştur
-        if std_col not in out.columns:
-            out[std_col] = np.nan
-    # tip düzeltmeleri
-    # adet
-    out["adet"] = pd.to_numeric(out["adet"], errors="coerce").fillna(0).astype(int)
-    # string kolonlar
-    for c in ["barkod", "paketno", "kargo", "kargo_no", "siparis_no", "urun", "paket"]:
-        out[c] = out[c].astype(str).str.strip()
-    return out
-
-def parse_dates_inplace(df: pd.DataFrame):
-    for col in ["siparis_tarihi", "kargo_kabul_tarihi", "teslim"]:
-        if col in df.columns:
-            df[col] = pd.to_datetime(df[col], errors="coerce", dayfirst=True).dt.date
+# Tipli kolonlar; geri kalan standart kolonlar metin olarak okunur (bkz. utils.read_platform_csv)
+INT_COLS = ["adet"]
+DATE_COLS = ["siparis_tarihi", "kargo_kabul_tarihi", "teslim"]
+
+@st.cache_resource(show_spinner="CSV dosyaları okunuyor...", max_entries=2)
+def load_uploads(file_ids: tuple, _files: list) -> pd.DataFrame:
+    # cache_resource: dosyalar değişmedikçe (tarih/filtre değişiminde) yeniden okunmaz; salt okunur kullanılmalı
+    frames = read_platform_csvs(_files, COLUMNS_MAP, int_cols=INT_COLS, date_cols=DATE_COLS)
+    for (name, _), df_norm in zip(_files, frames):
+        df_norm["kaynak"] = detect_source_from_name(name)
+    return pd.concat(frames, ignore_index=True)
 
 def kpi_metrics(df_filtered: pd.DataFrame):
     # Toplam Alışveriş (unique paket)
@@ -89,64 +63,84 @@ def kpi_metrics(df_filtered: pd.DataFrame):
     c2.metric("🛍️ Toplam Ürün (Benzersiz)", f"{toplam_urun}")
     c3.metric("📦 Toplam Adet", f"{toplam_adet:,}".replace(",", "."))
 
-def build_pdf(df_filtered: pd.DataFrame, df_daily: pd.DataFrame, df_top_urun: pd.DataFrame, chosen_date_col: str) -> bytes:
-    buf = io.BytesIO()
-    with PdfPages(buf) as pdf:
-        # Sayfa 1: KPI'lar
-        fig = plt.figure(figsize=(8.27, 11.69))  # A4 portre
-        plt.axis('off')
-        plt.text(0.5, 0.95, "Sipariş Analiz Özeti", ha='center', fontsize=18, fontweight='bold')
-        plt.text(0.5, 0.91, f"Tarih Alanı: {chosen_date_col}", ha='center', fontsize=10)
-
-        toplam_alisveris = df_filtered["paketno"].nunique()
-        toplam_urun = df_filtered["urun"].nunique()
-        toplam_adet = int(df_filtered["adet"].sum())
-
-        txt = (
-            f"Toplam Alışveriş (Paket): {toplam_alisveris}\n"
-            f"Toplam Ürün (Benzersiz): {toplam_urun}\n"
-            f"Toplam Adet: {toplam_adet}\n"
-            f"Trendyol/Hepsiburada Kırılımı:\n"
-        )
-        plt.text(0.1, 0.80, txt, va='top', fontsize=12)
-
-        if "kaynak" in df_filtered.columns:
-            brk = df_filtered.groupby("kaynak").agg(
-                paket_sayisi=("paketno", "nunique"),
-                adet=("adet", "sum")
-            ).reset_index()
-            tbl_text = "\n".join([f"- {r.kaynak}: paket={r.paket_sayisi}, adet={r.adet}" for _, r in brk.iterrows()])
-            plt.text(0.1, 0.63, tbl_text if not brk.empty else "- veri yok", va='top', fontsize=12)
-
-        pdf.savefig(fig, bbox_inches='tight')
-        plt.close(fig)
-
-        # Sayfa 2: Top 10 ürün bar
-        if not df_top_urun.empty:
-            fig = plt.figure(figsize=(11.69, 8.27))  # A4 yatay
-            top10 = df_top_urun.head(10)
-            plt.barh(top10["urun"][::-1], top10["adet_toplam"][::-1])
-            plt.title("En Çok Satan 10 Ürün (Adet)")
-            plt.xlabel("Adet")
-            plt.ylabel("Ürün")
-            plt.tight_layout()
-            pdf.savefig(fig)
-            plt.close(fig)
-
-        # Sayfa 3: Günlük satış (adet) çizgi
-        if not df_daily.empty:
-            fig = plt.figure(figsize=(11.69, 8.27))
-            plt.plot(df_daily[chosen_date_col], df_daily["adet"], marker="o")
-            plt.title("Günlere Göre Toplam Adet")
-            plt.xlabel("Tarih")
-            plt.ylabel("Adet")
-            plt.grid(True, alpha=0.3)
-            plt.tight_layout()
-            pdf.savefig(fig)
-            plt.close(fig)
-
-    buf.seek(0)
-    return buf.read()
+def _kpi_page(df_part: pd.DataFrame, title: str, subtitle: str) -> tuple:
+    toplam_alisveris = df_part["paketno"].nunique()
+    toplam_urun = df_part["urun"].nunique()
+    toplam_adet = int(df_part["adet"].sum())
+
+    txt = (
+        f"Toplam Alışveriş (Paket): {toplam_alisveris}\n"
+        f"Toplam Ürün (Benzersiz): {toplam_urun}\n"
+        f"Toplam Adet: {toplam_adet}\n"
+        f"Trendyol/Hepsiburada Kırılımı:\n"
+    )
+    blocks = [(0.80, txt)]
+    if "kaynak" in df_part.columns:
+        brk = df_part.groupby("kaynak").agg(
+            paket_sayisi=("paketno", "nunique"),
+            adet=("adet", "sum")
+        ).reset_index()
+        tbl_text = "\n".join([f"- {r.kaynak}: paket={r.paket_sayisi}, adet={r.adet}" for r in brk.itertuples()])
+        blocks.append((0.63, tbl_text if not brk.empty else "- veri yok"))
+    return ("text", {"title": title, "subtitle": subtitle, "blocks": tuple(blocks)})
+
+
+def _top10_page(df_top_urun: pd.DataFrame, title: str) -> tuple:
+    top10 = df_top_urun.head(10)
+    return ("barh", {
+        "title": title, "labels": top10["urun"].astype(str).tolist(), "values": top10["adet_toplam"].tolist(),
+        "xlabel": "Adet", "ylabel": "Ürün",
+    })
+
+
+def _plain_dates(frame: pd.DataFrame) -> pd.DataFrame:
+    """Dışa aktarımda tarih kolonlarını saatsiz (date) yazar; ekrandaki frame'e dokunmaz."""
+    cols = [c for c in DATE_COLS if c in frame.columns]
+    if not cols:
+        return frame
+    return frame.assign(**{c: frame[c].dt.date for c in cols})
+
+
+def _daily_page(df_daily: pd.DataFrame, chosen_date_col: str, title: str) -> tuple:
+    return ("line", {
+        "title": title, "x": df_daily[chosen_date_col].tolist(), "y": df_daily["adet"].tolist(),
+        "xlabel": "Tarih", "ylabel": "Adet",
+    })
+
+
+def build_pdf(
+    df_filtered: pd.DataFrame,
+    df_daily: pd.DataFrame,
+    df_top_urun: pd.DataFrame,
+    chosen_date_col: str,
+    per_source: bool = False,
+    top_products: int = 0,
+    progress=None,
+) -> bytes:
+    # Sayfalar (tür, girdi) olarak tanımlanır; girdisi önceki PDF'lerdekiyle aynı olan sayfalar
+    # yeniden çizilmez (bkz. utils.render_pdf). Arka plan işinde çalışır.
+    pages = [_kpi_page(df_filtered, "Sipariş Analiz Özeti", f"Tarih Alanı: {chosen_date_col}")]
+    if not df_top_urun.empty:
+        pages.append(_top10_page(df_top_urun, "En Çok Satan 10 Ürün (Adet)"))
+    if not df_daily.empty:
+        pages.append(_daily_page(df_daily, chosen_date_col, "Günlere Göre Toplam Adet"))
+
+    # Kaynak bazlı sayfalar: her kaynak için KPI + en çok satanlar
+    if per_source and "kaynak" in df_filtered.columns:
+        for src, part in df_filtered.groupby("kaynak", sort=True):
+            pages.append(_kpi_page(part, f"Sipariş Analiz Özeti — {src}", f"Tarih Alanı: {chosen_date_col}"))
+            top_src = part.groupby("urun", as_index=False).agg(adet_toplam=("adet", "sum")).sort_values("adet_toplam", ascending=False)
+            pages.append(_top10_page(top_src, f"En Çok Satan 10 Ürün (Adet) — {src}"))
+
+    # Ürün bazlı sayfalar: en çok satan N ürünün günlük adedi
+    if top_products and not df_top_urun.empty:
+        urunler = df_top_urun["urun"].head(int(top_products)).tolist()
+        sel = df_filtered[df_filtered["urun"].isin(urunler)]
+        by_day = sel.groupby(["urun", chosen_date_col], as_index=False).agg(adet=("adet", "sum"))
+        for urun, part in by_day.groupby("urun", sort=False):
+            pages.append(_daily_page(part, chosen_date_col, f"Günlere Göre Toplam Adet — {urun}"))
+
+    return render_pdf(pages, progress=progress)
 
 # -----------------------------
 # Sidebar: Yükleme & Kontroller
@@ -189,19 +183,8 @@ if start_date > end_date:
 # -----------------------------
 # Veri Yükleme & Birleştirme
 # -----------------------------
-all_rows = []
-
 if uploaded:
-    for uf in uploaded:
-        src = detect_source_from_name(uf.name)
-        df_raw = read_csv_safely(uf)
-        df_norm = normalize_columns(df_raw)
-        parse_dates_inplace(df_norm)
-        df_norm["kaynak"] = src
-        all_rows.append(df_norm)
-
-if all_rows:
-    df = pd.concat(all_rows, ignore_index=True)
+    df = load_uploads(tuple(uf.file_id for uf in uploaded), [(uf.name, uf.getvalue()) for uf in uploaded])
 
     # Tarih filtresi
     if date_col_choice not in df.columns:
@@ -213,7 +196,8 @@ if all_rows:
     # sadece tarih değeri olan satırlar
     df = df[~df[effective_date_col].isna()].copy()
 
-    mask = (df[effective_date_col] >= start_date) & (df[effective_date_col] <= end_date)
+    # Tarihler gün bazında datetime64: vektörel karşılaştırma
+    mask = (df[effective_date_col] >= pd.Timestamp(start_date)) & (df[effective_date_col] <= pd.Timestamp(end_date))
     df_filtered = df.loc[mask].copy()
 
     # Paket özelinde unique (ilk görülen)
@@ -267,34 +251,48 @@ if all_rows:
         with st.expander("🏷️ Ürün Özet (Adet)"):
             st.dataframe(top_urun, use_container_width=True)
 
-        # İndirme: Excel
-        xbuf = io.BytesIO()
-        with pd.ExcelWriter(xbuf, engine="xlsxwriter") as writer:
-            df_filtered.to_excel(writer, index=False, sheet_name="satirlar")
-            dfg.to_excel(writer, index=False, sheet_name="paketler")
-            daily.to_excel(writer, index=False, sheet_name="gunluk_ozet")
-            top_urun.to_excel(writer, index=False, sheet_name="urun_ozet")
-            by_src.to_excel(writer, index=False, sheet_name="kaynak_ozet")
-        xbuf.seek(0)
-        st.download_button(
-            label="⬇️ Excel indir",
-            data=xbuf.getvalue(),
+        # İndirme: Excel (istenince üretilir; satır sınırını aşan sheet'ler bölünür) veya zip
+        export_button(
+            "⬇️ Excel indir",
+            lambda: {
+                "satirlar": _plain_dates(df_filtered),
+                "paketler": _plain_dates(dfg),
+                "gunluk_ozet": _plain_dates(daily),
+                "urun_ozet": top_urun,
+                "kaynak_ozet": by_src,
+            },
             file_name=f"siparis_analiz_{start_date}_{end_date}.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            key="platform_analiz",
+            fingerprint="|".join(uf.file_id for uf in uploaded),
+            params=(effective_date_col, start_date, end_date),
+            formats=BUNDLE_EXPORT_FORMATS,
         )
 
-        # İndirme: PDF (KPI + 2 grafik)
-        pdf_bytes = build_pdf(
-            df_filtered=df_filtered,
-            df_daily=daily.rename(columns={effective_date_col: "tarih"}).rename(columns={"tarih": effective_date_col}),
-            df_top_urun=top_urun,
-            chosen_date_col=effective_date_col
-        )
-        st.download_button(
-            label="⬇️ PDF indir (KPI + Grafikler)",
-            data=pdf_bytes,
+        # İndirme: PDF (KPI + 2 grafik, isteğe bağlı kaynak/ürün sayfaları) — arka plan işi
+        pc1, pc2 = st.columns(2)
+        with pc1:
+            pdf_per_source = st.checkbox("PDF'e kaynak bazlı sayfalar ekle", value=False)
+        with pc2:
+            pdf_top_products = st.number_input("PDF'e ürün bazlı sayfa (en çok satan N ürün)", min_value=0, max_value=100, value=0, step=1)
+        df_daily_pdf = daily.rename(columns={effective_date_col: "tarih"}).rename(columns={"tarih": effective_date_col})
+        job_download_button(
+            "⬇️ PDF indir (KPI + Grafikler)",
+            lambda update: build_pdf(
+                df_filtered=df_filtered,
+                df_daily=df_daily_pdf,
+                df_top_urun=top_urun,
+                chosen_date_col=effective_date_col,
+                per_source=pdf_per_source,
+                top_products=pdf_top_products,
+                progress=update,
+            ),
             file_name=f"siparis_ozet_{start_date}_{end_date}.pdf",
-            mime="application/pdf"
+            key="platform_pdf",
+            job_key=(
+                "platform_pdf", "|".join(uf.file_id for uf in uploaded), effective_date_col, start_date, end_date,
+                pdf_per_source, pdf_top_products,
+            ),
+            mime="application/pdf",
         )
 
     else:
@@ -3,8 +3,9 @@ import streamlit as st
 import pandas as pd
 import pydeck as pdk
 from utils import (
-    get_df, build_full_address, geocode_unique_addresses, geocode_il_ilce, PRODUCT_COL, QTY_COL,
-    ORDER_COL, BUYER_COL, to_excel_bytes, prepare_page_df
+    get_df, unique_il_ilce, geocode_unique_addresses, geocode_il_ilce, geocode_progress, PRODUCT_COL, QTY_COL,
+    ORDER_COL, BUYER_COL, prepare_page_df, export_button, dataset_fingerprint,
+    product_pair_qty, map_points, spatial_bins, lod_cell_km, MAP_CELL_PIXELS
 )
 
 st.set_page_config(page_title="Harita — Ürün Bazlı", layout="wide")
@@ -26,68 +27,102 @@ use_fields = [c for c in ["İl", "İlçe"] if c in df.columns]
 if len(use_fields) < 1:
     st.error("Veride 'İl' veya 'İlçe' sütunu bulunamadı.")
     st.stop()
-addr_series = build_full_address(df, use_fields)
 
 # Ürün filtresi (çok seçim)
 products = sorted(df[PRODUCT_COL].dropna().astype(str).unique())
 sel_products = st.multiselect("Ürün(ler) seç (haritaya yansır)", products, default=products[:1])
 
-# Veriyi filtrele ve konumları oluştur
-fdf = df[df[PRODUCT_COL].isin(sel_products)].copy()
-fdf["__il__"] = fdf[[c for c in ["İl", "İlçe"] if c in fdf.columns][0]] if "İl" in fdf.columns else None
-fdf["__ilce__"] = fdf[[c for c in ["İlçe", "İl"] if c in fdf.columns][0]] if "İlçe" in fdf.columns else None
-
-# Tekilleştirilen il-ilçe çiftleri
-pairs = sorted(set([(str(x).strip(), str(y).strip()) for x, y in zip(fdf["İl"].fillna(""), fdf["İlçe"].fillna("")) if str(x).strip() or str(y).strip()]))
-cap = st.number_input("En fazla kaç benzersiz il-ilçe geocode edilsin?", min_value=10, max_value=20000, value=min(1000, len(pairs)))
-pairs = pairs[:cap]
+# Seçili ürünlerin il-ilçe toplamları (ürün başına cache'li); tekil çiftler bu özetten çıkarılır
+pair_qty = product_pair_qty(df, sel_products)
+pairs = unique_il_ilce(pair_qty["il"], pair_qty["ilce"])
+cap = st.number_input("En fazla kaç benzersiz il-ilçe geocode edilsin?", min_value=1, max_value=20000, value=max(1, min(1000, len(pairs))))
+pairs = pairs.iloc[:cap]
 
 provider = st.selectbox("Geocode sağlayıcı", options=["ArcGIS", "Nominatim"], index=0, help="ArcGIS genelde daha stabil ve hızlıdır. Nominatim halka açık ve limitlidir.")
 
-if st.button("İl-İlçe Koordinatlarını Al (Cache kullanılır)"):
-    geo_pairs = geocode_il_ilce(pairs, provider=provider)
-    st.session_state["__GEO_CACHE__"] = geo_pairs
-
-geo_pairs = st.session_state.get("__GEO_CACHE__")
-if isinstance(geo_pairs, pd.DataFrame) and not geo_pairs.empty:
-    # Join ile koordinatları satırlara bağla: önce il-ilçe -> lat/lon
-    geo_pairs = geo_pairs.dropna(subset=["lat", "lon"])  # koordinatı olmayanları at
-    gdf = fdf.merge(geo_pairs, left_on=["İl", "İlçe"], right_on=["il", "ilce"], how="left")
-    gdf = gdf.dropna(subset=["lat", "lon"])  # koordinatı olmayanları at
+if st.button("Eşleşmeyen İl-İlçeleri Çevrimiçi Bul (Cache kullanılır)"):
+    bar = st.progress(0.0, text="Koordinatlar alınıyor...")
+    geocode_il_ilce(pairs, provider=provider, progress=geocode_progress(bar))
+    bar.empty()
 
-    st.success(f"Haritada gösterilecek satır: {len(gdf):,}")
+# Uygulamayla gelen il/ilçe tablosu + yerel cache: ağ gerekmez, her rerun'da anında
+geo_pairs = geocode_il_ilce(pairs, provider=provider, online=False)
+n_missing = int(geo_pairs["lat"].isna().sum())
+if n_missing:
+    st.caption(f"{n_missing:,} il-ilçe çevrimdışı tabloda ve cache'te bulunamadı; yukarıdaki butonla çevrimiçi aranabilir.")
+if not geo_pairs.dropna(subset=["lat", "lon"]).empty:
+    # Ürün başına il-ilçe toplamları (ürün başına cache'li) + koordinatlar: adres+ürün başına bir nokta
+    agg = map_points(pair_qty, geo_pairs)
+    st.success(f"Haritada gösterilecek satır: {int(agg['Satır'].sum()):,}")
 
-    # Ürün bazında adetleri toplayıp nokta yarıçapını ölçekle
-    # (Aynı adres+ürün için toplanmış nokta)
-    agg = (
-        gdf.groupby(["address", "lat", "lon", PRODUCT_COL])[QTY_COL]
-        .sum()
-        .reset_index(name="Toplam Adet")
-    )
+    # Gösterim: noktalar ürün bazlı; altıgen/ızgara/ısı haritası hücrelerde toplanmış adet
+    c1, c2 = st.columns([2, 1])
+    mode = c1.radio("Gösterim", ["Nokta (ürün bazlı)", "Altıgen", "Kare ızgara", "Isı haritası"], horizontal=True)
+    zoom = c2.slider("Yakınlaştırma / detay", min_value=4, max_value=11, value=5,
+                     help="Hücre boyutu bu seviyeye göre seçilir: uzakta kaba, yakında ince.")
+    center_lat, center_lon = float(agg["lat"].mean()), float(agg["lon"].mean())
+    cell_km = lod_cell_km(zoom, center_lat)
 
-    # PyDeck gösterim
-    layer = pdk.Layer(
-        "ScatterplotLayer",
-        data=agg,
-        get_position="[lon, lat]",
-        get_radius="100 + 20 * sqrt(Toplam Adet)",
-        radius_min_pixels=3,
-        radius_max_pixels=60,
-        pickable=True,
-        auto_highlight=True,
-    )
+    pitch = 0
+    tooltip = {"text": "{Toplam Adet} adet"}
+    if mode == "Nokta (ürün bazlı)":
+        layer = pdk.Layer(
+            "ScatterplotLayer",
+            data=agg,
+            get_position="[lon, lat]",
+            get_radius="100 + 20 * sqrt(Toplam Adet)",
+            radius_min_pixels=3,
+            radius_max_pixels=60,
+            pickable=True,
+            auto_highlight=True,
+        )
+        tooltip = {"text": "{address}\n" + PRODUCT_COL + ": {" + PRODUCT_COL + "}\n{Toplam Adet} adet"}
+    elif mode == "Isı haritası":
+        # Hücre boyutunun çeyreğinde ızgara: ısı haritası için yeterince ince, yine de küçük veri
+        cells = spatial_bins(agg, cell_km / 4, shape="grid")
+        layer = pdk.Layer(
+            "HeatmapLayer",
+            data=cells,
+            get_position="[lon, lat]",
+            get_weight="Toplam Adet",
+            radius_pixels=MAP_CELL_PIXELS,
+        )
+    else:
+        hexagon = mode == "Altıgen"
+        cells = spatial_bins(agg, cell_km, shape="hex" if hexagon else "grid")
+        cells["Oran"] = cells["Toplam Adet"] / max(float(cells["Toplam Adet"].max()), 1.0)
+        layer = pdk.Layer(
+            "ColumnLayer",
+            data=cells,
+            get_position="[lon, lat]",
+            get_elevation="Oran",
+            elevation_scale=cell_km * 1000 * 4,
+            # Altıgen: köşe-merkez uzaklığı; kare: 4 köşeli disk, 45° döndürülmüş (yarı köşegen)
+            radius=cell_km * 1000 if hexagon else cell_km * 1000 / 2 ** 0.5,
+            disk_resolution=6 if hexagon else 4,
+            angle=0 if hexagon else 45,
+            coverage=0.9,
+            extruded=True,
+            get_fill_color="[255, 160 - 140 * Oran, 40, 200]",
+            pickable=True,
+            auto_highlight=True,
+        )
+        tooltip = {"text": "{Toplam Adet} adet ({Nokta} nokta)"}
+        pitch = 40
 
-    view_state = pdk.ViewState(latitude=float(agg["lat"].mean()), longitude=float(agg["lon"].mean()), zoom=5)
-    deck = pdk.Deck(layers=[layer], initial_view_state=view_state, map_style="mapbox://styles/mapbox/light-v9")
+    view_state = pdk.ViewState(latitude=center_lat, longitude=center_lon, zoom=zoom, pitch=pitch)
+    deck = pdk.Deck(layers=[layer], initial_view_state=view_state, map_style="mapbox://styles/mapbox/light-v9", tooltip=tooltip)
     st.pydeck_chart(deck)
 
     # Excel indir (koordinatlı veri)
-    st.download_button(
+    export_button(
         "Excel indir (koordinatlı veri)",
-        data=to_excel_bytes(agg),
+        lambda: agg.drop(columns=["Satır"]),
         file_name="koordinatli_urun_verisi.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        key="harita",
+        df=df,
+        params=(tuple(sel_products), dataset_fingerprint(geo_pairs), tuple(mapping.items())),
     )
 else:
-    st.info("Koordinat üretmek için 'Adresleri Koordinata Çevir' butonunu kullanın.")
+    st.info("Seçili ürünlerin il-ilçeleri çevrimdışı tabloda bulunamadı; çevrimiçi bulmak için butonu kullanın.")
 
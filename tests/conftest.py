@@ -0,0 +1,7 @@
+# Testler depo kökündeki utils modülünü doğrudan içe aktarır.
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+logging.disable(logging.WARNING)  # streamlit'in "No runtime found" uyarıları
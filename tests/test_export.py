@@ -0,0 +1,101 @@
+# Dışa aktarma katmanı: Excel satır sınırında sheet bölme ve her biçimin geri okunabilmesi.
+import gzip
+import io
+import zipfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import utils
+from utils import export_bytes
+
+
+def _frame(n: int = 10) -> pd.DataFrame:
+    return pd.DataFrame({
+        "Sipariş Numarası": np.arange(1000, 1000 + n),
+        "Alıcı": pd.Categorical([f"Çağrı Işık {i % 3}" for i in range(n)]),
+        "Ürün Adı": [f"Ürün, \"{i}\"\nsatır" if i % 4 == 0 else f"Ürün {i}" for i in range(n)],
+        "Tutar": [1234.56 if i % 3 else np.nan for i in range(n)],
+        "Sipariş Tarihi": [pd.Timestamp("2024-01-01") + pd.Timedelta(days=i) if i % 5 else pd.NaT for i in range(n)],
+    })
+
+
+def _same_values(got: pd.DataFrame, expected: pd.DataFrame):
+    pd.testing.assert_frame_equal(
+        got.reset_index(drop=True), expected.reset_index(drop=True), check_dtype=False, check_categorical=False,
+    )
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    # Dilimleme yolları küçük veriyle de çalışsın
+    monkeypatch.setattr(utils, "EXPORT_CHUNK_ROWS", 3)
+
+
+@pytest.mark.parametrize("engine", ["xlsxwriter", "openpyxl"])
+def test_xlsx_splits_sheets_at_row_limit(monkeypatch, engine):
+    monkeypatch.setattr(utils, "EXCEL_MAX_ROWS", 4)  # başlık + 3 satır
+    monkeypatch.setattr(utils, "excel_writer_engine", lambda: engine)
+    df = _frame(10)
+    long_name = "Çok Uzun Bir Sayfa Adı Otuz Bir Karakteri Aşar"
+    data = export_bytes({"Detay": df, long_name: df.head(2)}, "xlsx")
+
+    sheets = pd.read_excel(io.BytesIO(data), sheet_name=None)
+    detail = [n for n in sheets if n.startswith("Detay_")]
+    assert detail == ["Detay_1", "Detay_2", "Detay_3", "Detay_4"]
+    assert [len(sheets[n]) for n in detail] == [3, 3, 3, 1]
+    assert all(len(n) <= 31 for n in sheets)
+    assert long_name[:31] in sheets  # sınırı aşmayan tablo bölünmez
+
+    got = pd.concat([sheets[n] for n in detail], ignore_index=True)
+    _same_values(got, df.assign(Alıcı=df["Alıcı"].astype(str)))
+
+
+def test_xlsx_single_frame_within_limit():
+    df = _frame(5)
+    sheets = pd.read_excel(io.BytesIO(export_bytes(df, "xlsx")), sheet_name=None)
+    assert list(sheets) == ["Sheet1"]
+    _same_values(sheets["Sheet1"], df.assign(Alıcı=df["Alıcı"].astype(str)))
+
+
+def _csv_expected(df: pd.DataFrame) -> pd.DataFrame:
+    # CSV'den geri okunduğunda tarihler metin olarak gelir
+    return df.assign(Alıcı=df["Alıcı"].astype(str), **{"Sipariş Tarihi": df["Sipariş Tarihi"].astype(str).replace("NaT", np.nan)})
+
+
+def test_csv_gz_round_trip():
+    df = _frame(10)
+    with gzip.open(io.BytesIO(export_bytes(df, "csv.gz")), "rb") as fh:
+        got = pd.read_csv(fh, encoding="utf-8-sig")
+    _same_values(got, _csv_expected(df))
+
+
+def test_parquet_round_trip():
+    df = _frame(10)
+    got = pd.read_parquet(io.BytesIO(export_bytes(df, "parquet")))
+    _same_values(got, df)
+
+
+def test_zip_round_trip_one_csv_per_table():
+    tables = {"Özet/2024": _frame(4), "Detay": _frame(10)}
+    with zipfile.ZipFile(io.BytesIO(export_bytes(tables, "zip"))) as zf:
+        assert sorted(zf.namelist()) == ["Detay.csv", "Özet_2024.csv"]
+        for name, df in [("Özet_2024.csv", tables["Özet/2024"]), ("Detay.csv", tables["Detay"])]:
+            with zf.open(name) as fh:
+                _same_values(pd.read_csv(fh, encoding="utf-8-sig"), _csv_expected(df))
+
+
+@pytest.mark.parametrize("fmt", ["xlsx", "csv.gz", "parquet", "zip"])
+def test_progress_reaches_one(fmt):
+    seen = []
+    export_bytes(_frame(10), fmt, progress=seen.append)
+    assert seen and seen[-1] == pytest.approx(1.0)
+    assert seen == sorted(seen)
+
+
+def test_single_table_formats_reject_bundles():
+    with pytest.raises(ValueError):
+        export_bytes({"a": _frame(2), "b": _frame(2)}, "csv.gz")
+    with pytest.raises(ValueError):
+        export_bytes(_frame(2), "pdf")
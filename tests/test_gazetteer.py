@@ -0,0 +1,31 @@
+# Çevrimdışı il/ilçe gazetteer'ı: Merkez ve adlı ilçeler çözülür, bilinmeyenler boş kalır
+# (bunlar çevrimiçi sağlayıcıya bırakılır).
+import pandas as pd
+
+from utils import GAZETTEER_PATH, load_gazetteer, resolve_il_ilce_offline
+
+
+def test_resolves_merkez_named_and_unknown():
+    pairs = pd.DataFrame({
+        "il": ["ISPARTA", "Isparta ", "ısparta", "Isparta", "Atlantis", "Adana"],
+        "ilce": ["Merkez", "EĞİRDİR", "", "Yokköy", "Merkez", "Sarıçam"],
+    })
+    out = resolve_il_ilce_offline(pairs)
+
+    assert out[["il", "ilce"]].to_dict("list") == pairs.to_dict("list")
+    assert (out.loc[0, "lat"], out.loc[0, "lon"]) == (37.76667, 30.55)
+    assert out.loc[0, "address"] == "Isparta, Türkiye"
+    assert (out.loc[1, "lat"], out.loc[1, "lon"]) == (37.87462, 30.85042)
+    assert out.loc[1, "address"] == "Eğirdir, Isparta, Türkiye"
+    assert out.loc[2, "lat"] == out.loc[0, "lat"]  # ilçesiz satır il merkezi
+    # Bilinmeyen ilçe/il ve tabloda olmayan (kapsam dışı) ilçe çözülmez
+    assert out.loc[3:, ["lat", "lon", "address"]].isna().all().all()
+
+
+def test_header_states_coverage():
+    header = GAZETTEER_PATH.read_text(encoding="utf-8").splitlines()[:3]
+    coverage = next(line for line in header if "kapsamı" in line)
+    found, total = coverage.split(":")[1].split(";")[0].strip().split("/")
+    gz = load_gazetteer()
+    assert int(total) == 973
+    assert (gz["ilce"] != "").sum() <= int(found) <= int(total)
@@ -0,0 +1,85 @@
+# SQLite geocode cache: kayıt ömürleri (olumsuz kayıtlar daha kısa) ve normalize anahtarlar.
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+import utils
+from utils import (
+    GEO_CACHE_TTL, GEO_NEGATIVE_TTL, geo_cache_lookup, geo_cache_store, geo_key_series, geo_pair_key,
+    geocode_unique_addresses, get_cached_coords_bulk, set_cached_coords_bulk,
+)
+
+
+class Clock:
+    def __init__(self, now: float = 1_700_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils, "DB_PATH", tmp_path / "geo.sqlite")
+    clock = Clock()
+    monkeypatch.setattr(utils.time, "time", clock)
+    return clock
+
+
+def test_negative_entry_expires_before_positive(clock):
+    geo_cache_store([
+        ("ankara|cankaya", "Ankara", "Çankaya", "Çankaya, Ankara", 39.9, 32.86),
+        ("yok|yok", "Yok", "Yok", None, None, None),
+    ], "ArcGIS")
+    assert geo_cache_lookup(["ankara|cankaya", "yok|yok"], "ArcGIS") == {
+        "ankara|cankaya": (39.9, 32.86, "Çankaya, Ankara"),
+        "yok|yok": None,  # "bulunamadı" da cache'ten gelir
+    }
+
+    clock.now += GEO_NEGATIVE_TTL - 1
+    assert "yok|yok" in geo_cache_lookup(["yok|yok"], "ArcGIS")
+
+    clock.now += 2
+    hits = geo_cache_lookup(["ankara|cankaya", "yok|yok"], "ArcGIS")
+    assert hits == {"ankara|cankaya": (39.9, 32.86, "Çankaya, Ankara")}
+
+    clock.now += GEO_CACHE_TTL
+    assert geo_cache_lookup(["ankara|cankaya"], "ArcGIS") == {}
+
+
+def test_entries_are_per_provider(clock):
+    geo_cache_store([("ankara|cankaya", "Ankara", "Çankaya", "a", 39.9, 32.86)], "ArcGIS")
+    assert geo_cache_lookup(["ankara|cankaya"], "Nominatim") == {}
+
+
+def test_spelling_variants_share_a_key():
+    variants = pd.Series(["İSTANBUL / Kadıköy ", "istanbul/kadıköy", "Istanbul - KADIKOY"])
+    assert geo_key_series(variants).nunique() == 1
+
+    il = pd.Series(["İSTANBUL ", "istanbul", "Ankara", "ANKARA"])
+    ilce = pd.Series(["Kadıköy ", "KADIKOY", "Merkez", "ankara"])
+    assert geo_pair_key(il, ilce).tolist() == ["istanbul|kadikoy", "istanbul|kadikoy", "ankara|", "ankara|"]
+
+
+def test_pair_written_in_one_spelling_hits_in_another(clock):
+    set_cached_coords_bulk([("İSTANBUL ", "Kadıköy ", "Kadıköy, İstanbul", 40.99, 29.03)], "ArcGIS")
+    hits = get_cached_coords_bulk([("istanbul", "KADIKOY"), ("İstanbul", "Üsküdar")], "ArcGIS")
+    assert hits == {("istanbul", "KADIKOY"): (40.99, 29.03, "Kadıköy, İstanbul")}
+
+
+def test_address_variants_are_geocoded_once(clock):
+    calls = []
+
+    def fake(query):
+        calls.append(query)
+        return SimpleNamespace(latitude=40.99, longitude=29.03, address=query)
+
+    out = geocode_unique_addresses(
+        ["İSTANBUL / Kadıköy ", "istanbul/kadıköy"], geocoders={"ArcGIS": fake}, max_workers=1,
+    )
+    assert len(calls) == 1
+    assert out["lat"].tolist() == [40.99, 40.99]
+
+    offline = geocode_unique_addresses(["Istanbul / KADIKOY"], online=False)
+    assert offline["lat"].tolist() == [40.99] and offline["source"].tolist() == ["cache"]
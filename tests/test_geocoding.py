@@ -0,0 +1,186 @@
+# Geocoding motoru: token kovası, yeniden deneme/backoff ve geocode_many, ağsız sahte sağlayıcıyla.
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import utils
+from utils import _GEOCODE_FAILED, TokenBucket, _geocode_one, _geocode_pending, geo_cache_lookup, geocode_many
+
+
+class FakeClock:
+    """Sahte saat: sleep beklemez, saati ileri alır ve beklemeleri kaydeder."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+        self._lock = threading.Lock()
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        with self._lock:
+            self.sleeps.append(seconds)
+            self.now += seconds
+
+
+class RateLimited(TimeoutError):
+    def __init__(self, retry_after):
+        super().__init__("sahte hız sınırı")
+        self.retry_after = retry_after
+
+
+class FakeGeocoder:
+    """Sorgu → yanıt listesi; liste elemanı exception ise fırlatılır, değilse döndürülür."""
+
+    def __init__(self, script: dict, latency: float = 0.0):
+        self.script = {q: list(steps) for q, steps in script.items()}
+        self.latency = latency
+        self.calls = []
+
+    def __call__(self, query: str):
+        self.calls.append(query)
+        time.sleep(self.latency)
+        steps = self.script.get(query)
+        step = steps.pop(0) if steps and len(steps) > 1 else (steps[0] if steps else None)
+        if isinstance(step, BaseException):
+            raise step
+        return step
+
+
+def loc(lat: float, lon: float, address: str = "adres"):
+    return SimpleNamespace(latitude=lat, longitude=lon, address=address)
+
+
+def free_bucket() -> TokenBucket:
+    # Testin konusu olmayan hız sınırı beklemesi üretmez
+    return TokenBucket(rate=1e9, burst=1000, clock=FakeClock())
+
+
+def test_bucket_burst_then_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, burst=3, clock=clock, sleep=clock.sleep)
+    for _ in range(3):
+        bucket.acquire()
+    assert clock.sleeps == []  # burst kadar istek beklemeden geçer
+
+    for _ in range(4):
+        bucket.acquire()
+    assert clock.sleeps == pytest.approx([0.5] * 4)  # sonra saniyede rate istek
+    assert clock.now == pytest.approx(2.0)
+
+
+def test_bucket_does_not_accumulate_beyond_burst():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1.0, burst=2, clock=clock, sleep=clock.sleep)
+    clock.now += 100
+    for _ in range(3):
+        bucket.acquire()
+    assert clock.sleeps == pytest.approx([1.0])
+
+
+def test_retry_with_exponential_backoff():
+    clock = FakeClock()
+    fake = FakeGeocoder({"Kadıköy": [TimeoutError(), TimeoutError(), loc(40.99, 29.03, "Kadıköy, İstanbul")]})
+    res = _geocode_one(fake, "Kadıköy", free_bucket(), retries=3, backoff=0.5, sleep=clock.sleep)
+    assert res == (40.99, 29.03, "Kadıköy, İstanbul")
+    assert clock.sleeps == [0.5, 1.0]
+    assert len(fake.calls) == 3
+
+
+def test_retry_after_is_honored():
+    clock = FakeClock()
+    fake = FakeGeocoder({"Çankaya": [RateLimited(retry_after=7), loc(39.9, 32.86)]})
+    res = _geocode_one(fake, "Çankaya", free_bucket(), retries=3, backoff=0.5, sleep=clock.sleep)
+    assert res[:2] == (39.9, 32.86)
+    assert clock.sleeps == [7]
+
+
+def test_retries_exhausted_fail():
+    clock = FakeClock()
+    fake = FakeGeocoder({"x": [TimeoutError()]})
+    assert _geocode_one(fake, "x", free_bucket(), retries=2, backoff=1.0, sleep=clock.sleep) is _GEOCODE_FAILED
+    assert len(fake.calls) == 3
+    assert clock.sleeps == [1.0, 2.0]
+
+
+def test_non_retryable_error_fails_without_retry():
+    clock = FakeClock()
+    fake = FakeGeocoder({"x": [ValueError("bozuk yanıt")]})
+    assert _geocode_one(fake, "x", free_bucket(), retries=3, backoff=1.0, sleep=clock.sleep) is _GEOCODE_FAILED
+    assert len(fake.calls) == 1
+    assert clock.sleeps == []
+
+
+def test_not_found_is_none():
+    fake = FakeGeocoder({})
+    assert _geocode_one(fake, "yok", free_bucket(), retries=3, backoff=1.0) is None
+
+
+def test_geocode_many_leaves_out_failed_queries():
+    clock = FakeClock()
+    fake = FakeGeocoder({
+        "ok": [loc(41.0, 29.0, "Ok")],
+        "flaky": [TimeoutError(), loc(38.4, 27.1)],
+        "down": [ValueError("sağlayıcı hatası")],
+        "timeout": [TimeoutError()],
+    })
+    progress = []
+    res = geocode_many(
+        ["ok", "flaky", "down", "yok", "timeout", "ok", "", None, "  "],
+        geocode=fake, max_workers=1, retries=1, backoff=0.25,
+        bucket=free_bucket(), sleep=clock.sleep, progress=lambda done, total: progress.append((done, total)),
+    )
+    assert res == {"ok": (41.0, 29.0, "Ok"), "flaky": (38.4, 27.1, "adres"), "yok": None}
+    assert sorted(fake.calls).count("ok") == 1  # tekilleştirildi
+    assert progress[-1] == (5, 5)
+    assert [d for d, _ in progress] == [1, 2, 3, 4, 5]
+
+
+def test_geocode_many_applies_bucket_to_every_request():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1.0, burst=1, clock=clock, sleep=clock.sleep)
+    fake = FakeGeocoder({q: [loc(1.0, 2.0)] for q in "abcd"})
+    res = geocode_many(list("abcd"), geocode=fake, max_workers=1, bucket=bucket, sleep=clock.sleep)
+    assert set(res) == set("abcd")
+    assert clock.sleeps == pytest.approx([1.0] * 3)
+
+
+class Rerun(Exception):
+    """Streamlit'in progress içinden fırlayan rerun istisnasının yerine."""
+
+
+def _stop_after(n: int):
+    def progress(done: int, total: int):
+        if done >= n:
+            raise Rerun()
+    return progress
+
+
+def test_geocode_many_interrupted_cancels_queue_and_keeps_finished():
+    fake = FakeGeocoder({q: [loc(1.0, 2.0, q)] for q in map(str, range(50))}, latency=0.02)
+    found = {}
+    with pytest.raises(Rerun):
+        geocode_many(
+            [str(i) for i in range(50)], geocode=fake, max_workers=1,
+            bucket=free_bucket(), progress=_stop_after(2), results=found,
+        )
+    assert len(fake.calls) <= 3  # kuyruktakiler sorulmadı
+    assert {"0", "1"} <= set(found) and set(found) <= set(fake.calls)
+
+
+def test_interrupted_chunk_is_persisted(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils, "DB_PATH", tmp_path / "geo.sqlite")
+    fake = FakeGeocoder({f"q{i}": [loc(40.0 + i, 30.0, f"q{i}")] for i in range(20)}, latency=0.02)
+    pending = {f"k{i}": (f"q{i}", "il", f"ilce{i}") for i in range(20)}
+    with pytest.raises(Rerun):
+        _geocode_pending(
+            pending, "ArcGIS", online=True, geocoders={"ArcGIS": fake},
+            max_workers=1, progress=_stop_after(3),
+        )
+    cached = geo_cache_lookup(list(pending), "ArcGIS")
+    assert {"k0", "k1", "k2"} <= set(cached)
+    assert cached["k1"][:2] == (41.0, 30.0)
+    assert len(cached) == len(fake.calls)
@@ -0,0 +1,71 @@
+# ORDER_COL verisine göre int64 (tamamı sayısal) ya da category (alfanümerik) olur
+# (bkz. compact_dtypes); sayfa agregasyonları iki durumda da aynı sonucu vermeli.
+import pandas as pd
+import pytest
+
+import utils
+from utils import BUYER_COL, ORDER_COL, PRODUCT_COL, QTY_COL, compact_dtypes, package_count_distribution
+
+ORDERS = [101, 101, 102, 103, 103, 103, 104]
+
+
+def _frame(orders) -> pd.DataFrame:
+    return compact_dtypes(pd.DataFrame({
+        ORDER_COL: orders,
+        BUYER_COL: ["a", "a", "b", "c", "c", "c", "a"],
+        PRODUCT_COL: ["x", "y", "x", "x", "y", "z", "x"],
+        QTY_COL: [1, 2, 1, 1, 1, 1, 4],
+        "Paket No": ["p1", "p2", "p3", "p4", "p4", "p5", "p6"],
+    }))
+
+
+@pytest.fixture(params=["numeric", "alphanumeric"])
+def orders_df(request):
+    if request.param == "numeric":
+        df = _frame(ORDERS)
+        assert df[ORDER_COL].dtype == "int64"
+    else:
+        df = _frame([f"TY{o}" for o in ORDERS])
+        assert isinstance(df[ORDER_COL].dtype, pd.CategoricalDtype)
+    return df
+
+
+def _order_text(df: pd.DataFrame) -> pd.DataFrame:
+    return df.assign(**{ORDER_COL: df[ORDER_COL].astype(str).str.removeprefix("TY")})
+
+
+def test_package_distribution_on_subset(orders_df):
+    selected = orders_df[orders_df[ORDER_COL].astype(str).str.endswith("103")]
+    dist = package_count_distribution(selected)
+    assert dist.to_dict("records") == [{"Paket Sayısı": 2, "Sipariş Sayısı": 1}]
+
+
+def test_package_distribution_full(orders_df):
+    dist = package_count_distribution(orders_df)
+    assert dist.to_dict("records") == [
+        {"Paket Sayısı": 1, "Sipariş Sayısı": 2},
+        {"Paket Sayısı": 2, "Sipariş Sayısı": 2},
+    ]
+
+
+def test_aggregations_match_between_dtypes():
+    numeric = _frame(ORDERS)
+    alpha = _frame([f"TY{o}" for o in ORDERS])
+    for fn in (utils.buyer_summary, utils.buyers_over_total_qty):
+        pd.testing.assert_frame_equal(fn(numeric), fn(alpha))
+    pd.testing.assert_frame_equal(
+        _order_text(utils.orders_with_many_products(numeric)),
+        _order_text(utils.orders_with_many_products(alpha)),
+    )
+    pd.testing.assert_frame_equal(
+        utils.same_product_across_distinct_orders(numeric, ["x", "y"]),
+        utils.same_product_across_distinct_orders(alpha, ["x", "y"]),
+    )
+
+
+def test_aggregations_on_filtered_categorical():
+    alpha = _frame([f"TY{o}" for o in ORDERS])
+    sub = alpha[alpha[BUYER_COL] == "a"]
+    res = utils.orders_with_many_products(sub)
+    assert res[ORDER_COL].astype(str).tolist() == ["TY101", "TY104"]
+    assert res["Farklı Ürün Sayısı"].tolist() == [2, 1]
@@ -0,0 +1,39 @@
+# Kalıcı sipariş deposu: aynı veri tekrar yüklendiğinde kolon tiplerinden bağımsız olarak eklenmemeli.
+import pandas as pd
+import pytest
+
+import utils
+from utils import AMOUNT_COL, ORDER_COL, PRODUCT_COL, QTY_COL, append_to_store, compact_dtypes
+
+
+@pytest.fixture(autouse=True)
+def store_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils, "ORDER_STORE_DIR", tmp_path / "order_store")
+
+
+def _orders() -> pd.DataFrame:
+    return pd.DataFrame({
+        ORDER_COL: [1001, 1002, 1003],
+        "Paket No": ["P1", "P2", "P3"],
+        "Barkod": ["B1", "B2", "B3"],
+        PRODUCT_COL: ["Kalem", "Defter", "Silgi"],
+        QTY_COL: [1, 2, 3],
+        AMOUNT_COL: [10.5, 20.0, 7.25],
+        "Sipariş Tarihi": ["2024-01-02", "2024-01-03", "2024-01-04"],
+    })
+
+
+def test_reupload_with_other_dtypes_adds_nothing():
+    assert append_to_store(_orders()) == 3
+
+    again = _orders().astype({ORDER_COL: "category", PRODUCT_COL: "category", QTY_COL: "float64"})
+    again["Sipariş Tarihi"] = pd.to_datetime(again["Sipariş Tarihi"])
+    assert append_to_store(again) == 0
+    assert append_to_store(compact_dtypes(_orders())) == 0
+
+
+def test_changed_row_is_appended():
+    append_to_store(_orders())
+    changed = _orders()
+    changed.loc[1, QTY_COL] = 5
+    assert append_to_store(changed) == 1
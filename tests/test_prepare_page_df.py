@@ -0,0 +1,37 @@
+# prepare_page_df görünümü ham veriyle bellek paylaşır; kolon değiştirme ve türetme hamı bozmamalı.
+import numpy as np
+import pandas as pd
+import pytest
+
+import utils
+from utils import ORDER_COL, PRODUCT_COL, QTY_COL
+
+
+@pytest.fixture
+def raw(monkeypatch):
+    df = pd.DataFrame({
+        ORDER_COL: [1, 2, 3],
+        PRODUCT_COL: pd.Categorical(["x", "y", "x"]),
+        QTY_COL: [1.0, 2.0, 3.0],
+        "Kargoya Teslim Tarihi": ["2024-01-02", "2024-01-03", None],
+    })
+    monkeypatch.setattr(utils, "get_raw_df", lambda: df)
+    return df
+
+
+def test_view_shares_memory_with_raw(raw):
+    _, view, mapping = utils.prepare_page_df([ORDER_COL, QTY_COL])
+    assert mapping == {ORDER_COL: ORDER_COL, QTY_COL: QTY_COL}
+    assert np.shares_memory(view[QTY_COL].to_numpy(), raw[QTY_COL].to_numpy())
+    assert utils._columns_fingerprint(view, [ORDER_COL, PRODUCT_COL]) == utils._columns_fingerprint(raw, [ORDER_COL, PRODUCT_COL])
+
+
+def test_replacing_and_deriving_columns_leaves_raw_unchanged(raw):
+    before = raw.copy()
+    _, view, _ = utils.prepare_page_df([QTY_COL])
+    view[QTY_COL] = view[QTY_COL] * 10
+    view["Kargoya Teslim Tarihi"] = pd.to_datetime(view["Kargoya Teslim Tarihi"])
+    view["yeni"] = 1
+    view.assign(**{ORDER_COL: 0})
+    view[view[QTY_COL] > 10].rename(columns={PRODUCT_COL: "p"})
+    pd.testing.assert_frame_equal(utils.get_raw_df(), before)
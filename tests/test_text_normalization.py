@@ -0,0 +1,49 @@
+# norm_text_series: norm_text ile aynı boşluk kuralları; title=True Türkçe harf kurallarıyla (İ/i, I/ı).
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import norm_text, norm_text_series
+
+TITLE_CASES = [
+    ("ISPARTA", "Isparta"),
+    ("istanbul", "İstanbul"),
+    ("IĞDIR", "Iğdır"),
+    ("İZMİR", "İzmir"),
+    ("ırmak", "Irmak"),
+    ("çağrı ŞİMŞEK", "Çağrı Şimşek"),
+    ("  ali \t  veli  ", "Ali Veli"),
+    ("ağrı-dağı", "Ağrı-Dağı"),
+]
+
+
+@pytest.mark.parametrize("text,expected", TITLE_CASES)
+def test_title_turkish(text, expected):
+    assert norm_text_series(pd.Series([text]), title=True).iloc[0] == expected
+
+
+def test_title_differs_from_old_str_title():
+    # Eski yol norm_text + str.title idi; Türkçe harflerde bilinçli olarak farklı sonuç verir
+    ser = pd.Series(["istanbul", "IĞDIR"])
+    assert ser.map(norm_text).str.title().tolist() == ["Istanbul", "Iğdir"]
+    assert norm_text_series(ser, title=True).tolist() == ["İstanbul", "Iğdır"]
+
+
+@pytest.mark.parametrize("text", ["ISPARTA", "istanbul", "IĞDIR", "  ali \t  veli  ", "a  b", "", "   ", "x"])
+def test_whitespace_parity_with_norm_text(text):
+    assert norm_text_series(pd.Series([text])).iloc[0] == norm_text(text)
+
+
+@pytest.mark.parametrize("title", [False, True])
+def test_missing_values_stay_missing(title):
+    ser = pd.Series(["ISPARTA", None, np.nan, pd.NA], dtype=object, index=[5, 6, 7, 8], name="İl")
+    out = norm_text_series(ser, title=title)
+    assert out.isna().tolist() == [False, True, True, True]
+    assert out.index.equals(ser.index) and out.name == "İl"
+
+
+def test_categorical_and_numeric_input():
+    cat = pd.Series(["IĞDIR", "IĞDIR", "istanbul"], dtype="category")
+    assert norm_text_series(cat, title=True).tolist() == ["Iğdır", "Iğdır", "İstanbul"]
+    mixed = pd.Series([12, "  a  b ", 3.5], dtype=object)
+    assert norm_text_series(mixed).tolist() == [norm_text(v) for v in mixed]
@@ -0,0 +1,79 @@
+# to_number_series, hücre bazlı to_number ile aynı sonucu ve hata sayısını vermeli.
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import to_number, to_number_series
+
+DOCSTRING_CASES = [
+    ("1.234,56", 1234.56),
+    ("1,234.56", 1234.56),
+    ("1234,56", 1234.56),
+    ("1234.56", 1234.56),
+    ("2.000", 2000.0),
+    ("2,000", 2000.0),
+    ("₺1.234,56", 1234.56),
+    ("1.234,56 TL", 1234.56),
+]
+
+EDGE_CASES = [
+    "", "   ", None, np.nan, pd.NA,
+    "1.234.567", "1,234,567", "1234.567", "1234,567", "1.234.567,8", "1,234,567.8",
+    "12,5", "12.5", "0,05", ".5", "5.",
+    "-5", "+5", "-1.234,56", "+1,234.56", "- 5", "+-5", "5-",
+    "(5)", "5%", "%12,5", "5 TRY", "TL 7", " 42 ",
+    "abc", "garbage", "-", ".", ",", "1..2", "1,,2", "1.2.3,4,5",
+    0, 7, -3, 2000, 1234.5, 0.25, -12.75, 1234.567,
+]
+
+
+def _same(a, b) -> bool:
+    if a is None or (isinstance(a, float) and math.isnan(a)):
+        return b is None or (isinstance(b, float) and math.isnan(b))
+    return b is not None and not math.isnan(b) and a == pytest.approx(b, rel=0, abs=1e-9)
+
+
+@pytest.mark.parametrize("text,expected", DOCSTRING_CASES)
+def test_docstring_examples(text, expected):
+    assert to_number(text) == pytest.approx(expected)
+    values, failures = to_number_series(pd.Series([text], dtype=object))
+    assert values.iloc[0] == pytest.approx(expected)
+    assert failures == 0
+
+
+@pytest.mark.parametrize("value", EDGE_CASES, ids=repr)
+def test_cell_parity(value):
+    values, failures = to_number_series(pd.Series([value], dtype=object))
+    expected = to_number(value)
+    assert _same(expected, values.iloc[0]), (value, expected, values.iloc[0])
+    blank = pd.isna(value) or not str(value).strip()
+    assert failures == int(expected is None and not blank)
+
+
+def test_column_parity_and_failure_count():
+    cells = [text for text, _ in DOCSTRING_CASES] + EDGE_CASES
+    ser = pd.Series(cells * 3, dtype=object, index=range(100, 100 + 3 * len(cells)))
+    values, failures = to_number_series(ser)
+
+    assert values.dtype == np.float64
+    assert values.index.equals(ser.index)
+    expected = [to_number(v) for v in ser]
+    mismatches = [(c, e, v) for c, e, v in zip(ser, expected, values) if not _same(e, v)]
+    assert not mismatches
+    blank = ser.isna() | (ser.astype(str).str.strip() == "")
+    assert failures == sum(e is None for e in expected) - int(blank.sum())
+
+
+def test_numeric_dtypes():
+    for ser in (pd.Series([1, 2000, -3]), pd.Series([1234.5, np.nan, 0.25])):
+        values, failures = to_number_series(ser)
+        assert [_same(to_number(v), r) for v, r in zip(ser, values)] == [True] * len(ser)
+        assert failures == 0
+
+
+def test_all_missing():
+    values, failures = to_number_series(pd.Series([None, np.nan], dtype=object))
+    assert values.isna().all()
+    assert failures == 0
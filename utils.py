@@ -28,11 +28,33 @@
 # numpy>=1.26
 
 # ============================== utils.py ==============================
+import csv
+import datetime
+import hashlib
+import importlib.util
+import gzip
 import io
+import multiprocessing
+import operator
+import os
 import re
-from typing import Dict, List, Optional
-
+import tempfile
+import threading
+import uuid
+import warnings
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from functools import cached_property
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+from pandas.tseries.api import guess_datetime_format
 import streamlit as st
 import sqlite3
 import time
@@ -49,6 +71,23 @@ IGNORED_COL = "Müşteri Sipariş Adedi"  # asla kullanılmaz
 
 ALL_COLS = [ORDER_COL, BUYER_COL, *ADDR_COLS, PRODUCT_COL, QTY_COL, AMOUNT_COL, IGNORED_COL]
 
+# df.attrs anahtarı: tutar kolonunda çözümlenemeyen hücre sayısı
+AMOUNT_FAILURES_ATTR = "amount_parse_failures"
+# df.attrs anahtarı: compact_dtypes öncesi/sonrası bellek kullanımı (byte)
+MEMORY_ATTR = "memory_bytes"
+# df.attrs anahtarı: oturuma alınan veri setinin kimliği (dışa aktarma cache anahtarı)
+DATASET_ATTR = "dataset_id"
+
+# Çok tekrar eden metin kolonları: categorical olarak tutulur
+CATEGORY_COLS = [BUYER_COL, PRODUCT_COL, "İl", "İlçe"]
+
+# Adında bu sözcükler geçen kolonlar yüklemede datetime64'e çözümlenir (bkz. parse_date_series)
+DATE_NAME_KEYWORDS = ("tarih", "date", "time")
+# Dolu hücrelerin en az bu oranı tarihe çevrilemiyorsa kolon olduğu gibi bırakılır
+DATE_MIN_PARSE_RATIO = 0.9
+# df.attrs anahtarı: yüklemede çıkarılan kolon tipleri ({kolon: "datetime" | "integer" | ...})
+SCHEMA_ATTR = "schema"
+
 # Termin Süresi Bitenler sayfası için gerekli kolonlar
 TERMIN_COLS = [
     'Barkod', 'Paket No', 'Kargo Firması', 'Sipariş Tarihi',
@@ -68,6 +107,9 @@ TERMIN_COLS = [
     'Müşteri Telefon No', 'ETGB Statüsü'
 ]
 
+# Kalıcı depoda tutulan kolonlar: temizlenen ana kolonlar + pazaryeri çıktısının geri kalanı
+STORE_COLS = ALL_COLS + [c for c in TERMIN_COLS if c not in ALL_COLS]
+
 def is_termin_excel(df: pd.DataFrame) -> bool:
     """Excel dosyası Termin Süresi Bitenler formatında mı?"""
     return all(col in df.columns for col in TERMIN_COLS)
@@ -80,6 +122,61 @@ def norm_text(x: str) -> str:
     return x
 
 
+# ---- Vektörel metin normalizasyonu ----
+# Python'daki \s ile aynı boşluk karakterleri (RE2'nin \s'i yalnızca ASCII boşlukları kapsar)
+_WS_CLASS = r"[\t-\r\x{1c}-\x{1f} \x{85}\pZ]"
+
+
+def _arrow_strings(ser: pd.Series):
+    """Seriyi pyarrow string dizisine çevirir; NaN → null, diğer değerler str()."""
+    try:
+        return pa.array(ser.to_numpy(dtype=object), type=pa.string(), from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Karışık tipli kolon (sayı + metin): Python'daki str(x) ile aynı metne çevir
+        obj = ser.astype(object)
+        return pa.array(obj.where(obj.isna(), obj.astype(str)).to_numpy(), type=pa.string(), from_pandas=True)
+
+
+def _map_unique(arr, fn):
+    """fn'i yalnızca farklı değerlere uygular (dictionary encode → dönüştür → take).
+
+    Alıcı/ürün/il gibi çok tekrar eden kolonlarda regex maliyeti satır sayısıyla değil,
+    farklı değer sayısıyla ölçeklenir.
+    """
+    enc = pc.dictionary_encode(arr)
+    return pc.take(fn(enc.dictionary), enc.indices)
+
+
+def _norm_arrow(arr):
+    arr = pc.replace_substring_regex(arr, _WS_CLASS + "+", " ")
+    return pc.utf8_trim(arr, " ")
+
+
+def _blank_to_null(arr):
+    blank = pc.match_substring_regex(arr, f"^{_WS_CLASS}*$")
+    return pc.if_else(blank, pa.scalar(None, pa.string()), arr)
+
+
+def _title_tr_arrow(arr):
+    """Türkçe kurallı baş harf büyütme: I/ı ve İ/i eşleşmeleri korunur."""
+    arr = pc.replace_substring(arr, "I", "ı")
+    arr = pc.replace_substring(arr, "İ", "i")
+    arr = pc.utf8_lower(arr)
+    # Kelime başındaki i → İ (utf8_title bunu "I" yapardı); ı zaten "I" olur
+    arr = pc.replace_substring_regex(arr, r"(^|[^\p{Lu}\p{Ll}\p{Lt}])i", r"\1İ")
+    return pc.utf8_title(arr)
+
+
+def norm_text_series(ser: pd.Series, title: bool = False) -> pd.Series:
+    """`norm_text`'in kolon karşılığı: boşlukları tekilleştirir ve kırpar, NaN'ı korur.
+
+    title=True ise Türkçe kurallı baş harf büyütme de uygulanır ("ALİ IŞIK" → "Ali Işık").
+    """
+    fn = (lambda a: _title_tr_arrow(_norm_arrow(a))) if title else _norm_arrow
+    arr = _map_unique(_arrow_strings(ser), fn)
+    return pd.Series(arr.to_numpy(zero_copy_only=False), index=ser.index, name=ser.name)
+
+
 def to_number(x):
     """
     Para/metin -> float
@@ -92,7 +189,6 @@ def to_number(x):
       - "2,000"     (binlik virgül, ondalıksız) -> 2000.0
       - "₺1.234,56", "1.234,56 TL" vs.
     """
-    import re
     if pd.isna(x):
         return None
 
@@ -175,56 +271,1413 @@ def to_number(x):
         return None
 
 
+# float() tarafından kabul edilen, ayıraçları normalize edilmiş sayı kalıbı
+_FLOAT_RE = r"^[+-]?(?:\d+\.?\d*|\.\d+)$"
+
+
+def to_number_series(ser: pd.Series) -> tuple[pd.Series, int]:
+    """
+    `to_number`'ın kolon bazlı (vektörel) karşılığı.
+
+    Hücre hücre Python fonksiyonu çağırmak yerine pyarrow string işlemleri ve
+    sınıflandırma maskeleri ile aynı TR/EN binlik/ondalık kurallarını uygular.
+    Dönüş: (float64 seri, çözümlenemeyen dolu hücre sayısı).
+    Boş/NaN hücreler hata sayılmaz, NaN olarak döner.
+    """
+    values = np.full(len(ser), np.nan)
+    present = ser.notna().to_numpy()
+    if not present.any():
+        return pd.Series(values, index=ser.index), 0
+
+    # Para birimi, boşluk vb. temizliği: sadece rakam, nokta, virgül, eksi, artı kalır
+    s = pa.array(ser.to_numpy()[present].astype(str), type=pa.string())
+    filled = pc.not_equal(pc.utf8_trim_whitespace(s), "")
+    s = pc.replace_substring_regex(s, r"[^0-9,.\-+]", "")
+
+    has_comma = pc.match_substring(s, ",")
+    has_dot = pc.match_substring(s, ".")
+    both = pc.and_(has_comma, has_dot)
+    comma_only = pc.and_not(has_comma, has_dot)
+    dot_only = pc.and_not(has_dot, has_comma)
+
+    # 1) İkisi birden: son ayıraç ondalıktır (TR/EN kalıpları da bu kurala uyar)
+    comma_last = pc.and_(both, pc.match_substring_regex(s, r",[^.]*$"))
+    # 2) Sadece virgül: "1234,5" / "1234,56" ondalık, diğerleri binlik
+    comma_dec = pc.and_(comma_only, pc.match_substring_regex(s, r"^\d+,\d{1,2}$"))
+    # 3) Sadece nokta: "1234.5" / "1234.56" ondalık, diğerleri binlik
+    dot_dec = pc.and_(dot_only, pc.match_substring_regex(s, r"^\d+\.\d{1,2}$"))
+
+    comma_decimal = pc.or_(comma_last, comma_dec)
+    strip_commas = pc.or_(pc.and_not(both, comma_last), pc.and_not(comma_only, comma_dec))
+    strip_dots = pc.and_not(dot_only, dot_dec)
+
+    no_dots = pc.replace_substring(s, ".", "")
+    s = pc.if_else(comma_decimal, pc.replace_substring(no_dots, ",", "."), s)
+    s = pc.if_else(strip_commas, pc.replace_substring(s, ",", ""), s)
+    s = pc.if_else(strip_dots, no_dots, s)
+
+    valid = pc.match_substring_regex(s, _FLOAT_RE)
+    parsed = pc.cast(pc.if_else(valid, s, pa.scalar(None, pa.string())), pa.float64())
+    values[present] = parsed.to_numpy(zero_copy_only=False)
+
+    failures = pc.sum(pc.and_not(filled, valid)).as_py() or 0
+    return pd.Series(values, index=ser.index), failures
+
+
+# ---- Temizlenmiş veri disk cache'i (Parquet) ----
+# st.cache_data süreç içidir; yeniden başlatmada kaybolur ve worker'lar arasında paylaşılmaz.
+# Aynı dosya tekrar yüklendiğinde temizlenmiş DF buradan okunur.
+CLEAN_CACHE_DIR = Path(__file__).parent / "clean_cache"
+CLEAN_CACHE_MAX_BYTES = 2 * 1024 ** 3  # 2 GB; aşılınca en eski kullanılanlar silinir
+# Temizleme mantığı değiştiğinde artırın; eski cache dosyaları geçersiz olur.
+CLEAN_LOGIC_VERSION = 4
+
+
+def _parquet_safe(df: pd.DataFrame) -> pd.DataFrame:
+    """Parquet'e yazılamayan karışık tipli (sayı + metin) object kolonları metne çevirir."""
+    mixed = [
+        c for c in df.columns
+        if df[c].dtype == object and pd.api.types.infer_dtype(df[c], skipna=True) in ("mixed", "mixed-integer")
+    ]
+    if not mixed:
+        return df
+    df = df.copy()
+    for c in mixed:
+        df[c] = df[c].where(df[c].isna(), df[c].astype(str))
+    return df
+
+
+def clean_cache_key(file_bytes: bytes, columns: List[str] = ALL_COLS) -> str:
+    """Dosya içeriği + temizleme sürümünden (+ okunan kolonlardan) cache anahtarı üretir."""
+    digest = hashlib.sha256(file_bytes).hexdigest()
+    key = f"v{CLEAN_LOGIC_VERSION}_{digest}"
+    if list(columns) != ALL_COLS:
+        key += "_" + hashlib.sha256("\x1f".join(columns).encode()).hexdigest()[:12]
+    return key
+
+
+def read_clean_cache(key: str) -> Optional[pd.DataFrame]:
+    path = CLEAN_CACHE_DIR / f"{key}.parquet"
+    if not path.exists():
+        return None
+    try:
+        df = pd.read_parquet(path)
+    except Exception:
+        # Bozuk/yarım dosya: sil, yeniden üretilsin
+        path.unlink(missing_ok=True)
+        return None
+    try:
+        # LRU için son kullanım zamanını güncelle
+        os.utime(path)
+    except OSError:
+        pass
+    return df
+
+
+def write_clean_cache(key: str, df: pd.DataFrame):
+    """DF'yi atomik olarak (geçici dosya + rename) yazar ve boyut sınırını uygular."""
+    CLEAN_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    path = CLEAN_CACHE_DIR / f"{key}.parquet"
+    # Geçici ad her çağrıda benzersiz: aynı dosyayı aynı anda yazan oturumlar (thread'ler) çakışmaz
+    fd, tmp = tempfile.mkstemp(prefix=f"{key}.", suffix=".tmp", dir=CLEAN_CACHE_DIR)
+    os.close(fd)
+    tmp = Path(tmp)
+    try:
+        _parquet_safe(df).to_parquet(tmp, engine="pyarrow", index=False)
+        os.replace(tmp, path)
+    except Exception:
+        # Parquet'e yazılamayan (karışık tipli vb.) veri cache'lenmez
+        tmp.unlink(missing_ok=True)
+        return
+    evict_clean_cache()
+
+
+def evict_clean_cache(max_bytes: int = CLEAN_CACHE_MAX_BYTES):
+    """Toplam boyut max_bytes'ı aşıyorsa en eski kullanılan dosyaları siler."""
+    files = []
+    for p in CLEAN_CACHE_DIR.glob("*.parquet"):
+        try:
+            stat = p.stat()
+        except OSError:
+            continue
+        files.append((stat.st_mtime, stat.st_size, p))
+    total = sum(size for _, size, _ in files)
+    for _, size, p in sorted(files):
+        if total <= max_bytes:
+            break
+        p.unlink(missing_ok=True)
+        total -= size
+
+
 @st.cache_data(show_spinner=False)
 def load_and_clean_excel(file_bytes: bytes) -> pd.DataFrame:
-    """Tüm sheet'leri okur, birleştirir, normalize eder."""
-    all_sheets = pd.read_excel(io.BytesIO(file_bytes), sheet_name=None)
-    dfs = []
-    for _, df in all_sheets.items():
-        if not isinstance(df, pd.DataFrame):
-            continue
-        df = df.dropna(how="all")
-        keep = [c for c in ALL_COLS if c in df.columns]
-        if not keep:
-            continue
-        df = df[keep].copy()
-
-        # Normalizasyon
-        if BUYER_COL in df.columns:
-            df[BUYER_COL] = df[BUYER_COL].map(norm_text).astype(str).str.title()
-        if ORDER_COL in df.columns:
-            df[ORDER_COL] = df[ORDER_COL].map(norm_text).astype(str)
-        if PRODUCT_COL in df.columns:
-            df[PRODUCT_COL] = df[PRODUCT_COL].map(norm_text).astype(str)
-        if QTY_COL in df.columns:
-            df[QTY_COL] = pd.to_numeric(df[QTY_COL], errors="coerce").fillna(0).astype(int)
-        if AMOUNT_COL in df.columns:
-            df[AMOUNT_COL] = df[AMOUNT_COL].apply(to_number)
-
-        dfs.append(df)
+    """Tüm sheet'leri okur, birleştirir, normalize eder.
 
+    Sonuç dosya içeriği hash'i ile diskte cache'lenir (bkz. CLEAN_CACHE_DIR).
+    """
+    key = clean_cache_key(file_bytes)
+    cached = read_clean_cache(key)
+    if cached is not None:
+        return cached
+    df = _clean_excel(file_bytes)
+    write_clean_cache(key, df)
+    return df
+
+
+# ---- Excel okuma katmanı ----
+def excel_engine() -> str:
+    """Kurulu en hızlı okuyucu: python-calamine varsa 'calamine', yoksa 'openpyxl'."""
+    if importlib.util.find_spec("python_calamine") is not None:
+        return "calamine"
+    return "openpyxl"
+
+
+def excel_sheet_names(file_bytes: bytes, engine: Optional[str] = None) -> List[str]:
+    engine = engine or excel_engine()
+    if engine == "openpyxl":
+        from openpyxl import load_workbook
+
+        wb = load_workbook(io.BytesIO(file_bytes), read_only=True)
+        try:
+            return list(wb.sheetnames)
+        finally:
+            wb.close()
+    with pd.ExcelFile(io.BytesIO(file_bytes), engine=engine) as xls:
+        return [str(n) for n in xls.sheet_names]
+
+
+def read_excel_columns(
+    source,
+    columns: List[str],
+    engine: Optional[str] = None,
+    sheets: Optional[List[str]] = None,
+) -> Dict[str, pd.DataFrame]:
+    """Sheet'lerden yalnızca başlığı `columns` içinde olan kolonları okur → {sheet: DF}.
+
+    Kullanılmayan (ör. TERMIN_COLS'un geri kalanı) kolonlar hiç DF'ye alınmaz; bellek ve
+    süre tutulan kolon sayısıyla ölçeklenir. Hiç eşleşen kolonu olmayan sheet'ler atlanır.
+    sheets verilirse yalnızca o sheet'ler okunur (paralel okuma için).
+    source: dosyanın bytes'ı, yolu veya açık kitap (bkz. _open_workbook).
+    """
+    engine = engine or excel_engine()
+    wanted = set(columns)
+    if engine == "openpyxl":
+        return _read_excel_streaming(source, wanted, sheets)
+
+    out = pd.read_excel(
+        io.BytesIO(source) if isinstance(source, bytes) else source,
+        sheet_name=sheets, engine=engine, usecols=lambda c: c in wanted,
+    )
+    return {name: df for name, df in out.items() if len(df.columns)}
+
+
+def _read_excel_streaming(source, wanted: set, sheets: Optional[List[str]] = None) -> Dict[str, pd.DataFrame]:
+    """openpyxl read_only modunda satır satır okur; sadece eşleşen kolon hücrelerini tutar."""
+    from openpyxl import Workbook, load_workbook
+
+    own = not isinstance(source, Workbook)  # dışarıdan verilen açık kitap kapatılmaz
+    if own:
+        source = load_workbook(io.BytesIO(source) if isinstance(source, bytes) else source, read_only=True, data_only=True)
+    wb = source
+    out = {}
+    try:
+        for ws in wb.worksheets:
+            if sheets is not None and ws.title not in sheets:
+                continue
+            rows = ws.iter_rows(values_only=True)
+            header = next(rows, None)
+            if not header:
+                continue
+            # Aynı başlık birden fazla varsa ilki kullanılır
+            idx, names = [], []
+            for i, h in enumerate(header):
+                if h in wanted and h not in names:
+                    idx.append(i)
+                    names.append(h)
+            if not idx:
+                continue
+
+            # Sadece eşleşen kolonların aralığı okunur; aradaki kolonlar itemgetter ile atılır
+            lo, hi = min(idx), max(idx)
+            pick = operator.itemgetter(*[i - lo for i in idx])
+            body = ws.iter_rows(min_row=2, min_col=lo + 1, max_col=hi + 1, values_only=True)
+            if len(idx) == 1:
+                data = [(pick(r),) for r in body]
+            else:
+                data = [pick(r) for r in body]
+            out[ws.title] = pd.DataFrame.from_records(data, columns=names)
+    finally:
+        if own:
+            wb.close()
+    return out
+
+
+def clean_sheet(df: pd.DataFrame, columns: List[str] = ALL_COLS) -> tuple[Optional[pd.DataFrame], int]:
+    """Tek sheet'i normalize eder → (DF veya None, tutar kolonunda çözümlenemeyen hücre sayısı).
+
+    columns: tutulacak kolonlar (varsayılan ALL_COLS; depo için STORE_COLS).
+    """
+    df = df.dropna(how="all")
+    keep = [c for c in columns if c in df.columns]
+    if not keep:
+        return None, 0
+    df = df[keep].copy()
+
+    # Normalizasyon
+    if BUYER_COL in df.columns:
+        df[BUYER_COL] = norm_text_series(df[BUYER_COL], title=True)
+    if ORDER_COL in df.columns:
+        df[ORDER_COL] = norm_text_series(df[ORDER_COL])
+    if PRODUCT_COL in df.columns:
+        df[PRODUCT_COL] = norm_text_series(df[PRODUCT_COL])
+    if QTY_COL in df.columns:
+        df[QTY_COL] = pd.to_numeric(df[QTY_COL], errors="coerce").fillna(0).astype(int)
+    failures = 0
+    if AMOUNT_COL in df.columns:
+        df[AMOUNT_COL], failures = to_number_series(df[AMOUNT_COL])
+    return df, failures
+
+
+def is_date_column(name) -> bool:
+    """Kolon adı tarih kolonu gibi mi (DATE_NAME_KEYWORDS)?"""
+    name = str(name).replace("İ", "i").lower()
+    return any(k in name for k in DATE_NAME_KEYWORDS)
+
+
+def _strptime_arrow(values: pd.Index, fmt: Optional[str]) -> Optional[pd.Series]:
+    # Biçim belliyse pyarrow'da çözümle (pandas'ın strptime'ından ~10 kat hızlı); metin dışı
+    # değer varsa veya biçim pyarrow'da desteklenmiyorsa None
+    if not fmt or "%z" in fmt:  # saat dilimli metin pandas'ta (yerel saat korunur)
+        return None
+    try:
+        arr = pa.array(values, type=pa.string(), from_pandas=True)
+        return pc.strptime(pc.utf8_trim_whitespace(arr), format=fmt, unit="ns", error_is_null=True).to_pandas()
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        return None
+
+
+def _to_datetime(values: pd.Index) -> pd.Series:
+    # Yıl başta değilse gün önce yazılmıştır ("05.09.2025"); ISO metinde dayfirst=True
+    # biçimi "%Y-%d-%m" olarak çıkarırdı
+    first = next((v for v in values if isinstance(v, str) and v.strip()), "")
+    dayfirst = not re.match(r"\s*\d{4}\D", first)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)  # biçim çıkarılamazsa dateutil uyarısı
+        parsed = _strptime_arrow(values, guess_datetime_format(first.strip(), dayfirst=dayfirst) if first else None)
+        if parsed is None or not parsed.notna().any():
+            parsed = pd.Series(pd.to_datetime(values, errors="coerce", dayfirst=dayfirst))
+        # Biçim ilk değerden çıkarılır; ona uymayanlar tek tek denenir
+        bad = parsed.isna().to_numpy()
+        if bad.any() and not bad.all():
+            parsed[bad] = pd.to_datetime(values[bad], errors="coerce", dayfirst=dayfirst, format="mixed")
+    return parsed
+
+
+def parse_date_series(ser: pd.Series, min_ratio: float = DATE_MIN_PARSE_RATIO) -> Optional[pd.Series]:
+    """Seriyi datetime64'e çevirir; yıl başta değilse gün önce okunur ("05.09.2025 14:03").
+
+    Metin yalnızca benzersiz değerler üzerinde çözümlenir. Dolu hücrelerin min_ratio'sundan
+    azı çevrilebiliyorsa (veya kolon sayısalsa) None döner.
+    """
+    if pd.api.types.is_datetime64_any_dtype(ser.dtype):
+        return ser
+    if pd.api.types.is_numeric_dtype(ser.dtype) or pd.api.types.is_bool_dtype(ser.dtype):
+        return None
+    codes, uniques = pd.factorize(ser)
+    if not len(uniques):
+        return None
+    parsed = _to_datetime(pd.Index(uniques, dtype=object))
+    if not pd.api.types.is_datetime64_any_dtype(parsed.dtype):
+        return None  # farklı saat dilimli karışık değerler
+    if parsed.dt.tz is not None:
+        parsed = parsed.dt.tz_localize(None)
+    out = pd.DatetimeIndex(parsed).take(codes, allow_fill=True, fill_value=pd.NaT)
+    if int(out.notna().sum()) < min_ratio * int((codes >= 0).sum()):
+        return None
+    return pd.Series(out, index=ser.index, name=ser.name)
+
+
+def as_datetime(ser: pd.Series) -> pd.Series:
+    """Yüklemede çözümlenmiş tarih kolonunu olduğu gibi döndürür; değilse (örn. eşleştirilmiş
+    başka bir kolon) çözümler, çevrilemeyen hücreler NaT olur."""
+    parsed = parse_date_series(ser, min_ratio=0)
+    return parsed if parsed is not None else pd.to_datetime(ser, errors="coerce")
+
+
+def infer_schema(df: pd.DataFrame) -> Dict[str, str]:
+    """Kolon → tip adı: datetime, integer, float, boolean, category, text."""
+    schema = {}
+    for c in df.columns:
+        dtype = df[c].dtype
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            schema[c] = "datetime"
+        elif pd.api.types.is_bool_dtype(dtype):
+            schema[c] = "boolean"
+        elif pd.api.types.is_integer_dtype(dtype):
+            schema[c] = "integer"
+        elif pd.api.types.is_float_dtype(dtype):
+            schema[c] = "float"
+        elif isinstance(dtype, pd.CategoricalDtype):
+            schema[c] = "category"
+        else:
+            schema[c] = "text"
+    return schema
+
+
+def compact_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """Temiz veriyi kompakt şemaya çevirir (yerinde) ve df'yi döndürür.
+
+    - CATEGORY_COLS → category
+    - ORDER_COL → tamamı sayısal (baştaki sıfırsız) ise int64, değilse category
+    - QTY_COL → en küçük tamsayı tipi
+    - adı tarih olan kolonlar (is_date_column) → datetime64 (bkz. parse_date_series)
+    Önce/sonra bellek kullanımı df.attrs[MEMORY_ATTR] = {"before": ..., "after": ...},
+    çıkarılan kolon tipleri df.attrs[SCHEMA_ATTR] (bkz. infer_schema).
+    Birleştirme sonrası (concat categorical'ları object'e çevirebilir) tekrar çağrılabilir.
+    """
+    before = int(df.memory_usage(deep=True).sum())
+    for c in df.columns:
+        if is_date_column(c) and not pd.api.types.is_datetime64_any_dtype(df[c].dtype):
+            parsed = parse_date_series(df[c])
+            if parsed is not None:
+                df[c] = parsed
+    if ORDER_COL in df.columns and not isinstance(df[ORDER_COL].dtype, pd.CategoricalDtype):
+        orders = df[ORDER_COL]
+        as_text = orders.astype(str)
+        if len(orders) and orders.notna().all() and as_text.str.fullmatch(r"0|[1-9]\d{0,17}").all():
+            df[ORDER_COL] = as_text.astype("int64")
+        else:
+            df[ORDER_COL] = orders.where(orders.isna(), as_text).astype("category")
+    for c in CATEGORY_COLS:
+        if c in df.columns and not isinstance(df[c].dtype, pd.CategoricalDtype):
+            df[c] = df[c].astype("category")
+    if QTY_COL in df.columns:
+        df[QTY_COL] = pd.to_numeric(df[QTY_COL], downcast="integer")
+    df.attrs[MEMORY_ATTR] = {"before": before, "after": int(df.memory_usage(deep=True).sum())}
+    df.attrs[SCHEMA_ATTR] = infer_schema(df)
+    return df
+
+
+def combine_cleaned(parts: List[tuple]) -> pd.DataFrame:
+    """clean_sheet çıktılarını birleştirir, kompakt şemaya çevirir; hata sayısını df.attrs'a yazar."""
+    dfs = [df for df, _ in parts if df is not None]
     if not dfs:
         return pd.DataFrame()
 
     final_df = pd.concat(dfs, ignore_index=True)
     final_df = final_df.dropna(how="all")
+    final_df = compact_dtypes(final_df)
+    # Tutar kolonunda sayıya çevrilemeyen dolu hücre sayısı (Home'da uyarı olarak gösterilir)
+    final_df.attrs[AMOUNT_FAILURES_ATTR] = sum(f for _, f in parts)
     return final_df
 
 
+def _clean_excel(file_bytes: bytes, columns: List[str] = ALL_COLS) -> pd.DataFrame:
+    all_sheets = read_excel_columns(file_bytes, columns)
+    return combine_cleaned([clean_sheet(df, columns) for df in all_sheets.values()])
+
+
+def process_pool(max_workers: int) -> ProcessPoolExecutor:
+    """CPU ağırlıklı işler için process havuzu.
+
+    Çok thread'li Streamlit sunucusu fork edilmez (kilitlenebilir): işçiler forkserver'dan,
+    yoksa spawn ile temiz bir süreçte başlar.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context("forkserver")
+        # Sunucu utils'i bir kez içe aktarır; işçiler ondan hazır halde fork edilir
+        ctx.set_forkserver_preload([__name__])
+    else:
+        ctx = multiprocessing.get_context("spawn")
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=ctx)
+
+
+# İşçi süreçte açık kitaplar (yol → kitap): aynı dosyanın sheet'leri aynı işçiye düştüğünde kitap
+# (paylaşılan metin tablosu dahil) yeniden ayrıştırılmaz. Havuz kapanınca süreçle birlikte gider.
+_WORKER_BOOKS: Dict[str, object] = {}
+
+
+def _open_workbook(path: str, engine: str):
+    book = _WORKER_BOOKS.get(path)
+    if book is None:
+        if engine == "openpyxl":
+            from openpyxl import load_workbook
+
+            book = load_workbook(path, read_only=True, data_only=True)
+        else:
+            book = pd.ExcelFile(path, engine=engine)
+        _WORKER_BOOKS[path] = book
+    return book
+
+
+def _clean_one_sheet(source, sheet: str, columns: List[str], engine: str) -> tuple[Optional[pd.DataFrame], int]:
+    sheets = read_excel_columns(source, columns, engine=engine, sheets=[sheet])
+    if sheet not in sheets:
+        return None, 0
+    return clean_sheet(sheets[sheet], columns)
+
+
+def _clean_sheet_job(path: str, sheet: str, columns: List[str], engine: str) -> tuple[Optional[pd.DataFrame], int]:
+    """Process pool işi: kitabın yalnızca `sheet` sayfasını okuyup temizler.
+
+    Kitap işçiye bytes olarak değil geçici dosya yolu olarak gelir (IPC yalnızca yol kadar).
+    """
+    return _clean_one_sheet(_open_workbook(path, engine), sheet, columns, engine)
+
+
+def load_and_clean_workbooks(
+    files: List[tuple],
+    progress: Optional[Callable[[int, int, int], None]] = None,
+    max_workers: Optional[int] = None,
+    columns: List[str] = ALL_COLS,
+) -> pd.DataFrame:
+    """Birden fazla çalışma kitabını (her sheet ayrı iş olarak) process pool'da okur/temizler.
+
+    files: [(dosya_adı, bytes), ...]. progress(dosya_index, biten_sheet, toplam_sheet)
+    her sheet bittiğinde ana thread'de çağrılır. Disk cache'inde olan dosyalar okunmaz.
+    columns: okunacak/tutulacak kolonlar (depoya yazarken STORE_COLS).
+    Sonuç dosya sırasıyla birleştirilmiş DF'dir.
+    """
+    results: Dict[int, pd.DataFrame] = {}
+    jobs = []  # (dosya_index, sheet_index, sheet_adı)
+    sheet_counts: Dict[int, int] = {}
+    for i, (_, data) in enumerate(files):
+        cached = read_clean_cache(clean_cache_key(data, columns))
+        if cached is not None:
+            results[i] = cached
+            if progress:
+                progress(i, 1, 1)
+            continue
+        names = excel_sheet_names(data)
+        sheet_counts[i] = len(names)
+        jobs.extend((i, j, name) for j, name in enumerate(names))
+        if not names:
+            results[i] = pd.DataFrame()
+            if progress:
+                progress(i, 0, 0)
+
+    parts: Dict[int, Dict[int, tuple]] = {i: {} for i in sheet_counts}
+
+    def _done(i: int, j: int, part: tuple):
+        parts[i][j] = part
+        if progress:
+            progress(i, len(parts[i]), sheet_counts[i])
+        if len(parts[i]) == sheet_counts[i]:
+            df = combine_cleaned([parts[i][k] for k in sorted(parts[i])])
+            write_clean_cache(clean_cache_key(files[i][1], columns), df)
+            results[i] = df
+
+    engine = excel_engine()
+    if len(jobs) == 1:
+        # Tek iş için process başlatmaya değmez
+        i, j, name = jobs[0]
+        _done(i, j, _clean_one_sheet(files[i][1], name, columns, engine))
+    elif jobs:
+        workers = min(len(jobs), max_workers or os.cpu_count() or 1)
+        with tempfile.TemporaryDirectory(prefix="ravla_ingest_") as tmp:
+            # Her kitap diske bir kez yazılır; işlere yalnızca yolu gider
+            paths = {}
+            for i in sheet_counts:
+                paths[i] = str(Path(tmp) / f"{i}.xlsx")
+                Path(paths[i]).write_bytes(files[i][1])
+            with process_pool(workers) as pool:
+                futures = {
+                    pool.submit(_clean_sheet_job, paths[i], name, columns, engine): (i, j) for i, j, name in jobs
+                }
+                for fut in as_completed(futures):
+                    i, j = futures[fut]
+                    _done(i, j, fut.result())
+
+    dfs = [results[i] for i in range(len(files)) if not results[i].empty]
+    if not dfs:
+        return pd.DataFrame()
+    if len(dfs) == 1:
+        return dfs[0]
+    out = compact_dtypes(pd.concat(dfs, ignore_index=True))
+    out.attrs[AMOUNT_FAILURES_ATTR] = sum(df.attrs.get(AMOUNT_FAILURES_ATTR, 0) for df in dfs)
+    # "Önce" değeri dosyaların kompakt olmayan toplamı olsun (concat girdisi zaten kompakt)
+    befores = [df.attrs.get(MEMORY_ATTR, {}).get("before") for df in dfs]
+    if all(b is not None for b in befores):
+        out.attrs[MEMORY_ATTR]["before"] = sum(befores)
+    return out
+
+
+# ---- Platform CSV okuma katmanı ----
+# Sayfa 8'in Trendyol/Hepsiburada CSV'leri: ayraç ve kodlama dosyanın başından çıkarılır,
+# yalnızca kolon eşlemesindeki kolonlar pyarrow'un çok thread'li okuyucusuyla metin olarak
+# okunur (tip çıkarımı yapılmaz), ardından tarih/sayı kolonları çevrilir. Dosyalar paralel okunur.
+CSV_SNIFF_BYTES = 64 * 1024
+CSV_DELIMITERS = (";", ",", "\t", "|")
+CSV_FALLBACK_ENCODING = "cp1254"  # UTF-8 olmayan Türkçe Excel çıktıları
+
+
+def sniff_csv(head: bytes, encoding: Optional[str] = None) -> tuple[str, str, List[str]]:
+    """Dosyanın başından (ayraç, kodlama, başlıklar).
+
+    Ayraç, başlık satırında en çok geçen CSV_DELIMITERS elemanıdır (eşitlikte/hiç yoksa ",").
+    UTF-8 olarak çözülemeyen dosyalar CSV_FALLBACK_ENCODING kabul edilir; encoding verilirse
+    tahmin yapılmaz.
+    """
+    if encoding:
+        text = head.decode(encoding, errors="replace")
+    else:
+        try:
+            text, encoding = head.decode("utf-8"), "utf-8"
+        except UnicodeDecodeError as e:
+            if e.start >= len(head) - 3:  # örnek çok baytlı bir karakterin ortasında bitti
+                text, encoding = head[:e.start].decode("utf-8"), "utf-8"
+            else:
+                text, encoding = head.decode(CSV_FALLBACK_ENCODING, errors="replace"), CSV_FALLBACK_ENCODING
+    first = text.lstrip("\ufeff").splitlines()[0] if text.strip() else ""
+    counts = {d: first.count(d) for d in CSV_DELIMITERS}
+    delimiter = max(CSV_DELIMITERS, key=lambda d: (counts[d], d == ","))
+    if not counts[delimiter]:
+        delimiter = ","
+    header = next(csv.reader([first], delimiter=delimiter), [])
+    return delimiter, encoding, header
+
+
+def _csv_table(data: bytes, delimiter: str, encoding: str, columns: List[str]) -> pa.Table:
+    return pacsv.read_csv(
+        pa.BufferReader(data),
+        read_options=pacsv.ReadOptions(encoding=encoding),
+        parse_options=pacsv.ParseOptions(delimiter=delimiter, newlines_in_values=True),
+        convert_options=pacsv.ConvertOptions(
+            include_columns=columns, column_types={c: pa.string() for c in columns},
+        ),
+    )
+
+
+def read_platform_csv(
+    data: bytes,
+    columns_map: Dict[str, List[str]],
+    int_cols: List[str] = (),
+    date_cols: List[str] = (),
+) -> pd.DataFrame:
+    """Tek CSV'yi standart kolonlara (columns_map: standart ad → olası başlıklar) okur.
+
+    Yalnızca eşlenen kolonlar okunur; bulunamayan standart kolonlar boş gelir.
+    - int_cols: sayıya çevrilir, çevrilemeyen/boş hücreler 0
+    - date_cols: gün bazında datetime64 (bkz. parse_date_series), çevrilemeyenler NaT
+    - diğerleri: baş/son boşlukları atılmış metin, boş hücreler ""
+    """
+    def read(encoding=None):
+        delimiter, encoding, header = sniff_csv(data[:CSV_SNIFF_BYTES], encoding)
+        present = set(header)
+        source = {std: next((c for c in cands if c in present), None) for std, cands in columns_map.items()}
+        columns = list(dict.fromkeys(c for c in source.values() if c))
+        # Boş dosya: tüm standart kolonlar boş, satır yok
+        table = _csv_table(data, delimiter, encoding, columns) if header else pa.table({})
+        return table, source, encoding
+
+    try:
+        table, source, _ = read()
+    except (pa.ArrowInvalid, UnicodeDecodeError):
+        # Örnekten sonra UTF-8 olmayan bayt çıktı; başlıklar da yedek kodlamayla yeniden çözülür
+        table, source, _ = read(CSV_FALLBACK_ENCODING)
+
+    out = {}
+    for std, src in source.items():
+        col = table.column(src) if src else pa.nulls(table.num_rows, pa.string())
+        if std in int_cols:
+            out[std] = pd.to_numeric(col.to_pandas(), errors="coerce").fillna(0).astype(int)
+        elif std in date_cols:
+            parsed = parse_date_series(col.to_pandas(), min_ratio=0)
+            out[std] = parsed.dt.normalize() if parsed is not None else pd.Series(pd.NaT, index=range(table.num_rows))
+        else:
+            out[std] = pc.fill_null(pc.utf8_trim_whitespace(col), "").to_pandas()
+    return pd.DataFrame(out)
+
+
+def read_platform_csvs(
+    files: List[tuple],
+    columns_map: Dict[str, List[str]],
+    int_cols: List[str] = (),
+    date_cols: List[str] = (),
+    max_workers: Optional[int] = None,
+) -> List[pd.DataFrame]:
+    """files: [(dosya_adı, bytes), ...] → dosya sırasıyla read_platform_csv sonuçları.
+
+    Dosyalar thread havuzunda okunur: pyarrow ayrıştırma sırasında GIL'i bırakır.
+    """
+    def read(item):
+        return read_platform_csv(item[1], columns_map, int_cols=int_cols, date_cols=date_cols)
+
+    if len(files) <= 1:
+        return [read(f) for f in files]
+    with ThreadPoolExecutor(max_workers=min(len(files), max_workers or os.cpu_count() or 1)) as pool:
+        return list(pool.map(read, files))
+
+
+# ---- Excel dışa aktarma ----
+# xlsxwriter constant_memory modunda satırlar yazıldıkça diske akar; openpyxl gibi tüm hücre
+# nesnelerini bellekte tutmaz. Biçimler pandas.to_excel çıktısıyla aynıdır.
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+EXCEL_MAX_ROWS = 1_048_576  # başlık dahil; aşan tablolar numaralı sheet'lere bölünür
+EXPORT_CHUNK_ROWS = 50_000  # dışa aktarmada bir seferde hücreye/metne çevrilen satır sayısı
+XLSX_DATETIME_FORMAT = "YYYY-MM-DD HH:MM:SS"
+XLSX_DATE_FORMAT = "YYYY-MM-DD"
+# pandas.io.formats.excel başlık stili: kalın, ince kenarlık, ortalı
+_XLSX_HEADER_STYLE = {"bold": True, "border": 1, "align": "center", "valign": "top"}
+
+
+def excel_writer_engine() -> str:
+    """Dışa aktarma motoru: xlsxwriter kuruluysa o, değilse openpyxl."""
+    return "xlsxwriter" if importlib.util.find_spec("xlsxwriter") else "openpyxl"
+
+
+def _split_sheet(name: str, df: pd.DataFrame, max_rows: int) -> List[tuple]:
+    """Excel satır sınırını aşan DF'i numaralı sheet'lere böler: Detay → Detay_1, Detay_2, ..."""
+    if len(df) <= max_rows:
+        return [(name, df)]
+    parts = []
+    for i, start in enumerate(range(0, len(df), max_rows), start=1):
+        suffix = f"_{i}"
+        parts.append((name[: 31 - len(suffix)] + suffix, df.iloc[start:start + max_rows]))
+    return parts
+
+
+def _sheet_items(dfs: Dict[str, pd.DataFrame] | pd.DataFrame) -> List[tuple]:
+    if isinstance(dfs, pd.DataFrame):
+        items = [("Sheet1", dfs)]
+    else:
+        # Excel sheet adı 31 karakteri aşmamalı
+        items = [(str(sheet)[:31] if sheet else "Sheet", df) for sheet, df in dfs.items()]
+    max_rows = EXCEL_MAX_ROWS - 1  # başlık satırı
+    return [part for name, df in items for part in _split_sheet(name, df, max_rows)]
+
+
+def _iter_chunks(df: pd.DataFrame, rows: Optional[int] = None):
+    """DF'i satır dilimleri halinde verir (boş DF için başlık yazılabilsin diye bir kez)."""
+    rows = rows or EXPORT_CHUNK_ROWS
+    for start in range(0, max(len(df), 1), rows):
+        yield start, df.iloc[start:start + rows]
+
+
+def _xlsx_column(ser: pd.Series, formats: dict) -> tuple[list, object]:
+    """Kolonu hücre değerleri listesine (boş → None) ve hücre biçimine çevirir."""
+    if isinstance(ser.dtype, pd.DatetimeTZDtype):
+        raise ValueError("Excel does not support datetimes with timezones. Please ensure that datetimes are timezone unaware before writing to Excel.")
+    if pd.api.types.is_datetime64_dtype(ser.dtype):
+        values = ser.astype(object).where(ser.notna(), None).tolist()
+        return values, formats["datetime"]
+    if pd.api.types.is_float_dtype(ser.dtype):
+        arr = ser.to_numpy(dtype=np.float64, na_value=np.nan)
+        values = ser.astype(object).where(~np.isnan(arr), None)
+        inf = np.isinf(arr)
+        if inf.any():
+            # pandas inf_rep
+            values[inf] = np.where(arr[inf] > 0, "inf", "-inf")
+        return values.tolist(), None
+    values = ser.astype(object).where(ser.notna(), None).tolist()
+    if ser.dtype != object:
+        return values, None
+    types = set(map(type, values)) - {type(None)}
+    if not any(issubclass(t, datetime.date) for t in types):
+        return values, None
+    if all(issubclass(t, datetime.datetime) for t in types):
+        return values, formats["datetime"]
+    if not any(issubclass(t, datetime.datetime) for t in types) and all(issubclass(t, datetime.date) for t in types):
+        return values, formats["date"]
+    return values, _MIXED_FORMAT
+
+
+# Karışık kolonlar: biçim hücre bazında seçilir (tarih → date, datetime → datetime)
+_MIXED_FORMAT = object()
+
+
+def _cell_format(v, formats: dict):
+    if isinstance(v, datetime.datetime):
+        return formats["datetime"]
+    if isinstance(v, datetime.date):
+        return formats["date"]
+    return None
+
+
+def _write_xlsx_rows(ws, df: pd.DataFrame, first_row: int, formats: dict):
+    cols = [_xlsx_column(df.iloc[:, i], formats) for i in range(df.shape[1])]
+    rows = enumerate(zip(*(values for values, _ in cols)), start=first_row)
+    if all(fmt is None for _, fmt in cols):
+        write_row = ws.write_row
+        for r, row in rows:
+            write_row(r, 0, row)
+        return
+    fmts = [fmt for _, fmt in cols]
+    write = ws.write
+    for r, row in rows:
+        for c, v in enumerate(row):
+            if v is not None:
+                fmt = fmts[c]
+                write(r, c, v, _cell_format(v, formats) if fmt is _MIXED_FORMAT else fmt)
+
+
+def _to_xlsx_streaming(items: List[tuple], fh, tick: Optional[Callable[[int], None]] = None):
+    import xlsxwriter
+
+    wb = xlsxwriter.Workbook(fh, {
+        "constant_memory": True,
+        "in_memory": False,
+        # openpyxl çıktısındaki gibi metinler metin kalsın (URL/formül/sayıya çevrilmesin)
+        "strings_to_urls": False,
+        "strings_to_formulas": False,
+        "strings_to_numbers": False,
+    })
+    formats = {
+        "datetime": wb.add_format({"num_format": XLSX_DATETIME_FORMAT}),
+        "date": wb.add_format({"num_format": XLSX_DATE_FORMAT}),
+    }
+    header_fmt = wb.add_format(_XLSX_HEADER_STYLE)
+    for sheet_name, df in items:
+        ws = wb.add_worksheet(sheet_name)
+        if not len(df.columns):
+            continue
+        ws.write_row(0, 0, [str(c) if not isinstance(c, (int, float)) else c for c in df.columns], header_fmt)
+        # Hücre değerleri dilim dilim üretilir: büyük tablolarda bellek dilim boyutuyla sınırlı kalır
+        for start, chunk in _iter_chunks(df):
+            _write_xlsx_rows(ws, chunk, start + 1, formats)
+            if tick:
+                tick(len(chunk))
+    wb.close()
+
+
+def _write_csv(df: pd.DataFrame, fh, tick: Optional[Callable[[int], None]] = None):
+    """DF'i dilimler halinde ikili dosyaya CSV olarak yazar (Excel Türkçe karakterleri için BOM'lu UTF-8)."""
+    text = io.TextIOWrapper(fh, encoding="utf-8-sig", newline="")
+    for start, chunk in _iter_chunks(df):
+        chunk.to_csv(text, index=False, header=start == 0)
+        if tick:
+            tick(len(chunk))
+    text.flush()
+    text.detach()
+
+
+def _write_parquet(df: pd.DataFrame, fh, tick: Optional[Callable[[int], None]] = None):
+    """DF'i her dilim bir row group olacak şekilde Parquet'e yazar."""
+    safe = _parquet_safe(df)
+    schema = pa.Schema.from_pandas(safe, preserve_index=False)
+    with pq.ParquetWriter(fh, schema) as writer:
+        for _, chunk in _iter_chunks(safe):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+            if tick:
+                tick(len(chunk))
+
+
+def _bundle_name(name: str) -> str:
+    return re.sub(r'[\\/:*?"<>|]+', "_", str(name)).strip() or "tablo"
+
+
+# Dışa aktarma biçimleri: ad → (etiket, dosya uzantısı, MIME)
+EXPORT_FORMATS = {
+    "xlsx": ("Excel (.xlsx)", ".xlsx", XLSX_MIME),
+    "csv.gz": ("CSV (.csv.gz)", ".csv.gz", "application/gzip"),
+    "parquet": ("Parquet", ".parquet", "application/vnd.apache.parquet"),
+    "zip": ("Zip (tablo başına CSV)", ".zip", "application/zip"),
+}
+TABLE_EXPORT_FORMATS = ("xlsx", "csv.gz", "parquet")
+BUNDLE_EXPORT_FORMATS = ("xlsx", "zip")
+
+
+def _row_ticker(dfs: Dict[str, pd.DataFrame] | pd.DataFrame, progress: Optional[Callable[[float], None]]):
+    """Yazılan satır sayısını toplam satıra oranlayıp progress(0..1)'e ileten sayaç."""
+    if progress is None:
+        return None
+    frames = [dfs] if isinstance(dfs, pd.DataFrame) else list(dfs.values())
+    total = max(sum(len(df) for df in frames), 1)
+    done = 0
+
+    def tick(n: int):
+        nonlocal done
+        done += n
+        progress(min(done / total, 1.0))
+
+    return tick
+
+
+def write_export(
+    dfs: Dict[str, pd.DataFrame] | pd.DataFrame,
+    fmt: str,
+    fh,
+    progress: Optional[Callable[[float], None]] = None,
+):
+    """Tabloları seçilen biçimde fh'ye (ikili, seek edilebilir dosya) dilim dilim yazar.
+
+    - xlsx: satır sınırını aşan tablolar numaralı sheet'lere bölünür
+    - csv.gz / parquet: tek tablo
+    - zip: her tablo ayrı CSV dosyası
+    progress verilirse her dilimden sonra yazılan satır oranıyla (0..1) çağrılır.
+    """
+    tick = _row_ticker(dfs, progress)
+    if fmt == "xlsx":
+        items = _sheet_items(dfs)
+        if excel_writer_engine() == "xlsxwriter":
+            _to_xlsx_streaming(items, fh, tick)
+        else:
+            with pd.ExcelWriter(fh, engine="openpyxl") as writer:
+                for sheet_name, df in items:
+                    df.to_excel(writer, index=False, sheet_name=sheet_name)
+                    if tick:
+                        tick(len(df))
+    elif fmt == "zip":
+        items = [("veri", dfs)] if isinstance(dfs, pd.DataFrame) else list(dfs.items())
+        with zipfile.ZipFile(fh, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            for name, df in items:
+                with zf.open(f"{_bundle_name(name)}.csv", "w", force_zip64=True) as member:
+                    _write_csv(df, member, tick)
+    elif fmt in ("csv.gz", "parquet"):
+        if not isinstance(dfs, pd.DataFrame):
+            raise ValueError(f"'{fmt}' biçimi tek tablo içindir; birden fazla tablo için 'zip' kullanın.")
+        if fmt == "csv.gz":
+            with gzip.GzipFile(fileobj=fh, mode="wb") as gz:
+                _write_csv(dfs, gz, tick)
+        else:
+            _write_parquet(dfs, fh, tick)
+    else:
+        raise ValueError(f"Bilinmeyen dışa aktarma biçimi: {fmt}")
+
+
+def export_bytes(
+    dfs: Dict[str, pd.DataFrame] | pd.DataFrame,
+    fmt: str = "xlsx",
+    progress: Optional[Callable[[float], None]] = None,
+) -> bytes:
+    """write_export çıktısını byte olarak döndürür; ara çıktı bellekte değil geçici dosyada birikir."""
+    with tempfile.TemporaryFile() as fh:
+        write_export(dfs, fmt, fh, progress)
+        fh.seek(0)
+        return fh.read()
+
+
 def to_excel_bytes(dfs: Dict[str, pd.DataFrame] | pd.DataFrame, filename: Optional[str] = None) -> bytes:
-    """Tek DF veya {sheet_name: DF} sözlüğünü xlsx byte'ına çevirir."""
+    """Tek DF veya {sheet_name: DF} sözlüğünü xlsx byte'ına çevirir.
+
+    xlsxwriter varsa satır satır akışla (constant_memory) yazar; yoksa openpyxl'e düşer.
+    Excel satır sınırını aşan tablolar numaralı sheet'lere bölünür.
+    """
+    return export_bytes(dfs, "xlsx")
+
+
+# ---- Arka plan rapor işleri ----
+# Uzun süren dosya üretimi (Excel/zip/PDF) Streamlit script thread'inde değil süreç genelindeki
+# bir thread havuzunda çalışır: oturum bloklanmaz, widget'a dokunmak işi yeniden başlatmaz.
+# İşler (anahtar, veri seti kimliği, parametreler, biçim) ile tutulur; aynı istek çalışan ya da
+# bitmiş işi yeniden kullanır. Thread seçildi: işler oturumdaki DF'leri kopyalamadan okur.
+REPORT_WORKERS = 2  # aynı anda çalışan rapor işi sayısı
+JOB_POLL_SECONDS = 0.5  # ilerleme çubuğunun yenilenme aralığı
+EXPORT_CACHE_MAX_BYTES = 256 * 1024 ** 2  # bitmiş iş çıktıları bunu aşınca en eskiler atılır
+
+JOB_QUEUED, JOB_RUNNING, JOB_DONE, JOB_FAILED, JOB_CANCELLED = "queued", "running", "done", "failed", "cancelled"
+_JOB_ACTIVE = (JOB_QUEUED, JOB_RUNNING)
+
+_JOBS: "OrderedDict[tuple, ReportJob]" = OrderedDict()
+_JOBS_LOCK = threading.Lock()
+_JOB_POOL: Optional[ThreadPoolExecutor] = None
+
+
+class JobCancelled(Exception):
+    """Kullanıcı işi iptal etti (ilerleme bildirimi sırasında fırlatılır)."""
+
+
+class ReportJob:
+    """Arka planda çalışan tek bir dosya üretim işi.
+
+    run(update) fonksiyonu işin kendisidir ve byte döndürür; update(oran, mesaj) ile ilerleme
+    bildirir. İptal işbirliklidir: iptal istendiyse bir sonraki update çağrısı JobCancelled fırlatır.
+    """
+
+    def __init__(self, key: tuple):
+        self.key = key
+        self.status = JOB_QUEUED
+        self.progress = 0.0
+        self.message = ""
+        self.result: Optional[bytes] = None
+        self.error: Optional[str] = None
+        self.future: Optional[Future] = None
+        self._cancel = threading.Event()
+
+    def update(self, fraction: float, message: str = ""):
+        if self._cancel.is_set():
+            raise JobCancelled()
+        self.progress = min(max(float(fraction), 0.0), 1.0)
+        if message:
+            self.message = message
+
+    def cancel(self):
+        self._cancel.set()
+        # Henüz başlamamış iş kuyruktan doğrudan düşer
+        if self.future is not None and self.future.cancel():
+            self.status = JOB_CANCELLED
+
+    @property
+    def active(self) -> bool:
+        return self.status in _JOB_ACTIVE
+
+
+def _job_pool() -> ThreadPoolExecutor:
+    global _JOB_POOL
+    if _JOB_POOL is None:
+        _JOB_POOL = ThreadPoolExecutor(max_workers=REPORT_WORKERS, thread_name_prefix="ravla-report")
+    return _JOB_POOL
+
+
+def _run_job(job: ReportJob, run: Callable[[Callable[[float, str], None]], bytes]):
+    if job._cancel.is_set():
+        job.status = JOB_CANCELLED
+        return
+    job.status = JOB_RUNNING
+    try:
+        job.result = run(job.update)
+        job.progress = 1.0
+        job.status = JOB_DONE
+    except JobCancelled:
+        job.status = JOB_CANCELLED
+    except Exception as e:
+        job.error = f"{type(e).__name__}: {e}"
+        job.status = JOB_FAILED
+    with _JOBS_LOCK:
+        _evict_jobs()
+
+
+def _evict_jobs(max_bytes: int = EXPORT_CACHE_MAX_BYTES, max_finished: int = 64):
+    """Bitmiş işleri en eski kullanılandan başlayarak atar (çalışanlara dokunmaz).
+
+    Çıktı toplamı max_bytes'ı, bitmiş iş sayısı max_finished'ı aşmasın; en son kullanılan kalır.
+    """
+    finished = [k for k, j in _JOBS.items() if not j.active]
+    total = sum(len(_JOBS[k].result or b"") for k in finished)
+    for n, k in enumerate(finished[:-1]):
+        if total <= max_bytes and len(finished) - n <= max_finished:
+            break
+        total -= len(_JOBS.pop(k).result or b"")
+
+
+def get_job(key: tuple) -> Optional[ReportJob]:
+    with _JOBS_LOCK:
+        job = _JOBS.get(key)
+        if job is not None:
+            _JOBS.move_to_end(key)
+        return job
+
+
+def submit_job(key: tuple, run: Callable[[Callable[[float, str], None]], bytes]) -> ReportJob:
+    """İşi kuyruğa ekler; aynı anahtarla bekleyen, çalışan veya bitmiş iş varsa onu döndürür."""
+    with _JOBS_LOCK:
+        job = _JOBS.get(key)
+        if job is not None and job.status in (*_JOB_ACTIVE, JOB_DONE):
+            _JOBS.move_to_end(key)
+            return job
+        job = ReportJob(key)
+        _JOBS[key] = job
+        _JOBS.move_to_end(key)
+        job.future = _job_pool().submit(_run_job, job, run)
+        return job
+
+
+def _job_progress(job: ReportJob, label: str, key: str):
+    """Çalışan işin ilerleme çubuğu ve iptal butonu; yalnızca bu parça periyodik yenilenir."""
+
+    @st.fragment(run_every=JOB_POLL_SECONDS)
+    def _panel():
+        if not job.active:
+            st.rerun()  # bitti/iptal/hata: sayfa indirme butonu veya durumla yeniden çizilir
+        st.progress(job.progress, text=f"{label}: {job.message or 'sırada bekliyor'}")
+        if st.button("İptal", key=f"job_cancel_{key}"):
+            job.cancel()
+            st.rerun()
+
+    _panel()
+
+
+def job_download_button(
+    label: str,
+    run: Callable[[Callable[[float, str], None]], bytes],
+    file_name: str,
+    key: str,
+    job_key: tuple,
+    mime: str,
+):
+    """Dosyayı arka plan işi olarak üreten indirme butonu.
+
+    İlk tıklamada iş kuyruğa alınır; çalışırken ilerleme + iptal, bitince indirme butonu gösterilir.
+    job_key dosyayı belirleyen her şeyi (veri seti, parametreler, biçim) içermeli.
+    """
+    job = get_job(job_key)
+    slot = st.empty()  # hazırla butonu aynı yerde ilerleme / indirme butonuna dönüşür
+    if job is None or job.status in (JOB_FAILED, JOB_CANCELLED):
+        if job is not None and job.status == JOB_FAILED:
+            st.error(f"{label} üretilemedi: {job.error}")
+        elif job is not None:
+            st.caption(f"{label}: iptal edildi.")
+        if not slot.button(f"{label} — hazırla", key=f"export_prep_{key}"):
+            return
+        job = submit_job(job_key, run)
+    if job.status == JOB_DONE:
+        slot.download_button(
+            label, data=job.result, file_name=file_name, mime=mime,
+            key=f"export_dl_{key}", on_click="ignore",
+        )
+        return
+    with slot.container():
+        _job_progress(job, label, key)
+
+
+# ---- İsteğe bağlı dışa aktarma ----
+# İndirme dosyaları her rerun'da değil, kullanıcı "hazırla" dediğinde arka plan işi olarak
+# üretilir; sonuç (veri seti kimliği, dışa aktarma anahtarı, parametreler, biçim) ile tutulur.
+
+
+def dataset_fingerprint(df: pd.DataFrame) -> str:
+    """Veri setinin kimliği: oturuma alınırken df.attrs'a yazılan id; yoksa içerik hash'i."""
+    ds_id = df.attrs.get(DATASET_ATTR)
+    if ds_id:
+        return ds_id
+    h = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return hashlib.sha1(h.tobytes() + repr(list(df.columns)).encode()).hexdigest()
+
+
+def _export_job(build: Callable[[], Dict[str, pd.DataFrame] | pd.DataFrame], fmt: str):
+    def run(update: Callable[[float, str], None]) -> bytes:
+        update(0.0, "tablolar hesaplanıyor")
+        dfs = build()
+        update(0.1, "dosya yazılıyor")
+        return export_bytes(dfs, fmt, progress=lambda f: update(0.1 + 0.9 * f, f"dosya yazılıyor (%{f * 100:.0f})"))
+
+    return run
+
+
+def export_button(
+    label: str,
+    build: Callable[[], Dict[str, pd.DataFrame] | pd.DataFrame],
+    file_name: str,
+    key: str,
+    df: Optional[pd.DataFrame] = None,
+    params: tuple = (),
+    formats: tuple = TABLE_EXPORT_FORMATS,
+    fingerprint: Optional[str] = None,
+):
+    """İndirme butonu; dosya yalnızca istendiğinde arka planda üretilir.
+
+    - build: indirilecek tablo(lar)ı döndüren fonksiyon (tek DF veya {sheet_adı: DF}).
+      Worker thread'de çalışır: st.* çağırmamalı, yalnızca hesap yapmalı.
+    - file_name: uzantısı seçilen biçime göre değiştirilir
+    - df, params: iş anahtarı; tabloyu belirleyen tüm sayfa parametreleri params'a verilmeli.
+      Veri oturumdaki veri seti değilse df yerine fingerprint verilebilir.
+    - formats: kullanıcıya sunulan biçimler (bkz. EXPORT_FORMATS)
+    Üretilmiş dosya yoksa "hazırla" butonu gösterilir; parametre değişince yeniden hazırlanır.
+    """
+    fmt = formats[0]
+    if len(formats) > 1:
+        fmt = st.radio(
+            f"{label} — biçim", formats, format_func=lambda f: EXPORT_FORMATS[f][0],
+            horizontal=True, key=f"export_fmt_{key}",
+        )
+    _, ext, mime = EXPORT_FORMATS[fmt]
+    job_download_button(
+        label,
+        _export_job(build, fmt),
+        file_name=str(Path(file_name).with_suffix("")) + ext,
+        key=key,
+        job_key=(key, fingerprint or dataset_fingerprint(df), params, fmt),
+        mime=mime,
+    )
+
+
+# ---- PDF rapor sayfaları ----
+# Her sayfa (tür, girdi) çiftiyle tanımlanır ve Agg ile JPEG'e çizilir. Çizilen sayfa girdisinin
+# hash'iyle bellekte tutulur: girdisi değişmeyen sayfa yeniden çizilmez. Çizilmesi gereken
+# sayfa çoksa process pool'da paralel çizilir; PDF, sayfa görüntülerinden Pillow ile birleştirilir.
+PDF_DPI = 150
+PDF_JPEG_QUALITY = 92  # Pillow PDF'e RGB sayfaları zaten JPEG olarak gömer; cache de JPEG tutar
+PDF_PARALLEL_MIN_PAGES = 4  # bundan az eksik sayfa için process başlatmaya değmez
+PDF_PAGE_CACHE_MAX_BYTES = 64 * 1024 ** 2
+A4_PORTRAIT = (8.27, 11.69)
+A4_LANDSCAPE = (11.69, 8.27)
+_PDF_PAGE_CACHE: "OrderedDict[str, bytes]" = OrderedDict()
+_PDF_PAGE_LOCK = threading.Lock()
+
+
+def _render_text_page(fig, title: str, subtitle: str = "", blocks: tuple = ()):
+    """KPI sayfası: başlık + alt başlık + (y, metin) blokları."""
+    ax = fig.add_subplot()
+    ax.axis("off")
+    ax.text(0.5, 0.95, title, ha="center", fontsize=18, fontweight="bold")
+    if subtitle:
+        ax.text(0.5, 0.91, subtitle, ha="center", fontsize=10)
+    for y, text in blocks:
+        ax.text(0.1, y, text, va="top", fontsize=12)
+
+
+def _render_barh_page(fig, title: str, labels: list, values: list, xlabel: str = "", ylabel: str = ""):
+    ax = fig.add_subplot()
+    # İlk eleman en üstte görünsün
+    ax.barh(labels[::-1], values[::-1])
+    ax.set_title(title)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+
+
+def _render_line_page(fig, title: str, x: list, y: list, xlabel: str = "", ylabel: str = ""):
+    ax = fig.add_subplot()
+    ax.plot(x, y, marker="o")
+    ax.set_title(title)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.grid(True, alpha=0.3)
+
+
+# Sayfa türü → (çizim fonksiyonu, sayfa boyutu)
+PDF_PAGE_KINDS = {
+    "text": (_render_text_page, A4_PORTRAIT),
+    "barh": (_render_barh_page, A4_LANDSCAPE),
+    "line": (_render_line_page, A4_LANDSCAPE),
+}
+
+
+def render_pdf_page(kind: str, payload: dict) -> bytes:
+    """Tek sayfayı JPEG olarak çizer. pyplot kullanılmaz: thread ve process'lerde güvenle çalışır."""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    draw, size = PDF_PAGE_KINDS[kind]
+    fig = Figure(figsize=size)
+    FigureCanvasAgg(fig)
+    draw(fig, **payload)
+    if kind != "text":
+        fig.tight_layout()
     buf = io.BytesIO()
-    if isinstance(dfs, pd.DataFrame):
-        with pd.ExcelWriter(buf, engine="openpyxl") as writer:
-            dfs.to_excel(writer, index=False, sheet_name="Sheet1")
+    fig.savefig(
+        buf, format="jpg", dpi=PDF_DPI, bbox_inches="tight" if kind == "text" else None,
+        pil_kwargs={"quality": PDF_JPEG_QUALITY},
+    )
+    return buf.getvalue()
+
+
+def _pdf_page_key(kind: str, payload: dict) -> str:
+    h = hashlib.sha1(f"{kind}|{PDF_DPI}".encode())
+    for name in sorted(payload):
+        value = payload[name]
+        h.update(name.encode())
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            h.update(pd.util.hash_pandas_object(value, index=False).to_numpy().tobytes())
+        else:
+            h.update(repr(value).encode())
+    return h.hexdigest()
+
+
+def _pdf_page_cache_get(key: str) -> Optional[bytes]:
+    with _PDF_PAGE_LOCK:
+        img = _PDF_PAGE_CACHE.get(key)
+        if img is not None:
+            _PDF_PAGE_CACHE.move_to_end(key)
+        return img
+
+
+def _pdf_page_cache_put(key: str, img: bytes, max_bytes: int = PDF_PAGE_CACHE_MAX_BYTES):
+    with _PDF_PAGE_LOCK:
+        _PDF_PAGE_CACHE[key] = img
+        _PDF_PAGE_CACHE.move_to_end(key)
+        total = sum(len(v) for v in _PDF_PAGE_CACHE.values())
+        while total > max_bytes and len(_PDF_PAGE_CACHE) > 1:
+            _, old = _PDF_PAGE_CACHE.popitem(last=False)
+            total -= len(old)
+
+
+def render_pdf(
+    pages: List[tuple],
+    progress: Optional[Callable[[float, str], None]] = None,
+    max_workers: Optional[int] = None,
+) -> bytes:
+    """[(tür, girdi), ...] sayfalarını tek PDF'e çevirir; yalnızca cache'te olmayanlar çizilir.
+
+    progress(oran, mesaj) her sayfa çizildikten sonra çağrılır (arka plan işinin update'i verilebilir).
+    """
+    from PIL import Image
+
+    keys = [_pdf_page_key(kind, payload) for kind, payload in pages]
+    images = {k: img for k in keys if (img := _pdf_page_cache_get(k)) is not None}
+    todo = {k: page for k, page in zip(keys, pages) if k not in images}
+    done = len(pages) - len(todo)
+
+    def _done(key: str, img: bytes):
+        nonlocal done
+        images[key] = img
+        _pdf_page_cache_put(key, img)
+        done += 1
+        if progress:
+            progress(done / max(len(pages), 1), f"sayfa {done}/{len(pages)}")
+
+    if len(todo) >= PDF_PARALLEL_MIN_PAGES:
+        workers = min(len(todo), max_workers or os.cpu_count() or 1)
+        with process_pool(workers) as pool:
+            futures = {pool.submit(render_pdf_page, kind, payload): k for k, (kind, payload) in todo.items()}
+            try:
+                for fut in as_completed(futures):
+                    _done(futures[fut], fut.result())
+            except BaseException:
+                # İptal/hata: kuyruktaki sayfalar çizilmesin
+                pool.shutdown(wait=False, cancel_futures=True)
+                raise
     else:
-        with pd.ExcelWriter(buf, engine="openpyxl") as writer:
-            for sheet, df in dfs.items():
-                # Excel sheet adı 31 karakteri aşmamalı
-                sheet_name = str(sheet)[:31] if sheet else "Sheet"
-                df.to_excel(writer, index=False, sheet_name=sheet_name)
-    buf.seek(0)
-    return buf.read()
+        for k, (kind, payload) in todo.items():
+            _done(k, render_pdf_page(kind, payload))
+
+    buf = io.BytesIO()
+    frames = [Image.open(io.BytesIO(images[k])).convert("RGB") for k in keys]
+    if frames:
+        frames[0].save(buf, "PDF", save_all=True, append_images=frames[1:], resolution=PDF_DPI)
+    return buf.getvalue()
+
+
+# ---- Kalıcı sipariş deposu (Parquet) ----
+# Her yüklemede yalnızca yeni veya değişmiş satırlar ayrı bir parça dosyası olarak eklenir;
+# ekleme maliyeti geçmişin boyutuyla değil yeni satır sayısıyla ölçeklenir.
+# Aynı anahtar birden fazla parçada varsa okurken en son yazılan geçerlidir (upsert).
+ORDER_STORE_DIR = Path(__file__).parent / "order_store"
+STORE_KEY_COLS = [ORDER_COL, "Paket No", "Barkod", PRODUCT_COL]
+STORE_COMPACT_PARTS = 64  # parça sayısı bunu aşınca tek dosyada birleştirilir
+_KEY_COL = "__key__"
+_ROW_HASH_COL = "__row_hash__"
+
+
+def _key_text(ser: pd.Series) -> pd.Series:
+    """Anahtar kolonunu tipten bağımsız metne çevirir (123, 123.0 ve "123" aynı olur)."""
+    if pd.api.types.is_float_dtype(ser):
+        vals = ser.dropna()
+        if (vals == vals.round()).all():
+            ser = ser.astype("Int64")
+    return ser.astype(str).where(ser.notna(), "")
+
+
+def _row_keys(df: pd.DataFrame) -> np.ndarray:
+    keys = pd.DataFrame(
+        {c: _key_text(df[c]) if c in df.columns else "" for c in STORE_KEY_COLS}, index=df.index
+    )
+    return pd.util.hash_pandas_object(keys, index=False).to_numpy()
+
+
+def _row_hashes(df: pd.DataFrame) -> np.ndarray:
+    """Satır içerik hash'i; kolon tipinden bağımsızdır (int/kategori/metin, datetime/metin aynı hash'i verir).
+
+    Kolonlar STORE_COLS sırasıyla, eksik olanlar boş metin olarak hash'lenir.
+    """
+    text = pd.DataFrame(
+        {c: _key_text(df[c]) if c in df.columns else "" for c in STORE_COLS}, index=df.index
+    )
+    return pd.util.hash_pandas_object(text, index=False).to_numpy()
+
+
+def _store_parts() -> List[Path]:
+    # Dosya adları yazılma zamanına göre sıralanır (bkz. _new_part_path)
+    return sorted(ORDER_STORE_DIR.glob("part-*.parquet"))
+
+
+def _new_part_path() -> Path:
+    return ORDER_STORE_DIR / f"part-{time.time_ns():020d}-{os.getpid()}.parquet"
+
+
+def _write_part(df: pd.DataFrame, path: Path):
+    ORDER_STORE_DIR.mkdir(parents=True, exist_ok=True)
+    # Benzersiz geçici ad: aynı süreçte eşzamanlı birleştirmeler aynı hedefe yazabilir
+    fd, tmp = tempfile.mkstemp(prefix=f"{path.stem}.", suffix=".tmp", dir=ORDER_STORE_DIR)
+    os.close(fd)
+    try:
+        _parquet_safe(df).to_parquet(tmp, engine="pyarrow", index=False)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def store_signature() -> tuple:
+    """Depodaki parçaların (ad, boyut) listesi; değişince depo yeniden okunur."""
+    sig = []
+    for p in _store_parts():
+        try:
+            sig.append((p.name, p.stat().st_size))
+        except FileNotFoundError:
+            continue
+    return tuple(sig)
+
+
+def _read_parts(names: List[str], columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+    dfs = [pd.read_parquet(ORDER_STORE_DIR / n, columns=columns) for n in names]
+    if not dfs:
+        return None
+    return pd.concat(dfs, ignore_index=True)
+
+
+def append_to_store(df: pd.DataFrame) -> int:
+    """Yeni veya değişmiş satırları depoya yeni bir parça olarak ekler; eklenen satır sayısını döndürür.
+
+    Tekilleştirme anahtarı: Sipariş Numarası + Paket No + Barkod (+ Ürün Adı).
+    """
+    if df is None or df.empty:
+        return 0
+    batch = df.assign(**{
+        _KEY_COL: _row_keys(df),
+        _ROW_HASH_COL: _row_hashes(df),
+    })
+    batch = batch.drop_duplicates(subset=_KEY_COL, keep="last")
+
+    # Depodaki her anahtarın en güncel içerik hash'i ile aynı olan satırlar zaten kayıtlı
+    names = [n for n, _ in store_signature()]
+    existing = _read_parts(names, columns=[_KEY_COL, _ROW_HASH_COL])
+    if existing is not None:
+        latest = existing.drop_duplicates(subset=_KEY_COL, keep="last")
+        m = batch[[_KEY_COL, _ROW_HASH_COL]].merge(latest, on=[_KEY_COL, _ROW_HASH_COL], how="left", indicator=True)
+        batch = batch[(m["_merge"] == "left_only").to_numpy()]
+    if batch.empty:
+        return 0
+
+    _write_part(batch.reset_index(drop=True), _new_part_path())
+    if len(names) + 1 > STORE_COMPACT_PARTS:
+        compact_order_store()
+    return len(batch)
+
+
+def compact_order_store():
+    """Tüm parçaları tekilleştirip tek dosyada birleştirir.
+
+    Birleşik dosya okunan son parçanın adını alır; bu sırada başka bir süreçte eklenen
+    (daha yeni adlı) parçalar silinmez ve sıralamada sonra gelmeye devam eder.
+    """
+    names = [n for n, _ in store_signature()]
+    if len(names) <= 1:
+        return
+    df = _read_parts(names).drop_duplicates(subset=_KEY_COL, keep="last")
+    _write_part(df.reset_index(drop=True), ORDER_STORE_DIR / names[-1])
+    for n in names[:-1]:
+        (ORDER_STORE_DIR / n).unlink(missing_ok=True)
+
+
+def clear_order_store():
+    for p in _store_parts():
+        p.unlink(missing_ok=True)
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _load_store(signature: tuple) -> Optional[pd.DataFrame]:
+    # cache_resource: büyük DF oturumlar arasında kopyalanmadan paylaşılır (salt okunur kullanılmalı)
+    df = _read_parts([n for n, _ in signature])
+    if df is None:
+        return None
+    df = df.drop_duplicates(subset=_KEY_COL, keep="last").drop(columns=[_KEY_COL, _ROW_HASH_COL])
+    df = compact_dtypes(df.reset_index(drop=True))
+    df.attrs[DATASET_ATTR] = "store-" + hashlib.sha1(repr(signature).encode()).hexdigest()[:16]
+    return df
+
+
+def load_order_store() -> Optional[pd.DataFrame]:
+    """Depodaki tüm geçmişi (tekilleştirilmiş) DF olarak döndürür; depo boşsa None."""
+    for _ in range(3):
+        sig = store_signature()
+        if not sig:
+            return None
+        try:
+            return _load_store(sig)
+        except FileNotFoundError:
+            # Okuma sırasında başka bir süreç depoyu birleştirdi; imzayı yenile
+            continue
+    return None
 
 
 # ---- Oturum veri paylaşımı ----
@@ -232,9 +1685,18 @@ SESSION_DF_KEY = "__MAIN_DF__"
 SESSION_FILE_NAME = "__FILE_NAME__"
 SESSION_RAW_DF_KEY = "__RAW_DF__"
 SESSION_RAW_SHEETS_KEY = "__RAW_SHEETS__"
+SESSION_UPLOAD_KEYS = "__UPLOAD_KEYS__"
+SESSION_STORE_ADDED = "__STORE_ADDED__"
+
+
+def _stamp_dataset(df: Optional[pd.DataFrame]):
+    # Oturuma alınan her yeni veri seti bir kimlik alır (bkz. dataset_fingerprint)
+    if df is not None and DATASET_ATTR not in df.attrs:
+        df.attrs[DATASET_ATTR] = uuid.uuid4().hex
 
 
 def set_df(df: pd.DataFrame, file_name: str | None = None):
+    _stamp_dataset(df)
     st.session_state[SESSION_DF_KEY] = df
     if file_name:
         st.session_state[SESSION_FILE_NAME] = file_name
@@ -242,6 +1704,7 @@ def set_df(df: pd.DataFrame, file_name: str | None = None):
 
 def set_raw_df(raw_df: pd.DataFrame, sheets: dict | None = None, file_name: str | None = None):
     """Store raw/unmodified dataframe (or combined raw) and optionally raw sheets dict in session."""
+    _stamp_dataset(raw_df)
     st.session_state[SESSION_RAW_DF_KEY] = raw_df
     if sheets is not None:
         st.session_state[SESSION_RAW_SHEETS_KEY] = sheets
@@ -249,12 +1712,23 @@ def set_raw_df(raw_df: pd.DataFrame, sheets: dict | None = None, file_name: str
         st.session_state[SESSION_FILE_NAME] = file_name
 
 
+def _session_from_store() -> Optional[pd.DataFrame]:
+    """Oturumda veri yoksa kalıcı depodaki geçmişi oturuma alır."""
+    df = load_order_store()
+    if df is not None:
+        st.session_state[SESSION_DF_KEY] = df
+        st.session_state[SESSION_RAW_DF_KEY] = df
+    return df
+
+
 def get_df() -> Optional[pd.DataFrame]:
-    return st.session_state.get(SESSION_DF_KEY)
+    df = st.session_state.get(SESSION_DF_KEY)
+    return df if df is not None else _session_from_store()
 
 
 def get_raw_df() -> Optional[pd.DataFrame]:
-    return st.session_state.get(SESSION_RAW_DF_KEY)
+    df = st.session_state.get(SESSION_RAW_DF_KEY)
+    return df if df is not None else _session_from_store()
 
 
 def get_raw_sheets() -> Optional[dict]:
@@ -265,79 +1739,596 @@ def get_file_name(default: str = "veri.xlsx") -> str:
     return st.session_state.get(SESSION_FILE_NAME, default)
 
 
+# ---- Ortak agregasyon indeksi ----
+# Sayfa 1/2/3/4/6'nın eşik ve detay sorguları her rerun'da tüm veri üzerinde groupby/merge
+# çalıştırmak yerine veri seti başına bir kez kurulan bu indeksten okunur.
+_AGG_COLS = [ORDER_COL, BUYER_COL, PRODUCT_COL, QTY_COL, AMOUNT_COL]
+
+
+def _factorize(ser: pd.Series) -> tuple[np.ndarray, pd.Index]:
+    """Sıralı kodlar (NaN → -1) ve benzersiz değerler; sıra groupby(sort=True) ile aynıdır."""
+    codes, uniques = pd.factorize(ser, sort=True)
+    return codes.astype(np.int64, copy=False), pd.Index(uniques, name=ser.name)
+
+
+class AggregateIndex:
+    """Bir veri seti için önceden hesaplanmış kodlar, agregasyonlar ve sipariş satır ofsetleri.
+
+    Parçalar ilk kullanıldıklarında bir kez hesaplanır (örn. sayfa 3 sipariş kolonuna hiç
+    dokunmaz); NaN anahtarlı satırlar groupby'daki gibi ilgili agregasyona katılmaz.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.n_rows = len(df)
+        # Kolon referansları tutulur: kaynak tamponlar yaşadıkça cache anahtarı (adres) tekil kalır
+        self._cols = {c: df[c] for c in _AGG_COLS if c in df.columns}
+
+    # -- kodlar --
+    @cached_property
+    def order(self) -> tuple[np.ndarray, pd.Index]:
+        return _factorize(self._cols[ORDER_COL])
+
+    @cached_property
+    def buyer(self) -> tuple[np.ndarray, pd.Index]:
+        return _factorize(self._cols[BUYER_COL])
+
+    @cached_property
+    def product(self) -> tuple[np.ndarray, pd.Index]:
+        return _factorize(self._cols[PRODUCT_COL])
+
+    @cached_property
+    def qty(self) -> np.ndarray:
+        return pd.to_numeric(self._cols[QTY_COL], errors="coerce").to_numpy(np.float64, na_value=0.0)
+
+    @cached_property
+    def amount(self) -> Optional[np.ndarray]:
+        if AMOUNT_COL not in self._cols:
+            return None
+        return pd.to_numeric(self._cols[AMOUNT_COL], errors="coerce").to_numpy(np.float64, na_value=0.0)
+
+    # -- sipariş bazında --
+    @cached_property
+    def order_sizes(self) -> np.ndarray:
+        codes, uniques = self.order
+        return np.bincount(codes[codes >= 0], minlength=len(uniques))
+
+    @cached_property
+    def order_rows(self) -> np.ndarray:
+        """Siparişe göre gruplanmış satır numaraları; i. siparişin satırları order_offsets[i:i+2] aralığında."""
+        codes, _ = self.order
+        rows = np.argsort(codes, kind="stable")
+        return rows[np.count_nonzero(codes < 0):]
+
+    @cached_property
+    def order_offsets(self) -> np.ndarray:
+        return np.concatenate([[0], np.cumsum(self.order_sizes)])
+
+    @cached_property
+    def order_n_products(self) -> np.ndarray:
+        """Sipariş başına farklı ürün sayısı (groupby(ORDER)[PRODUCT].nunique())."""
+        o_codes, o_uniques = self.order
+        p_codes, p_uniques = self.product
+        valid = (o_codes >= 0) & (p_codes >= 0)
+        pairs = np.unique(o_codes[valid] * len(p_uniques) + p_codes[valid])
+        return np.bincount(pairs // len(p_uniques), minlength=len(o_uniques))
+
+    @cached_property
+    def _orders_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({ORDER_COL: self.order[1], "Farklı Ürün Sayısı": self.order_n_products})
+
+    # -- alıcı bazında --
+    def _buyer_sum(self, values: np.ndarray) -> np.ndarray:
+        codes, uniques = self.buyer
+        valid = codes >= 0
+        return np.bincount(codes[valid], weights=values[valid], minlength=len(uniques))
+
+    @cached_property
+    def buyer_n_orders(self) -> np.ndarray:
+        """Alıcı başına farklı sipariş sayısı."""
+        b_codes, b_uniques = self.buyer
+        o_codes, o_uniques = self.order
+        valid = (b_codes >= 0) & (o_codes >= 0)
+        pairs = np.unique(b_codes[valid] * len(o_uniques) + o_codes[valid])
+        return np.bincount(pairs // len(o_uniques), minlength=len(b_uniques))
+
+    @cached_property
+    def buyer_qty(self) -> np.ndarray:
+        return np.rint(self._buyer_sum(self.qty)).astype(np.int64)
+
+    @cached_property
+    def _buyer_frame(self) -> pd.DataFrame:
+        out = pd.DataFrame({
+            BUYER_COL: self.buyer[1],
+            "Farklı Sipariş Sayısı": self.buyer_n_orders,
+            "Toplam Adet": self.buyer_qty,
+        })
+        if self.amount is not None:
+            out["Toplam Tutar"] = self._buyer_sum(self.amount)
+        return out
+
+    # -- alıcı × ürün --
+    @cached_property
+    def buyer_product_orders(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(alıcı kodu, ürün kodu, farklı sipariş sayısı); (alıcı, ürün) sırasında."""
+        b_codes, _ = self.buyer
+        p_codes, p_uniques = self.product
+        o_codes, _ = self.order
+        valid = (b_codes >= 0) & (p_codes >= 0)
+        pair = b_codes[valid] * len(p_uniques) + p_codes[valid]
+        triples = pd.DataFrame({"pair": pair, "order": o_codes[valid]}).drop_duplicates()
+        # Yalnızca NaN siparişli çiftler de groupby'daki gibi 0 ile yer alır
+        keys, inverse = np.unique(triples["pair"].to_numpy(), return_inverse=True)
+        counts = np.bincount(inverse, weights=triples["order"].to_numpy() >= 0, minlength=len(keys))
+        return keys // len(p_uniques), keys % len(p_uniques), counts.astype(np.int64)
+
+    # -- sorgular --
+    def order_detail_rows(self, order_mask: np.ndarray) -> np.ndarray:
+        """Maskede seçili siparişlerin satır numaraları (siparişe göre gruplu)."""
+        return self.order_rows[np.repeat(order_mask, self.order_sizes)]
+
+    def order_details(self, df: pd.DataFrame, order_mask: np.ndarray) -> pd.DataFrame:
+        """df.merge(seçili_siparişler, on=ORDER_COL) karşılığı; merge yerine satır ofsetleri kullanılır."""
+        return df.iloc[self.order_detail_rows(order_mask)].reset_index(drop=True)
+
+    def orders_with_many_products(self) -> pd.DataFrame:
+        return self._orders_frame.copy()
+
+    def product_count_distribution(self) -> pd.DataFrame:
+        """Farklı ürün sayısına göre sipariş sayısı."""
+        counts = np.bincount(self.order_n_products)
+        n = np.flatnonzero(counts)
+        return pd.DataFrame({"Farklı Ürün Sayısı": n, "Sipariş Sayısı": counts[n]})
+
+    def buyer_summary(self) -> pd.DataFrame:
+        return self._buyer_frame.copy()
+
+    def buyers_total_qty(self) -> pd.DataFrame:
+        return self._buyer_frame[[BUYER_COL, "Toplam Adet"]]
+
+    def same_product_across_distinct_orders(self, products: List[str]) -> pd.DataFrame:
+        buyers, prods, counts = self.buyer_product_orders
+        _, p_uniques = self.product
+        sel = p_uniques.get_indexer(pd.Index(products).unique())
+        mask = np.isin(prods, sel[sel >= 0])
+        return pd.DataFrame({
+            BUYER_COL: self.buyer[1].take(buyers[mask]),
+            PRODUCT_COL: p_uniques.take(prods[mask]),
+            "Farklı Sipariş Sayısı": counts[mask],
+        })
+
+
+def _buffer_address(ser: pd.Series) -> int:
+    arr = ser.array
+    values = arr.codes if isinstance(arr, pd.Categorical) else ser.to_numpy(copy=False)
+    return values.__array_interface__["data"][0]
+
+
+def _columns_fingerprint(df: pd.DataFrame, cols: List[str]) -> tuple:
+    return (len(df),) + tuple((c, _buffer_address(df[c])) for c in cols if c in df.columns)
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _cached_aggregate_index(_df: pd.DataFrame, fingerprint: tuple) -> AggregateIndex:
+    return AggregateIndex(_df)
+
+
+def aggregate_index(df: pd.DataFrame) -> AggregateIndex:
+    """df için ortak agregasyon indeksi (veri seti başına bir kez kurulur).
+
+    Anahtar, kolonların veri tamponu adresleridir: prepare_page_df görünümleri
+    aynı tamponları paylaştığından rerun'larda DF hash'lenmeden aynı indeks döner; filtrelenmiş
+    veya değiştirilmiş bir DF yeni tampon demektir ve kendi indeksini alır.
+    """
+    return _cached_aggregate_index(df, _columns_fingerprint(df, _AGG_COLS))
+
+
 # ---- Hazır özetler/hesaplar ----
-@st.cache_data(show_spinner=False)
 def buyer_summary(df: pd.DataFrame) -> pd.DataFrame:
-    base = df[[BUYER_COL, ORDER_COL]].drop_duplicates()
-    order_counts = base.groupby(BUYER_COL)[ORDER_COL].nunique().rename("Farklı Sipariş Sayısı")
-    qty_sum = df.groupby(BUYER_COL)[QTY_COL].sum().rename("Toplam Adet")
-    if AMOUNT_COL in df.columns:
-        amount_sum = df.groupby(BUYER_COL)[AMOUNT_COL].sum().rename("Toplam Tutar")
-        out = pd.concat([order_counts, qty_sum, amount_sum], axis=1).reset_index()
-    else:
-        out = pd.concat([order_counts, qty_sum], axis=1).reset_index()
-    return out.fillna(0)
+    return aggregate_index(df).buyer_summary()
 
 
-@st.cache_data(show_spinner=False)
 def orders_with_many_products(df: pd.DataFrame) -> pd.DataFrame:
-    grp = df.groupby(ORDER_COL)[PRODUCT_COL].nunique().reset_index(name="Farklı Ürün Sayısı")
-    return grp
+    return aggregate_index(df).orders_with_many_products()
 
 
-@st.cache_data(show_spinner=False)
 def buyers_over_total_qty(df: pd.DataFrame) -> pd.DataFrame:
-    return df.groupby(BUYER_COL)[QTY_COL].sum().reset_index(name="Toplam Adet")
+    return aggregate_index(df).buyers_total_qty()
 
 
-@st.cache_data(show_spinner=False)
 def same_product_across_distinct_orders(df: pd.DataFrame, products: List[str]) -> pd.DataFrame:
-    sub = df[df[PRODUCT_COL].isin(products)][[BUYER_COL, PRODUCT_COL, ORDER_COL]].drop_duplicates()
-    out = (
-        sub.groupby([BUYER_COL, PRODUCT_COL])[ORDER_COL]
-        .nunique()
-        .reset_index(name="Farklı Sipariş Sayısı")
-    )
+    return aggregate_index(df).same_product_across_distinct_orders(products)
+
+
+def package_count_distribution(df: pd.DataFrame, order_col: str = ORDER_COL, paket_col: str = "Paket No") -> pd.DataFrame:
+    """Sipariş başına farklı paket sayısının dağılımı → Paket Sayısı, Sipariş Sayısı.
+
+    observed=True: ORDER_COL kategorik olabilir (bkz. compact_dtypes); df'de geçmeyen
+    siparişler "0 paket" olarak sayılmaz.
+    """
+    per_order = df.groupby(order_col, observed=True)[paket_col].nunique()
+    return per_order.value_counts().sort_index().rename_axis("Paket Sayısı").rename("Sipariş Sayısı").reset_index()
+
+
+def split_multi_products(
+    df: pd.DataFrame, prod_col: str, qty_col: str, keep: List[str] = (), sep: str = "/"
+) -> pd.DataFrame:
+    """sep ile birleştirilmiş ürün adlarını (örn. "A / B") parça başına bir satıra açar.
+
+    Dönüş: keep kolonları + product, qty; keep/ürün/adet'i eksik satırlar atılır.
+    Adet kuralı: adet ≥ parça sayısıysa adet // parça sayısı her parçaya, değilse adetin
+    tamamı her parçaya yazılır. Tek parçalı adlar olduğu gibi kalır. Bölme yalnızca benzersiz
+    adlar üzerinde yapılır; satırlar parça sayısı kadar tekrarlanarak açılır.
+    """
+    sub = df[[*keep, prod_col, qty_col]].dropna()
+    codes, uniques = pd.factorize(sub[prod_col].astype(str))
+    names = pd.Series(uniques, dtype=object)
+    pieces = names.str.split(sep, regex=False).explode().str.strip()
+    pieces = pieces[pieces != ""]
+    n_split = pieces.groupby(level=0).size().reindex(names.index, fill_value=0).to_numpy()
+    multi = n_split > 1
+    # Benzersiz ad başına parça listesi (ad sırasıyla): çok parçalılar bölünmüş, diğerleri adın kendisi
+    parts = pd.concat([pieces[multi[pieces.index]], names[~multi]]).sort_index(kind="stable")
+    n_parts = np.where(multi, n_split, 1)
+    starts = np.concatenate(([0], np.cumsum(n_parts)[:-1]))
+
+    qty = sub[qty_col].to_numpy()
+    if not pd.api.types.is_numeric_dtype(qty.dtype):
+        qty = pd.to_numeric(sub[qty_col], errors="coerce").to_numpy(np.float64)
+    k = n_parts[codes]
+    qty = np.where((k > 1) & (qty >= k), qty // k, qty)
+
+    row = np.repeat(np.arange(len(sub)), k)
+    within = np.arange(len(row)) - np.repeat(np.cumsum(k) - k, k)
+    out = sub[list(keep)].iloc[row].reset_index(drop=True)
+    out["product"] = parts.to_numpy()[np.repeat(starts[codes], k) + within]
+    out["qty"] = qty[row]
     return out
 
 
 # ---- Geocoding ----
-@st.cache_data(show_spinner=True)
-def geocode_unique_addresses(addresses: List[str], provider: str = "ArcGIS") -> pd.DataFrame:
-    """Adres listesi → lat/lon. provider: 'ArcGIS' (varsayılan) veya 'Nominatim'."""
-    from geopy.extra.rate_limiter import RateLimiter
+# Sağlayıcı başına süreç genelinde tek token kovası: aynı anda kaç oturum/worker çalışırsa
+# çalışsın toplam istek hızı sağlayıcının sınırını aşmaz. İstekler thread havuzunda paralel
+# gider; zaman aşımı/geçici hatalarda artan beklemeyle yeniden denenir.
+# Sağlayıcı → (saniyedeki istek, biriktirilebilecek en fazla istek)
+GEOCODER_LIMITS = {
+    "Nominatim": (1.0, 1),  # OSM kullanım politikası: en fazla 1 istek/sn
+    "ArcGIS": (10.0, 10),
+}
+GEOCODE_WORKERS = {"Nominatim": 1, "ArcGIS": 8}
+GEOCODE_RETRIES = 3  # ilk denemeye ek olarak
+GEOCODE_BACKOFF = 1.0  # sn; her denemede iki katına çıkar
+GEOCODE_USER_AGENT = "streamlit-addr-geocoder"
+
+
+class TokenBucket:
+    """Thread-safe token kovası: saniyede rate token dolar, en fazla burst birikir.
+
+    clock/sleep testlerde sahte saatle değiştirilebilsin diye parametredir.
+    """
+
+    def __init__(self, rate: float, burst: int = 1, clock: Callable[[], float] = time.monotonic, sleep=time.sleep):
+        self.rate = float(rate)
+        self.burst = max(int(burst), 1)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(self.burst)
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Bir token alır; kova boşsa bir sonraki token dolana kadar bekler."""
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            self._sleep(wait)
+
+
+_GEO_BUCKETS: Dict[str, TokenBucket] = {}
+_GEO_BUCKETS_LOCK = threading.Lock()
+
+
+def provider_bucket(provider: str) -> TokenBucket:
+    with _GEO_BUCKETS_LOCK:
+        bucket = _GEO_BUCKETS.get(provider)
+        if bucket is None:
+            rate, burst = GEOCODER_LIMITS.get(provider, GEOCODER_LIMITS["Nominatim"])
+            bucket = _GEO_BUCKETS[provider] = TokenBucket(rate, burst)
+        return bucket
+
+
+def make_geocoder(provider: str) -> Callable:
+    """Sağlayıcının geocode fonksiyonu: sorgu → konum (latitude/longitude/address) veya None."""
     if provider == "Nominatim":
         from geopy.geocoders import Nominatim
-        geocoder = Nominatim(user_agent="streamlit-addr-geocoder")
-        rate = RateLimiter(geocoder.geocode, min_delay_seconds=1.0)
-    else:
-        from geopy.geocoders import ArcGIS
-        geocoder = ArcGIS(timeout=10)
-        rate = RateLimiter(geocoder.geocode, min_delay_seconds=0.2)
-
-    rows = []
-    for a in addresses:
-        if not a or not str(a).strip():
-            rows.append({"address": a, "lat": None, "lon": None})
-            continue
+        return Nominatim(user_agent=GEOCODE_USER_AGENT, timeout=10).geocode
+    from geopy.geocoders import ArcGIS
+    return ArcGIS(timeout=10).geocode
+
+
+def _retryable_geocode_errors() -> tuple:
+    try:
+        from geopy.exc import GeocoderRateLimited, GeocoderTimedOut, GeocoderUnavailable
+    except ImportError:
+        return (TimeoutError,)
+    return (GeocoderTimedOut, GeocoderUnavailable, GeocoderRateLimited, TimeoutError)
+
+
+# Sorgu hatayla bitti (zaman aşımı, ağ yok...): "bulunamadı"dan farklıdır, cache'lenmez
+_GEOCODE_FAILED = object()
+
+
+def _geocode_one(
+    geocode: Callable,
+    query: str,
+    bucket: TokenBucket,
+    retries: int,
+    backoff: float,
+    sleep=time.sleep,
+):
+    """Tek sorgu → (lat, lon, adres), bulunamadıysa None, hata alındıysa _GEOCODE_FAILED.
+
+    Geçici hatalar backoff ile yeniden denenir.
+    """
+    retryable = _retryable_geocode_errors()
+    for attempt in range(retries + 1):
+        bucket.acquire()
         try:
-            loc = rate(a)
-            if loc:
-                rows.append({"address": a, "lat": loc.latitude, "lon": loc.longitude})
-            else:
-                rows.append({"address": a, "lat": None, "lon": None})
+            loc = geocode(query)
+        except retryable as e:
+            if attempt == retries:
+                return _GEOCODE_FAILED
+            # Sağlayıcı "şu kadar bekle" dediyse ona uy
+            retry_after = getattr(e, "retry_after", None)
+            sleep(retry_after if retry_after else backoff * 2 ** attempt)
+            continue
         except Exception:
-            rows.append({"address": a, "lat": None, "lon": None})
-    return pd.DataFrame(rows)
+            return _GEOCODE_FAILED
+        if not loc:
+            return None
+        return float(loc.latitude), float(loc.longitude), getattr(loc, "address", None) or query
+    return _GEOCODE_FAILED
+
+
+def geocode_many(
+    queries: List[str],
+    provider: str = "ArcGIS",
+    geocode: Optional[Callable] = None,
+    max_workers: Optional[int] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+    retries: int = GEOCODE_RETRIES,
+    backoff: float = GEOCODE_BACKOFF,
+    bucket: Optional[TokenBucket] = None,
+    sleep=time.sleep,
+    results: Optional[Dict[str, Optional[tuple]]] = None,
+) -> Dict[str, Optional[tuple]]:
+    """Sorguları (tekilleştirerek) paralel geocode eder: {sorgu: (lat, lon, adres) | None}.
+
+    None: sağlayıcı sonuç bulamadı. Hatayla biten (yeniden denemeler de tükenen) sorgular
+    sonuçta yer almaz; bunlar cache'lenmemeli, sonra tekrar denenmelidir.
+
+    - geocode: sorgu → konum fonksiyonu; verilmezse sağlayıcınınki (make_geocoder). Testlerde
+      ağ gerektirmeyen sahte bir fonksiyon verilebilir.
+    - hız sınırı sağlayıcının ortak token kovasıyla uygulanır (bkz. GEOCODER_LIMITS); testlerde
+      sahte saatli bir bucket ve yeniden deneme beklemeleri için sleep verilebilir
+    - progress(biten, toplam) çağıran thread'de, her sorgu bittiğinde çağrılır
+    - results: sonuçların yazılacağı sözlük. Çağrı yarıda kesilirse (ör. progress içinde
+      Streamlit rerun'ı) kuyruktaki sorgular iptal edilir; o ana kadar bitenler bu sözlükte kalır
+    """
+    todo = list(dict.fromkeys(q for q in queries if q and str(q).strip()))
+    results = {} if results is None else results
+    if not todo:
+        return results
+    geocode = geocode or make_geocoder(provider)
+    bucket = bucket or provider_bucket(provider)
+    workers = min(len(todo), max_workers or GEOCODE_WORKERS.get(provider, 1))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ravla-geocode") as pool:
+        futures = {pool.submit(_geocode_one, geocode, q, bucket, retries, backoff, sleep): q for q in todo}
+
+        def keep(fut: Future):
+            res = fut.result()
+            if res is not _GEOCODE_FAILED:
+                results[futures[fut]] = res
+
+        try:
+            for done, fut in enumerate(as_completed(futures), start=1):
+                keep(fut)
+                if progress:
+                    progress(done, len(todo))
+        except BaseException:
+            # Kuyruktakiler beklenmez; yalnızca o an çalışan sorgular biter ve sonuca eklenir
+            pool.shutdown(cancel_futures=True)
+            for fut in futures:
+                if fut.done() and not fut.cancelled() and fut.exception() is None:
+                    keep(fut)
+            raise
+    return results
+
+
+def _format_duration(seconds: float) -> str:
+    seconds = int(round(seconds))
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}" if seconds >= 3600 else f"{seconds // 60}:{seconds % 60:02d}"
+
+
+def geocode_progress(bar, label: str = "Geocode") -> Callable[[int, int], None]:
+    """st.progress çubuğunu güncelleyen progress(biten, toplam) callback'i: hız ve kalan süre ile.
+
+    Hız, ilk çağrıdan (cache'ten gelenler sayılmadan) itibaren ölçülür.
+    """
+    started = time.monotonic()
+    first_done: List[int] = []
+
+    def update(done: int, total: int):
+        if not first_done:
+            first_done.append(done)
+        elapsed = time.monotonic() - started
+        rate = (done - first_done[0]) / elapsed if elapsed > 0 else 0.0
+        text = f"{label}: {done:,}/{total:,}"
+        if rate > 0:
+            text += f" · {rate:.1f} sorgu/sn · kalan ~{_format_duration((total - done) / rate)}"
+        bar.progress(done / total if total else 1.0, text=text)
+
+    return update
+
+
+# ---- Çevrimdışı il/ilçe gazetteer'ı ----
+# 81 il ve ilçe merkezlerinin koordinatları uygulamayla gelir (data/tr_il_ilce.csv, üretimi:
+# data/build_tr_gazetteer.py). Çiftler tek bir vektörel join ile çözülür; sağlayıcıya yalnızca
+# tabloda bulunmayanlar gider.
+GAZETTEER_PATH = Path(__file__).parent / "data" / "tr_il_ilce.csv"
+# İl merkezini ifade eden ilçe yazımları (normalize edilmiş hâlleri)
+MERKEZ_ILCE_KEYS = ("merkez", "merkez ilce", "il merkezi")
+
+# Türkçe harfler → ASCII (küçük harfe çevrildikten sonra)
+_TR_FOLD = [("ı", "i"), ("ç", "c"), ("ğ", "g"), ("ö", "o"), ("ş", "s"), ("ü", "u"), ("â", "a"), ("î", "i"), ("û", "u")]
+
+
+def _fold_tr_arrow(arr):
+    # Türkçe büyük/küçük harf: I → ı, İ → i (utf8_lower "İ"yi "i̇" yapardı)
+    arr = pc.replace_substring(arr, "I", "ı")
+    arr = pc.replace_substring(arr, "İ", "i")
+    arr = pc.utf8_lower(arr)
+    for src, dst in _TR_FOLD:
+        arr = pc.replace_substring(arr, src, dst)
+    # Kalan aksanlar/noktalama → boşluk; boşluklar tekilleştirilir
+    arr = pc.replace_substring_regex(arr, r"[^a-z0-9]+", " ")
+    return pc.utf8_trim(arr, " ")
+
+
+def geo_key_series(ser: pd.Series) -> pd.Series:
+    """İl/ilçe eşleştirme anahtarı: "İSTANBUL " / "istanbul", "Kadıköy" / "KADIKOY" aynı olur.
+
+    NaN ve boş değerler "" olur.
+    """
+    arr = _map_unique(pc.fill_null(_arrow_strings(ser), ""), _fold_tr_arrow)
+    return pd.Series(arr.to_numpy(zero_copy_only=False), index=ser.index, name=ser.name)
+
+
+def _geo_pair_keys(il: pd.Series, ilce: pd.Series) -> tuple[pd.Series, pd.Series]:
+    """(il, ilçe) anahtarları; "Merkez" ve il adıyla aynı ilçe il merkezi ("") sayılır."""
+    il_key, ilce_key = geo_key_series(il), geo_key_series(ilce)
+    merkez = ilce_key.isin(MERKEZ_ILCE_KEYS) | (ilce_key == il_key)
+    return il_key, ilce_key.mask(merkez, "")
+
+
+@st.cache_data(show_spinner=False)
+def load_gazetteer(path: str = str(GAZETTEER_PATH)) -> pd.DataFrame:
+    """Gazetteer tablosu: il, ilce (il satırlarında ""), lat, lon + eşleştirme anahtarları."""
+    gz = pd.read_csv(path, comment="#", dtype={"il": str, "ilce": str}, keep_default_na=False)
+    gz["il_key"], gz["ilce_key"] = _geo_pair_keys(gz["il"], gz["ilce"])
+    # "Merkez" ilçeleri il satırıyla aynı anahtara düşer; il satırı (önce gelen) kalır
+    return gz.drop_duplicates(["il_key", "ilce_key"]).reset_index(drop=True)
+
+
+def resolve_il_ilce_offline(pairs: pd.DataFrame) -> pd.DataFrame:
+    """pairs (il, ilce kolonları) → aynı sırada il, ilce, address, lat, lon; bulunamayanlarda NaN."""
+    gz = load_gazetteer()
+    il_key, ilce_key = _geo_pair_keys(pairs["il"], pairs["ilce"])
+    keys = pd.DataFrame({"il_key": il_key.to_numpy(), "ilce_key": ilce_key.to_numpy()})
+    hit = keys.merge(gz, on=["il_key", "ilce_key"], how="left")
+    address = (hit["ilce"] + ", " + hit["il"] + ", Türkiye").where(hit["ilce"] != "", hit["il"] + ", Türkiye")
+    return pd.DataFrame({
+        "il": pairs["il"].to_numpy(),
+        "ilce": pairs["ilce"].to_numpy(),
+        "address": address.to_numpy(),
+        "lat": hit["lat"].to_numpy(),
+        "lon": hit["lon"].to_numpy(),
+    })
 
 
 # ----------------- Geocode cache (SQLite) -----------------
+# Süreç başına tek, uzun ömürlü bağlantı (WAL + busy timeout): okuyucular yazanı beklemez,
+# aynı dosyayı paylaşan diğer Streamlit süreçleri kilitte hata yerine kısa süre bekler.
+# Okumalar geçici tablo join'iyle, yazmalar executemany ile toplu yapılır.
+#
+# Kayıtlar normalize edilmiş anahtarla (bkz. geo_pair_key) ve sağlayıcıyla tutulur.
+# "Bulunamadı" sonuçları da (status='miss') daha kısa ömürle saklanır; her kaydın kendi
+# bitiş zamanı vardır, süresi dolan kayıt yokmuş gibi davranır.
 DB_PATH = Path(__file__).parent / "geocode_cache.sqlite"
+GEO_DB_BUSY_TIMEOUT = 30.0  # sn
+GEO_CACHE_TTL = 365 * 86400  # sn; bulunan koordinatlar
+GEO_NEGATIVE_TTL = 7 * 86400  # sn; "bulunamadı" (sağlayıcı verisi değişebilir)
+GEO_SCHEMA_VERSION = 1
+# Sağlayıcı sonuç bulamazsa sıradakiler denenir
+GEOCODE_FALLBACKS = {"ArcGIS": ("Nominatim",), "Nominatim": ("ArcGIS",)}
+# Bu kadar sorguda bir sonuçlar cache'e yazılır: yarıda kesilen iş kaldığı yerden devam eder
+GEOCODE_CHECKPOINT = 100
+_GEO_DB_LOCK = threading.RLock()
+_GEO_DB: Optional[tuple] = None  # (pid, yol, bağlantı)
+
+
+def geo_pair_key(il: pd.Series, ilce: pd.Series) -> pd.Series:
+    """(il, ilçe) → "il|ilce" cache anahtarı; yazım/büyük-küçük harf farkları aynı anahtara düşer."""
+    il_key, ilce_key = _geo_pair_keys(il, ilce)
+    return il_key + "|" + ilce_key
+
+
+def unique_il_ilce(il: pd.Series, ilce: pd.Series, sort: bool = True) -> pd.DataFrame:
+    """İl/ilçe kolonlarından tekil (il, ilce) çiftleri (object kolonlar).
+
+    Baş/son boşluklar atılır, eksikler "" olur, ikisi de boş çiftler atılır. Önce ham değer
+    çiftleri tekilleştirilir: metin işlemleri satır sayısıyla değil çift sayısıyla büyür.
+    sort=False ilk görülme sırasını korur.
+    """
+    raw = pd.DataFrame({"il": il.reset_index(drop=True), "ilce": ilce.reset_index(drop=True)}).drop_duplicates()
+    out = pd.DataFrame({c: raw[c].astype("string").str.strip().fillna("").astype(object) for c in ("il", "ilce")})
+    out = out[(out["il"] != "") | (out["ilce"] != "")].drop_duplicates()
+    if sort:
+        out = out.sort_values(["il", "ilce"])
+    return out.reset_index(drop=True)
+
+
+def il_ilce_query(il: pd.Series, ilce: pd.Series) -> pd.Series:
+    """Sağlayıcıya gidecek sorgu: "İlçe, İl, Türkiye" (boş alanlar atlanır)."""
+    return build_full_address(pd.DataFrame({"ilce": ilce, "il": il, "ulke": "Türkiye"}), ["ilce", "il", "ulke"], normalize=False)
+
+
+def geocode_chain(provider: str) -> List[str]:
+    return [provider, *(p for p in GEOCODE_FALLBACKS.get(provider, ()) if p != provider)]
 
-def init_geo_db():
-    con = sqlite3.connect(DB_PATH)
-    cur = con.cursor()
-    cur.execute(
+
+def _migrate_geo_db(con: sqlite3.Connection):
+    """v0 (il, ilce, provider anahtarlı) tabloya anahtar/durum/bitiş kolonlarını ekler."""
+    con.execute("BEGIN IMMEDIATE")
+    try:
+        # Başka süreç aynı anda taşımış olabilir
+        if con.execute("PRAGMA user_version").fetchone()[0] >= GEO_SCHEMA_VERSION:
+            con.execute("COMMIT")
+            return
+        cols = {row[1] for row in con.execute("PRAGMA table_info(geo_cache)")}
+        for name, decl in [("key", "TEXT"), ("status", "TEXT NOT NULL DEFAULT 'ok'"), ("expires_at", "REAL")]:
+            if name not in cols:
+                con.execute(f"ALTER TABLE geo_cache ADD COLUMN {name} {decl}")
+        con.execute("CREATE UNIQUE INDEX IF NOT EXISTS geo_cache_key ON geo_cache(key, provider)")
+        rows = con.execute("SELECT id, il, ilce FROM geo_cache WHERE key IS NULL").fetchall()
+        if rows:
+            ids, ils, ilces = zip(*rows)
+            keys = geo_pair_key(pd.Series(ils, dtype=object), pd.Series(ilces, dtype=object))
+            expires = time.time() + GEO_CACHE_TTL
+            con.executemany(
+                "UPDATE OR IGNORE geo_cache SET key = ?, expires_at = ? WHERE id = ?",
+                [(k, expires, i) for k, i in zip(keys, ids)],
+            )
+            # Normalize edilince başka kayıtla çakışan eski yazımlar
+            con.execute("DELETE FROM geo_cache WHERE key IS NULL")
+        con.execute(f"PRAGMA user_version = {GEO_SCHEMA_VERSION}")
+    except BaseException:
+        con.execute("ROLLBACK")
+        raise
+    con.execute("COMMIT")
+
+
+def init_geo_db(con: Optional[sqlite3.Connection] = None):
+    if con is None:
+        with _GEO_DB_LOCK:
+            _geo_db()
+        return
+    con.execute(
         """
         CREATE TABLE IF NOT EXISTS geo_cache (
             id INTEGER PRIMARY KEY,
@@ -352,96 +2343,385 @@ def init_geo_db():
         )
         """
     )
-    con.commit()
-    con.close()
+    if con.execute("PRAGMA user_version").fetchone()[0] < GEO_SCHEMA_VERSION:
+        _migrate_geo_db(con)
+
+
+def _geo_db() -> sqlite3.Connection:
+    """Bu sürecin geocode cache bağlantısı (fork sonrası veya DB_PATH değişince yeniden açılır).
+
+    Çağıran _GEO_DB_LOCK'u tutmalı: bağlantı thread'ler arasında paylaşılır.
+    """
+    global _GEO_DB
+    key = (os.getpid(), str(DB_PATH))
+    if _GEO_DB is not None and _GEO_DB[:2] == key:
+        return _GEO_DB[2]
+    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+    # isolation_level=None: işlemler aşağıda açıkça başlatılır
+    con = sqlite3.connect(DB_PATH, timeout=GEO_DB_BUSY_TIMEOUT, check_same_thread=False, isolation_level=None)
+    con.execute(f"PRAGMA busy_timeout = {int(GEO_DB_BUSY_TIMEOUT * 1000)}")
+    con.execute("PRAGMA journal_mode = WAL")
+    con.execute("PRAGMA synchronous = NORMAL")
+    init_geo_db(con)
+    con.execute("DELETE FROM geo_cache WHERE expires_at <= ?", (time.time(),))
+    con.execute("CREATE TEMP TABLE IF NOT EXISTS geo_lookup_keys (key TEXT PRIMARY KEY)")
+    _GEO_DB = (*key, con)
+    return con
+
+
+def geo_cache_lookup(keys: List[str], provider: str = "ArcGIS") -> Dict[str, Optional[tuple]]:
+    """Süresi dolmamış kayıtlar: {anahtar: (lat, lon, address)}; "bulunamadı" kayıtları None."""
+    keys = list(dict.fromkeys(keys))
+    if not keys:
+        return {}
+    with _GEO_DB_LOCK:
+        con = _geo_db()
+        con.execute("BEGIN")
+        try:
+            con.execute("DELETE FROM geo_lookup_keys")
+            con.executemany("INSERT INTO geo_lookup_keys (key) VALUES (?)", [(k,) for k in keys])
+            rows = con.execute(
+                """
+                SELECT g.key, g.status, g.lat, g.lon, g.address
+                FROM geo_lookup_keys k JOIN geo_cache g ON g.key = k.key
+                WHERE g.provider = ? AND (g.expires_at IS NULL OR g.expires_at > ?)
+                """,
+                (provider, time.time()),
+            ).fetchall()
+            con.execute("DELETE FROM geo_lookup_keys")
+        finally:
+            con.execute("COMMIT")
+    return {k: (lat, lon, address) if status == "ok" else None for k, status, lat, lon, address in rows}
+
+
+def geo_cache_store(rows: List[tuple], provider: str = "ArcGIS"):
+    """rows: [(anahtar, il, ilce, address, lat, lon), ...]; lat None ise "bulunamadı" kaydı.
+
+    Tek işlemde yazılır; her satırın bitiş zamanı durumuna göre (GEO_CACHE_TTL / GEO_NEGATIVE_TTL).
+    """
+    if not rows:
+        return
+    now = time.time()
+    params = [
+        (key, il, ilce, address, lat, lon, provider,
+         "ok" if lat is not None else "miss",
+         now + (GEO_CACHE_TTL if lat is not None else GEO_NEGATIVE_TTL))
+        for key, il, ilce, address, lat, lon in rows
+    ]
+    with _GEO_DB_LOCK:
+        con = _geo_db()
+        # IMMEDIATE: yazma kilidi baştan alınır; diğer süreçlerle kilit yükseltme çakışması olmaz
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            con.executemany(
+                """
+                INSERT OR REPLACE INTO geo_cache (key, il, ilce, address, lat, lon, provider, status, expires_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                params,
+            )
+        except BaseException:
+            con.execute("ROLLBACK")
+            raise
+        con.execute("COMMIT")
+
+
+def _pair_keys(pairs: List[tuple]) -> List[str]:
+    frame = pd.DataFrame(pairs, columns=["il", "ilce"], dtype=object)
+    return geo_pair_key(frame["il"], frame["ilce"]).tolist()
+
+
+def get_cached_coords_bulk(pairs: List[tuple], provider: str = "ArcGIS") -> Dict[tuple, tuple]:
+    """[(il, ilce), ...] → {(il, ilce): (lat, lon, address)}; yalnızca cache'te bulunanlar döner."""
+    pairs = list(dict.fromkeys(pairs))
+    if not pairs:
+        return {}
+    keys = _pair_keys(pairs)
+    hits = geo_cache_lookup(keys, provider)
+    return {pair: hits[k] for pair, k in zip(pairs, keys) if hits.get(k)}
+
+
+def set_cached_coords_bulk(rows: List[tuple], provider: str = "ArcGIS"):
+    """rows: [(il, ilce, address, lat, lon), ...] tek işlemde yazılır."""
+    if rows:
+        keys = _pair_keys([(il, ilce) for il, ilce, *_ in rows])
+        geo_cache_store([(k, *row) for k, row in zip(keys, rows)], provider)
 
 
 def get_cached_coords(il: str, ilce: str, provider: str = "ArcGIS") -> tuple | None:
-    init_geo_db()
-    con = sqlite3.connect(DB_PATH)
-    cur = con.cursor()
-    cur.execute("SELECT lat, lon, address FROM geo_cache WHERE il=? AND ilce=? AND provider=?", (il, ilce, provider))
-    row = cur.fetchone()
-    con.close()
-    if row:
-        return (row[0], row[1], row[2])
-    return None
+    return get_cached_coords_bulk([(il, ilce)], provider).get((il, ilce))
 
 
 def set_cached_coords(il: str, ilce: str, address: str, lat: float, lon: float, provider: str = "ArcGIS"):
-    init_geo_db()
-    con = sqlite3.connect(DB_PATH)
-    cur = con.cursor()
-    try:
-        cur.execute(
-            "INSERT OR REPLACE INTO geo_cache (il, ilce, address, lat, lon, provider) VALUES (?, ?, ?, ?, ?, ?)",
-            (il, ilce, address, lat, lon, provider),
-        )
-        con.commit()
-    finally:
-        con.close()
+    set_cached_coords_bulk([(il, ilce, address, lat, lon)], provider)
+
+
+def _geocode_pending(
+    pending: Dict[str, tuple],
+    provider: str,
+    online: bool,
+    geocoders: Optional[Dict[str, Callable]],
+    max_workers: Optional[int],
+    progress: Optional[Callable[[int, int], None]],
+) -> Dict[str, tuple]:
+    """pending: {anahtar: (sorgu, il, ilce)} → {anahtar: (lat, lon, address, kaynak)}.
+
+    geocode_chain(provider) sırasıyla her sağlayıcı için: cache'teki (olumlu/olumsuz) kayıtlar
+    kullanılır, kalanlar (online ise) GEOCODE_CHECKPOINT'lik dilimler halinde sorulur ve her
+    dilim bitince cache'e yazılır. progress(biten, toplam) cache'ten gelenleri de sayar.
+    """
+    resolved: Dict[str, tuple] = {}
+    for prov in geocode_chain(provider):
+        if not pending:
+            break
+        cached = geo_cache_lookup(list(pending), prov)
+        resolved.update({k: (*hit, "cache") for k, hit in cached.items() if hit})
+        todo = [k for k in pending if k not in cached]
+        if online and todo:
+            geocode = (geocoders or {}).get(prov) or make_geocoder(prov)
+            total, base = len(pending), len(pending) - len(todo)
+            for start in range(0, len(todo), GEOCODE_CHECKPOINT):
+                chunk = todo[start:start + GEOCODE_CHECKPOINT]
+                offset = base + start
+                found: Dict[str, Optional[tuple]] = {}
+                try:
+                    geocode_many(
+                        [pending[k][0] for k in chunk], provider=prov, geocode=geocode, max_workers=max_workers,
+                        progress=(lambda done, _, offset=offset: progress(offset + done, total)) if progress else None,
+                        results=found,
+                    )
+                finally:
+                    # Yarıda kesilse de (rerun) dilimde o ana kadar bitenler cache'e yazılır
+                    rows = []
+                    for k in chunk:
+                        query, il_s, ilce_s = pending[k]
+                        if query not in found:
+                            continue  # hata/iptal: cache'lenmez, sonraki denemede yeniden sorulur
+                        hit = found[query]
+                        lat, lon, address = hit if hit else (None, None, None)
+                        rows.append((k, il_s, ilce_s, address, lat, lon))
+                        if hit:
+                            resolved[k] = (lat, lon, address, prov)
+                    geo_cache_store(rows, prov)
+        pending = {k: v for k, v in pending.items() if k not in resolved}
+    return resolved
+
+
+def _fill_resolved(out: pd.DataFrame, idx: pd.Index, keys: pd.Series, resolved: Dict[str, tuple]):
+    """resolved sonuçlarını out'un idx satırlarına (keys sırasıyla) yazar."""
+    if not resolved:
+        return
+    res = pd.DataFrame.from_dict(resolved, orient="index", columns=["lat", "lon", "address", "source"])
+    res = res.reindex(keys.to_numpy())
+    hit = res["lat"].notna().to_numpy()
+    rows = idx[hit]
+    out.loc[rows, "lat"] = res["lat"].to_numpy(dtype=float)[hit]
+    out.loc[rows, "lon"] = res["lon"].to_numpy(dtype=float)[hit]
+    out.loc[rows, "address"] = res["address"].to_numpy()[hit]
+    out.loc[rows, "source"] = res["source"].to_numpy()[hit]
+
+
+def geocode_il_ilce(
+    pairs: List[tuple] | pd.DataFrame,
+    provider: str = "ArcGIS",
+    geocoders: Optional[Dict[str, Callable]] = None,
+    max_workers: Optional[int] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+    online: bool = True,
+) -> pd.DataFrame:
+    """pairs: list of (il, ilce) or a DataFrame with il, ilce columns (see unique_il_ilce).
+    Returns DataFrame with il, ilce, address, lat, lon, source.
+
+    Resolution order: bundled gazetteer (one vectorized join), then for each provider in
+    geocode_chain(provider): SQLite cache (one bulk lookup, positive and negative entries)
+    → provider call for the remaining pairs (in parallel, checkpointed; see _geocode_pending).
+    Pairs are deduplicated by their normalized key. With online=False no provider is called.
+    geocoders: optional {provider: geocode function} (e.g. a fake geocoder in tests).
+    """
+    if not isinstance(pairs, pd.DataFrame):
+        pairs = pd.DataFrame(list(pairs), columns=["il", "ilce"], dtype=object)
+    cols = ["il", "ilce", "address", "lat", "lon", "source"]
+    keys = unique_il_ilce(pairs["il"], pairs["ilce"], sort=False)
+    if keys.empty:
+        return pd.DataFrame(columns=cols)
+
+    out = resolve_il_ilce_offline(keys)
+    out["source"] = np.where(out["lat"].notna(), "gazetteer", None)
+    todo = out[out["lat"].isna()]
+    todo_keys = geo_pair_key(todo["il"], todo["ilce"])
+    # Anahtar başına bir sorgu (ilk görülen yazımla)
+    first = todo[~todo_keys.duplicated().to_numpy()]
+    pending = {
+        k: (q, il_s, ilce_s)
+        for k, q, il_s, ilce_s in zip(todo_keys.drop_duplicates(), il_ilce_query(first["il"], first["ilce"]), first["il"], first["ilce"])
+    }
+    resolved = _geocode_pending(pending, provider, online, geocoders, max_workers, progress)
+    _fill_resolved(out, todo.index, todo_keys, resolved)
+    return out[cols]
+
+
+def geocode_unique_addresses(
+    addresses: List[str],
+    provider: str = "ArcGIS",
+    geocoders: Optional[Dict[str, Callable]] = None,
+    max_workers: Optional[int] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+    online: bool = True,
+) -> pd.DataFrame:
+    """Adres listesi → aynı sırada address, lat, lon, source. provider: 'ArcGIS' veya 'Nominatim'.
+
+    Adresler normalize edilmiş hâlleriyle tekilleştirilir ve il/ilçe ile aynı kalıcı cache'te
+    ("adres|" önekli anahtarla) tutulur. Sonuçlar dilim dilim yazıldığından rerun veya sunucu
+    yeniden başlatmasıyla yarıda kalan iş, tekrar çağrıldığında kaldığı yerden devam eder.
+    """
+    ser = pd.Series(list(addresses), dtype=object)
+    keys = "adres|" + geo_key_series(ser)
+    out = pd.DataFrame({"address": ser, "lat": np.nan, "lon": np.nan, "source": None})
+    valid = keys != "adres|"
+    todo_keys = keys[valid]
+    pending = {}
+    for k, a in zip(todo_keys, ser[valid]):
+        pending.setdefault(k, (str(a).strip(), None, None))
+    resolved = _geocode_pending(pending, provider, online, geocoders, max_workers, progress)
+    _fill_resolved(out, todo_keys.index, todo_keys, resolved)
+    # Girdi adresi korunur; sağlayıcının döndürdüğü açık adres ayrı kolonda değil
+    out["address"] = ser
+    return out
 
 
-def geocode_il_ilce(pairs: List[tuple], provider: str = "ArcGIS", sleep: float = 0.2) -> pd.DataFrame:
-    """pairs: list of (il, ilce). Returns DataFrame with il, ilce, address, lat, lon.
-    Uses SQLite cache to avoid re-geocoding existing rows."""
-    results = []
-    # prepare geocoder
-    if provider == "Nominatim":
-        from geopy.geocoders import Nominatim
-        geocoder = Nominatim(user_agent="streamlit-addr-geocoder")
-        rate_sleep = 1.0
-    else:
-        from geopy.geocoders import ArcGIS
-        geocoder = ArcGIS(timeout=10)
-        rate_sleep = sleep
-
-    for il, ilce in pairs:
-        il_s = str(il).strip() if pd.notna(il) else ""
-        ilce_s = str(ilce).strip() if pd.notna(ilce) else ""
-        if not il_s and not ilce_s:
-            continue
-        cache = get_cached_coords(il_s, ilce_s, provider=provider)
-        if cache:
-            lat, lon, address = cache[0], cache[1], cache[2]
-            results.append({"il": il_s, "ilce": ilce_s, "address": address, "lat": lat, "lon": lon})
+def build_full_address(df: pd.DataFrame, use_fields: List[str], normalize: bool = True) -> pd.Series:
+    """Seçili alanları "Adres, İlçe, İl" şeklinde birleştirir; boş alanlar atlanır.
+
+    Kolonlar satır satır değil Arrow üzerinde bütün olarak birleştirilir; normalize=False
+    parçaların yazımını olduğu gibi bırakır.
+    """
+    parts = []
+    for c in use_fields:
+        if c not in df.columns:
             continue
+        parts.append(_map_unique(_arrow_strings(df[c]), _blank_to_null))
+    if not parts:
+        return pd.Series("", index=df.index)
+    joined = parts[0]
+    for part in parts[1:]:
+        # İkisi de doluysa ", " ile birleştir, değilse dolu olanı al
+        joined = pc.coalesce(pc.binary_join_element_wise(joined, part, ", "), joined, part)
+    joined = pc.fill_null(joined, "")
+    if normalize:
+        joined = _map_unique(joined, _norm_arrow)
+    return pd.Series(joined.to_numpy(zero_copy_only=False), index=df.index)
+
+
+# ---- Harita agregasyonu ----
+# Tarayıcıya satır değil, sunucuda toplanmış noktalar/hücreler gider. Ürün başına il/ilçe
+# toplamı veri seti başına bir kez hesaplanır (ürün seçimi değişince yalnızca yeni ürünler
+# hesaplanır); noktalar yakınlaştırma seviyesine göre boyutlanan altıgen/kare hücrelerde toplanır.
+MAP_CELL_PIXELS = 40  # bir hücrenin ekranda kapladığı yaklaşık genişlik (px)
+MAP_PAIR_QTY_COLS = [PRODUCT_COL, "il", "ilce", "Toplam Adet", "Satır"]
+_EARTH_KM = 40075.017
+_KM_PER_DEG_LAT = 110.574
+_KM_PER_DEG_LON = 111.320  # ekvatorda; cos(enlem) ile çarpılır
+
+
+@st.cache_data(show_spinner=False, max_entries=512)
+def _product_pair_qty(_df: pd.DataFrame, fingerprint: tuple, product: str) -> pd.DataFrame:
+    sub = _df.loc[_df[PRODUCT_COL] == product]
+    out = (
+        pd.DataFrame({
+            "il": sub["İl"].astype("string").str.strip().fillna(""),
+            "ilce": sub["İlçe"].astype("string").str.strip().fillna(""),
+            "qty": pd.to_numeric(sub[QTY_COL], errors="coerce"),
+        })
+        .groupby(["il", "ilce"], sort=False)
+        .agg(**{"Toplam Adet": ("qty", "sum"), "Satır": ("qty", "size")})
+        .reset_index()
+    )
+    out = out[(out["il"] != "") | (out["ilce"] != "")].astype({"il": object, "ilce": object})
+    out.insert(0, PRODUCT_COL, product)
+    return out.reset_index(drop=True)
 
-        # build simple query: "İlçe, İl, Türkiye"
-        query = f"{ilce_s}, {il_s}, Türkiye" if ilce_s else f"{il_s}, Türkiye"
-        try:
-            loc = geocoder.geocode(query)
-            if loc:
-                lat, lon = float(loc.latitude), float(loc.longitude)
-                address = loc.address if hasattr(loc, "address") else query
-                set_cached_coords(il_s, ilce_s, address, lat, lon, provider=provider)
-                results.append({"il": il_s, "ilce": ilce_s, "address": address, "lat": lat, "lon": lon})
-            else:
-                results.append({"il": il_s, "ilce": ilce_s, "address": None, "lat": None, "lon": None})
-        except Exception:
-            results.append({"il": il_s, "ilce": ilce_s, "address": None, "lat": None, "lon": None})
-        time.sleep(rate_sleep)
 
-    return pd.DataFrame(results)
+def product_pair_qty(df: pd.DataFrame, products: List[str]) -> pd.DataFrame:
+    """Seçili ürünlerin il/ilçe başına toplam adedi ve satır sayısı (MAP_PAIR_QTY_COLS).
+
+    Her ürünün özeti ayrı cache'lenir: seçime ürün eklemek/çıkarmak diğerlerini yeniden hesaplamaz.
+    """
+    fingerprint = (df.attrs.get(DATASET_ATTR),) + _columns_fingerprint(df, [PRODUCT_COL, "İl", "İlçe", QTY_COL])
+    frames = [_product_pair_qty(df, fingerprint, p) for p in dict.fromkeys(products)]
+    if not frames:
+        return pd.DataFrame(columns=MAP_PAIR_QTY_COLS)
+    return pd.concat(frames, ignore_index=True)
 
 
-def build_full_address(df: pd.DataFrame, use_fields: List[str]) -> pd.Series:
-    parts = [df[c].fillna("") if c in df.columns else "" for c in use_fields]
-    # "Adres, İlçe, İl" şeklinde birleştir
-    ser = (
-        pd.DataFrame({i: p for i, p in enumerate(parts)})
-        .astype(str)
-        .apply(lambda r: ", ".join([x for x in r.tolist() if x and str(x).strip()]), axis=1)
-        .map(norm_text)
+def map_points(pair_qty: pd.DataFrame, geo_pairs: pd.DataFrame) -> pd.DataFrame:
+    """product_pair_qty çıktısına geocode_il_ilce koordinatlarını bağlar.
+
+    Dönüş: address, lat, lon, PRODUCT_COL, Toplam Adet, Satır (adres+ürün başına bir nokta);
+    koordinatı olmayan çiftler atılır.
+    """
+    coords = geo_pairs.dropna(subset=["lat", "lon"])[["il", "ilce", "address", "lat", "lon"]]
+    return (
+        pair_qty.merge(coords, on=["il", "ilce"], how="inner")
+        .groupby(["address", "lat", "lon", PRODUCT_COL], sort=False)[["Toplam Adet", "Satır"]]
+        .sum()
+        .reset_index()
+    )
+
+
+def lod_cell_km(zoom: float, lat: float = 39.0, cell_pixels: int = MAP_CELL_PIXELS) -> float:
+    """zoom seviyesinde cell_pixels ekran genişliğinin km karşılığı (Web Mercator, 256 px karo)."""
+    return _EARTH_KM * float(np.cos(np.radians(lat))) / 2 ** zoom * cell_pixels / 256
+
+
+def spatial_bins(points: pd.DataFrame, cell_km: float, shape: str = "hex", weight: str = "Toplam Adet") -> pd.DataFrame:
+    """Noktaları altıgen ('hex', cell_km = merkez-köşe uzaklığı) veya kare ('grid', cell_km = kenar)
+    hücrelerde toplar. Dönüş: hücre merkezi lat, lon, weight toplamı ve Nokta (nokta sayısı).
+
+    Koordinatlar noktaların ortalama enlemi etrafında eşdikdörtgen izdüşümle km'ye çevrilir;
+    ülke ölçeğinde hücre boyutundaki sapma görselleştirme için önemsizdir.
+    """
+    if points.empty:
+        return pd.DataFrame(columns=["lat", "lon", weight, "Nokta"])
+    lat = points["lat"].to_numpy(np.float64)
+    lon = points["lon"].to_numpy(np.float64)
+    km_lon = _KM_PER_DEG_LON * np.cos(np.radians(lat.mean()))
+    x, y = lon * km_lon, lat * _KM_PER_DEG_LAT
+    if shape == "hex":
+        # Düz tepeli altıgenler: eksenel (q, r) koordinatlar, küp koordinatlarında yuvarlama
+        q = (2 / 3 * x) / cell_km
+        r = (-x / 3 + np.sqrt(3) / 3 * y) / cell_km
+        rq, rr, rs = np.round(q), np.round(r), np.round(-q - r)
+        dq, dr, ds = np.abs(rq - q), np.abs(rr - r), np.abs(rs + q + r)
+        fix_q = (dq > dr) & (dq > ds)
+        fix_r = ~fix_q & (dr > ds)
+        rq = np.where(fix_q, -rr - rs, rq)
+        rr = np.where(fix_r, -rq - rs, rr)
+        a, b = rq, rr
+        cx, cy = cell_km * 1.5 * rq, cell_km * np.sqrt(3) * (rr + rq / 2)
+    elif shape == "grid":
+        a, b = np.floor(x / cell_km), np.floor(y / cell_km)
+        cx, cy = (a + 0.5) * cell_km, (b + 0.5) * cell_km
+    else:
+        raise ValueError(f"Bilinmeyen hücre şekli: {shape}")
+    cells = pd.DataFrame({
+        "a": a, "b": b, "lat": cy / _KM_PER_DEG_LAT, "lon": cx / km_lon,
+        weight: pd.to_numeric(points[weight], errors="coerce").to_numpy(np.float64),
+    })
+    return (
+        cells.groupby(["a", "b"], sort=False)
+        .agg(lat=("lat", "first"), lon=("lon", "first"), **{weight: (weight, "sum"), "Nokta": (weight, "size")})
+        .reset_index(drop=True)
     )
-    return ser
 
 
 def prepare_page_df(required_cols: List[str], page_key: str = "page") -> tuple:
     """Return (raw_df, view_df, mapping) for a page.
 
     - raw_df: the complete original dataframe from session (get_raw_df)
-    - view_df: a DataFrame view that contains all raw columns plus aliases for required_cols
+    - view_df: a DataFrame view that contains all raw columns plus aliases for required_cols.
+      Its columns share memory with raw_df, so nothing is copied on rerun. Treat it as
+      read-only: never write into it in place (.loc/.iloc/.at, inplace=True). Replacing a
+      whole column (view_df[c] = ...) or deriving a new frame (assign, filters) is safe.
     - mapping: dict(required_col -> chosen existing column or None)
 
     If raw_df is missing, raises ValueError.
@@ -454,10 +2734,10 @@ def prepare_page_df(required_cols: List[str], page_key: str = "page") -> tuple:
     # Normalize raw column names
     raw_cols = [str(c).strip() for c in raw.columns]
     mapping = {}
-    view = raw.copy()
+    aliases = {}
 
     for rc in required_cols:
-        if rc in view.columns:
+        if rc in raw.columns:
             mapping[rc] = rc
             continue
         # Offer mapping UI: allow user to pick an existing column to serve as rc
@@ -466,10 +2746,14 @@ def prepare_page_df(required_cols: List[str], page_key: str = "page") -> tuple:
         if sel and sel != "<none>":
             mapping[rc] = sel
             # create alias column name if different
-            if sel in view.columns:
-                view[rc] = view[sel]
+            if sel in raw.columns:
+                aliases[rc] = sel
         else:
             mapping[rc] = None
 
-    return raw, view, mapping
+    # Kolonlar ham veriyle paylaşılır (copy=False): görünüm salt okunur kullanılmalı
+    sources = {**{c: c for c in raw.columns}, **aliases}
+    view = pd.DataFrame({c: raw[src] for c, src in sources.items()}, copy=False)
+    view.attrs = dict(raw.attrs)
 
+    return raw, view, mapping